@@ -1,11 +1,78 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
+from configuration.config import STARTUP_WARMUP
+from core.utils.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    RequestSizeLimitMiddleware,
+    admission_rejected_response
+)
+from core.utils.llm_handler import LLMHandler
+from core.utils.logging_utils import setup_logging
+from core.utils.profiling import ProfilingMiddleware
+from core.utils.shared_state import close_state_backend, purge_state_periodically
+from core.utils.tracing import TracingMiddleware
 from routes import dashboard
+from views.dashboard_views import DashboardViews
+
+# Route logging through a background queue before anything starts emitting records
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the service graph at startup and warm its heavy dependencies.
+
+    The views (and the services they own) are created once per process and
+    shared by all requests through app.state, as is the LLM handler whose
+    connection pool they all use. Depending on STARTUP_WARMUP, litellm,
+    pymupdf and python-docx are imported in a worker thread and the LLM
+    connections are opened either before serving ("blocking") or alongside
+    it ("background").
+    """
+    llm_handler = LLMHandler()
+    llm_handler.open()
+    app.state.llm_handler = llm_handler
+    app.state.dashboard_views = DashboardViews(llm_handler=llm_handler)
+    app.state.admission_controller = AdmissionController()
+    purge_task = asyncio.create_task(purge_state_periodically())
+
+    warmup_task = connections_task = None
+    if STARTUP_WARMUP == "blocking":
+        await asyncio.gather(
+            asyncio.to_thread(app.state.dashboard_views.warm_up),
+            llm_handler.warm_connections()
+        )
+    elif STARTUP_WARMUP == "background":
+        warmup_task = asyncio.create_task(asyncio.to_thread(app.state.dashboard_views.warm_up))
+        connections_task = asyncio.create_task(llm_handler.warm_connections())
+
+    yield
+
+    purge_task.cancel()
+    await asyncio.gather(purge_task, return_exceptions=True)
+
+    # A thread cannot be interrupted, so let an unfinished warm-up complete
+    if warmup_task is not None:
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    if connections_task is not None:
+        connections_task.cancel()
+        await asyncio.gather(connections_task, return_exceptions=True)
+
+    await llm_handler.aclose()
+    if app.state.dashboard_views.results_store is not None:
+        app.state.dashboard_views.results_store.close()
+    close_state_backend()
+
 
 # Initialize FastAPI application with a base path for API versioning
-app = FastAPI(root_path="/apis/v1")
+app = FastAPI(root_path="/apis/v1", lifespan=lifespan)
 
 # Add session middleware to handle user sessions
 # The secret key is used for signing the session cookies
@@ -21,10 +88,32 @@ app.add_middleware(
     allow_headers=allow_all   # Allow all HTTP headers
 )
 
+# Reject uploads whose declared size exceeds the per-request limit before reading them
+app.add_middleware(RequestSizeLimitMiddleware)
+
+# Opt-in per-request profiling; added before tracing so it runs inside it: the
+# request's root span then covers the profiled work and the profile write, and
+# profiled responses still get their X-Request-ID
+app.add_middleware(ProfilingMiddleware)
+
+# Assign a correlation id to every request and record a root span for it
+app.add_middleware(TracingMiddleware)
+
 # Include routes from the dashboard module
 app.include_router(dashboard.router)
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """
+    Turn admission-control rejections into 413/429/503 responses.
+
+    Returns:
+        JSONResponse: The error details, with a Retry-After header when the service is saturated
+    """
+    return admission_rejected_response(exc)
+
+
 @app.get("/health")
 async def health():
     """
@@ -0,0 +1,82 @@
+"""
+Request hedging benchmark.
+
+Simulates batches of concurrent LLM calls against a fake provider whose
+latencies have a heavy tail (a small share of calls straggles far beyond the
+median), and compares batch completion times with hedging off and on. No
+network calls are made.
+
+Usage (from the app directory):
+    python benchmarks/bench_hedging.py --batches 30 --batch-size 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.utils.llm_handler as llm_handler_module  # noqa: E402
+from core.utils.llm_handler import LLMHandler  # noqa: E402
+from core.utils.shared_state import InMemoryStateBackend  # noqa: E402
+
+
+def make_provider(rng: random.Random, median: float, straggler_rate: float, straggler_factor: float):
+    """Return a fake acompletion with lognormal latencies and occasional stragglers."""
+    async def acompletion(**kwargs):
+        latency = rng.lognormvariate(0, 0.25) * median
+        if rng.random() < straggler_rate:
+            latency *= straggler_factor
+        await asyncio.sleep(latency)
+        response = MagicMock()
+        response.choices[0].message.content = "{}"
+        return response
+    return acompletion
+
+
+async def run(hedging: bool, args) -> list:
+    """Run all batches and return their wall times in seconds."""
+    rng = random.Random(args.seed)
+    handler = LLMHandler(state_backend=InMemoryStateBackend())
+    llm_handler_module.LLM_HEDGING_ENABLED = hedging
+
+    durations = []
+    with patch("litellm.acompletion", side_effect=make_provider(rng, args.median, args.straggler_rate, args.straggler_factor)):
+        for _ in range(args.batches):
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                handler.call_llm("system", f"user {i}", temperature=0.5) for i in range(args.batch_size)
+            ))
+            durations.append(time.perf_counter() - started)
+    print(f"  hedges sent: {handler.hedge_budget.hedges} of {handler.hedge_budget.calls} calls")
+    return durations
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batches", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--median", type=float, default=0.05, help="median call latency in seconds")
+    parser.add_argument("--straggler-rate", type=float, default=0.03)
+    parser.add_argument("--straggler-factor", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for hedging in (False, True):
+        print(f"hedging {'on' if hedging else 'off'}:")
+        durations = asyncio.run(run(hedging, args))
+        print(f"  batch p50 {statistics.median(durations) * 1000:.0f} ms, "
+              f"p99 {percentile(durations, 99) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Text normalization benchmark.
+
+Renders synthetic multi-page resumes to PDF (with a running header, page
+footers, bullet glyphs, contact details and text wrapped at the margin),
+extracts them with TextExtractor and normalizes them with
+TextNormalizer.normalize, as the pipeline does. Reports the tokens removed per
+resume against the CPU time normalization costs, including the two token counts
+normalize() makes, and what the removed tokens would have cost as LLM input. Token counts are estimated
+from the character count when the tokenizer cannot be downloaded. No network
+calls are made.
+
+Usage (from the app directory):
+    python benchmarks/bench_normalization.py --resumes 200 --pages 3
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configuration.config import RESUME_RANKER_MODEL  # noqa: E402
+from core.text_extractor import TextExtractor  # noqa: E402
+from core.text_normalizer import TextNormalizer  # noqa: E402
+from core.utils.token_budget import count_tokens  # noqa: E402
+
+WORDS = (
+    "designed built python services pipelines customers latency reduced team led data platform "
+    "migrated kubernetes reliability on-call analytics dashboards stakeholders delivered features"
+).split()
+
+
+def make_resume_pdf(rng: random.Random, index: int, pages: int) -> bytes:
+    """Render one resume with the layout artefacts typical of exported CVs."""
+    import pymupdf
+
+    name = f"Candidate {index}"
+    doc = pymupdf.open()
+    for page_number in range(1, pages + 1):
+        page = doc.new_page()
+        page.insert_text((50, 30), f"{name}  |  Curriculum Vitae", fontsize=9)
+        page.insert_text((50, 820), f"Page {page_number} of {pages}", fontsize=9)
+        page.insert_text((400, 820), "Confidential", fontsize=9)
+
+        body = []
+        if page_number == 1:
+            body += [name, f"Email: candidate{index}@example.com", f"Phone: +1 (555) 010-{index % 10000:04d}",
+                     f"LinkedIn: https://www.linkedin.com/in/candidate{index}", "", "Experience"]
+        for _ in range(6):
+            body.append("•")
+            body.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 45))) + ".")
+        body.append("")
+        page.insert_textbox(pymupdf.Rect(50, 50, 545, 800), "\n".join(body), fontsize=9, fontname="china-s")
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--price-per-million", type=float, default=0.15,
+                        help="input token price in USD per million tokens")
+    parser.add_argument("--cpu-price-per-hour", type=float, default=0.05,
+                        help="price of one vCPU hour in USD")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    extractor = TextExtractor()
+    texts = [extractor._extract_from_pdf(make_resume_pdf(rng, i, args.pages)) for i in range(args.resumes)]
+    normalizer = TextNormalizer()
+
+    # Load the tokenizer up front so the first resume does not pay for it
+    count_tokens("warm up", RESUME_RANKER_MODEL)
+
+    durations, saved, original = [], [], []
+    for text in texts:
+        started = time.perf_counter()
+        result = normalizer.normalize(text, RESUME_RANKER_MODEL)
+        durations.append(time.perf_counter() - started)
+        original.append(result.original_tokens)
+        saved.append(result.saved_tokens)
+
+    total_time = sum(durations)
+    print(f"resumes: {args.resumes} x {args.pages} pages, {statistics.mean(original):.0f} tokens each before normalization")
+    print(f"tokens removed per resume: {statistics.mean(saved):.0f} "
+          f"({sum(saved) / sum(original) * 100:.1f}% of the input)")
+    print(f"normalization time per resume, token counting included: p50 {statistics.median(durations) * 1000:.2f} ms, "
+          f"max {max(durations) * 1000:.2f} ms")
+    print(f"CPU time per removed token: {total_time / max(1, sum(saved)) * 1e6:.2f} us")
+    print(f"per 1000 resumes: ${statistics.mean(saved) * 1000 * args.price_per_million / 1e6:.6f} of input tokens removed, "
+          f"${statistics.mean(durations) * 1000 * args.cpu_price_per_hour / 3600:.6f} of CPU spent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup benchmark.
+
+Measures, in fresh interpreter processes, how long it takes to import the
+application module and to answer the first /health request, and optionally
+lists the slowest imports reported by `python -X importtime`.
+
+Usage (from the app directory):
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --warmup off --importtime
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside a fresh interpreter and prints its timings as JSON
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app_module.app) as client:
+    started = time.perf_counter()
+    response = client.get("/health")
+    first_health = time.perf_counter()
+    assert response.status_code == 200
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_ms": (started - imported) * 1000,
+    "first_health_ms": (first_health - start) * 1000,
+}))
+"""
+
+
+def run_probe(env: dict) -> dict:
+    """Run the probe once in a new process and return its timings."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env: dict, limit: int) -> list:
+    """Return the slowest cumulative imports of `import app` as (microseconds, module) pairs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = [part.strip() for part in line[len("import time:"):].split("|")]
+        timings.append((int(cumulative), module.strip()))
+    return sorted(timings, reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--warmup", choices=["background", "blocking", "off"], default=None,
+                        help="Override STARTUP_WARMUP for the measured processes")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    if args.warmup:
+        env["STARTUP_WARMUP"] = args.warmup
+
+    samples = [run_probe(env) for _ in range(args.runs)]
+    for key in ("import_ms", "lifespan_ms", "first_health_ms"):
+        values = [sample[key] for sample in samples]
+        print(f"{key:>16}: median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+
+    if args.importtime:
+        print("\nSlowest imports (cumulative):")
+        for cumulative, module in slowest_imports(env, limit=15):
+            print(f"{cumulative / 1000:10.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
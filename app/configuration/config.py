@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -10,7 +11,9 @@ else:
     load_dotenv()  # Try to load from default locations
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
+# Only export the key when it is set, so the app can start (and serve /health) without it
+if OPENAI_API_KEY:
+    os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
 
 # CRITERIA EXTRACTOR
@@ -32,6 +35,10 @@ Return the extracted information as a structured JSON object.
 CRITERIA_EXTRACTOR_USER_PROMPT= "Job Description: {job_description}"
 CRITERIA_EXTRACTOR_MODEL= "gpt-4o-mini"
 CRITERIA_EXTRACTOR_TEMPERATURE= 0.0
+# Token budget for the job description sent to CRITERIA_EXTRACTOR_MODEL (0 disables budgeting)
+CRITERIA_EXTRACTOR_MAX_INPUT_TOKENS= int(os.getenv("CRITERIA_EXTRACTOR_MAX_INPUT_TOKENS", "12000"))
+# Job descriptions processed at once by the batch extraction endpoint
+CRITERIA_BATCH_CONCURRENCY= int(os.getenv("CRITERIA_BATCH_CONCURRENCY", "8"))
 
 RESUME_RANKER_SYSTEM_PROMPT= """
 
@@ -44,6 +51,190 @@ Output Format:
 Return the extracted information as a structured JSON object.
 """
 
-RESUME_RANKER_USER_PROMPT= "Resume: {resume} \n Criteria: {criteria}"
+# The criteria are shared by every resume of a batch, so they follow the system prompt
+# and the resume comes last; calls then share a prefix the provider can cache. OpenAI
+# only caches prefixes of 1024+ tokens, which the default prompt and criteria rarely reach
+RESUME_RANKER_CRITERIA_PROMPT= "Criteria: {criteria}"
+RESUME_RANKER_USER_PROMPT= "Resume: {resume}"
 RESUME_RANKER_MODEL= "gpt-4o-mini"
-RESUME_RANKER_TEMPERATURE= 0.0
\ No newline at end of file
+RESUME_RANKER_TEMPERATURE= 0.0
+# Token budget for the resume sent to RESUME_RANKER_MODEL (0 disables budgeting)
+RESUME_RANKER_MAX_INPUT_TOKENS= int(os.getenv("RESUME_RANKER_MAX_INPUT_TOKENS", "6000"))
+
+# TEXT NORMALIZATION
+# Extracted resume and job description text is compacted before it is sent to the LLM.
+# TEXT_NORMALIZATION_STEPS lists the steps to run (comma-separated; they always run in
+# this order): "page_furniture" drops headers, footers and page numbers repeated across
+# PDF pages, "bullets" writes bullet glyphs as "- ", "hyphenation" and "wrapped_lines"
+# rejoin words and sentences broken at the page margin, "contact_info" drops e-mail
+# addresses, phone numbers and profile URLs, "whitespace" collapses spaces and blank
+# lines. An empty list disables normalization
+TEXT_NORMALIZATION_STEPS= [
+    step.strip()
+    for step in os.getenv(
+        "TEXT_NORMALIZATION_STEPS", "page_furniture,bullets,hyphenation,wrapped_lines,contact_info,whitespace"
+    ).split(",")
+    if step.strip()
+]
+
+# RESUME SECTIONS
+# The ranker sends only the resume sections the criteria are scored from (e.g. Education
+# and Certifications for "qualifications"), found by matching common headings. The full
+# text is sent when fewer than RESUME_SECTIONS_MIN_HEADINGS kinds of heading are found or
+# less than RESUME_SECTIONS_MIN_CONFIDENCE of the text falls under a recognised heading
+RESUME_SECTIONS_ENABLED= os.getenv("RESUME_SECTIONS_ENABLED", "true").lower() == "true"
+RESUME_SECTIONS_MIN_HEADINGS= int(os.getenv("RESUME_SECTIONS_MIN_HEADINGS", "2"))
+RESUME_SECTIONS_MIN_CONFIDENCE= float(os.getenv("RESUME_SECTIONS_MIN_CONFIDENCE", "0.7"))
+
+# INPUT BUDGETING
+# How oversized inputs are shrunk to their token budget: "head_tail" keeps the start
+# and the end (INPUT_HEAD_RATIO of the budget for the start), "truncate" keeps the start
+INPUT_TRUNCATION_STRATEGY= os.getenv("INPUT_TRUNCATION_STRATEGY", "head_tail")
+INPUT_HEAD_RATIO= float(os.getenv("INPUT_HEAD_RATIO", "0.7"))
+
+# TRACING
+# Span exporter: "console" writes JSON lines to stderr, "file" appends them to TRACING_OUTPUT_FILE, "none" disables export
+TRACING_ENABLED= os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACING_EXPORTER= os.getenv("TRACING_EXPORTER", "none")
+TRACING_OUTPUT_FILE= os.getenv("TRACING_OUTPUT_FILE", "output_files/traces.jsonl")
+
+# STARTUP
+# How heavy dependencies (litellm, pymupdf, python-docx) are warmed when the app starts:
+# "background" imports them in a worker thread while the app already serves requests,
+# "blocking" finishes the warm-up before serving, "off" leaves them to the first request
+STARTUP_WARMUP= os.getenv("STARTUP_WARMUP", "background")
+
+# ARCHIVE INGESTION
+# Decompression-bomb limits for ZIP/TAR uploads of resumes
+ARCHIVE_MAX_MEMBERS= int(os.getenv("ARCHIVE_MAX_MEMBERS", "2000"))
+ARCHIVE_MAX_MEMBER_BYTES= int(os.getenv("ARCHIVE_MAX_MEMBER_BYTES", str(20 * 1024 * 1024)))
+ARCHIVE_MAX_TOTAL_BYTES= int(os.getenv("ARCHIVE_MAX_TOTAL_BYTES", str(1024 * 1024 * 1024)))
+ARCHIVE_MAX_COMPRESSION_RATIO= float(os.getenv("ARCHIVE_MAX_COMPRESSION_RATIO", "100"))
+
+# RESULT EXPORT
+# Formats scoring results can be downloaded in, chosen per request with ?format=.
+# "csv" is the original spreadsheet-style file; "parquet", "arrow" and "xlsx" have one
+# typed column per criterion plus totals and batch metadata, and are written in
+# chunks of EXPORT_CHUNK_ROWS rows
+EXPORT_DEFAULT_FORMAT= os.getenv("EXPORT_DEFAULT_FORMAT", "csv")
+EXPORT_CHUNK_ROWS= int(os.getenv("EXPORT_CHUNK_ROWS", "10000"))
+# Highest score the ranker gives per criterion
+MAX_CRITERIA_SCORE= 5
+
+# RESULTS STORE
+# Per-candidate, per-criterion scores of every batch are kept in a local SQLite
+# database under a server-generated results id, so /dashboard/results/{results_id}
+# can re-sort, filter and page them without re-running the batch. Pages hold at most
+# RESULTS_MAX_PAGE_SIZE candidates. Batches older than RESULTS_STORE_RETENTION_SECONDS,
+# or beyond the newest RESULTS_STORE_MAX_BATCHES, are deleted (0 disables either limit)
+RESULTS_STORE_ENABLED= os.getenv("RESULTS_STORE_ENABLED", "true").lower() == "true"
+RESULTS_STORE_PATH= os.getenv("RESULTS_STORE_PATH", "output_files/results.sqlite3")
+RESULTS_STORE_RETENTION_SECONDS= int(os.getenv("RESULTS_STORE_RETENTION_SECONDS", str(7 * 86400)))
+RESULTS_STORE_MAX_BATCHES= int(os.getenv("RESULTS_STORE_MAX_BATCHES", "1000"))
+RESULTS_MAX_PAGE_SIZE= int(os.getenv("RESULTS_MAX_PAGE_SIZE", "1000"))
+
+# NEAR-DUPLICATE DETECTION
+# Resumes whose estimated word-shingle Jaccard similarity reaches DEDUP_THRESHOLD are
+# ranked once; the copies reuse the representative's scores and are marked in the output.
+# With DEDUP_CROSS_BATCH, signatures are kept in the shared-state backend to flag
+# resumes already seen in earlier batches. Matches are not scoped by tenant and report
+# the earlier batch's file name, so only enable it when all clients may see each other's uploads
+DEDUP_ENABLED= os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD= float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_NUM_HASHES= 128
+DEDUP_BANDS= 32
+DEDUP_SHINGLE_SIZE= 5
+DEDUP_CROSS_BATCH= os.getenv("DEDUP_CROSS_BATCH", "false").lower() == "true"
+DEDUP_CROSS_BATCH_TTL_SECONDS= int(os.getenv("DEDUP_CROSS_BATCH_TTL_SECONDS", str(30 * 86400)))
+
+# ADMISSION CONTROL
+# Per-worker limits in front of the dashboard routes. Batches beyond
+# ADMISSION_MAX_CONCURRENT_BATCHES wait up to ADMISSION_QUEUE_TIMEOUT_SECONDS (then 429);
+# more than ADMISSION_MAX_QUEUED_ITEMS resumes/documents running or waiting gives 503.
+# Tenants are served fairly; 0 disables the per-tenant cap. A tenant is the client address,
+# or the ADMISSION_TENANT_HEADER value when ADMISSION_TRUST_TENANT_HEADER is set; only set it
+# behind a gateway that writes the header itself, since clients could otherwise rotate ids
+ADMISSION_MAX_CONCURRENT_BATCHES= int(os.getenv("ADMISSION_MAX_CONCURRENT_BATCHES", "4"))
+ADMISSION_MAX_QUEUED_ITEMS= int(os.getenv("ADMISSION_MAX_QUEUED_ITEMS", "2000"))
+ADMISSION_MAX_FILES_PER_REQUEST= int(os.getenv("ADMISSION_MAX_FILES_PER_REQUEST", "500"))
+ADMISSION_MAX_REQUEST_BYTES= int(os.getenv("ADMISSION_MAX_REQUEST_BYTES", str(512 * 1024 * 1024)))
+ADMISSION_QUEUE_TIMEOUT_SECONDS= float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30"))
+ADMISSION_PER_TENANT_MAX_CONCURRENT= int(os.getenv("ADMISSION_PER_TENANT_MAX_CONCURRENT", "0"))
+ADMISSION_TENANT_HEADER= "X-Tenant-ID"
+ADMISSION_TRUST_TENANT_HEADER= os.getenv("ADMISSION_TRUST_TENANT_HEADER", "false").lower() == "true"
+# Archives do not announce how many resumes they hold; estimate one per this many bytes
+ADMISSION_ARCHIVE_BYTES_PER_ITEM= 100 * 1024
+
+# WORKERS AND SHARED STATE
+# Number of uvicorn worker processes; state that must be consistent across them
+# lives in the shared-state backend: "memory" (single process), "sqlite" (all
+# processes on the host) or "auto" (sqlite when WORKERS > 1)
+WORKERS= int(os.getenv("WORKERS", "1"))
+SHARED_STATE_BACKEND= os.getenv("SHARED_STATE_BACKEND", "auto")
+SHARED_STATE_PATH= os.getenv("SHARED_STATE_PATH", "output_files/shared_state.sqlite3")
+JOB_STATE_TTL_SECONDS= int(os.getenv("JOB_STATE_TTL_SECONDS", "86400"))
+# Expired keys (cache entries, past rate-limit windows, old jobs) are deleted this often
+SHARED_STATE_PURGE_INTERVAL_SECONDS= float(os.getenv("SHARED_STATE_PURGE_INTERVAL_SECONDS", "300"))
+
+# LLM DEPLOYMENTS
+# Pool of deployments LLM calls are balanced over, as a JSON list of objects with
+# "name", "model" (litellm model string), "model_group" (the model name callers use,
+# defaults to "model"), "api_key" or "api_key_env", "api_base", "rpm" and "tpm".
+# OPENAI_API_KEYS (comma-separated) adds one deployment per key for the OpenAI models
+# above, each with LLM_RPM_LIMIT. Calls go to the least busy healthy deployment of
+# their group and fail over to the next one; a deployment hit by rate-limit or auth
+# errors, or by LLM_DEPLOYMENT_FAILURE_THRESHOLD consecutive failures, is skipped for
+# LLM_DEPLOYMENT_COOLDOWN_SECONDS. Models without deployments are called directly
+LLM_DEPLOYMENTS= json.loads(os.getenv("LLM_DEPLOYMENTS", "[]"))
+OPENAI_API_KEYS= [key.strip() for key in os.getenv("OPENAI_API_KEYS", "").split(",") if key.strip()]
+LLM_DEPLOYMENT_FAILURE_THRESHOLD= int(os.getenv("LLM_DEPLOYMENT_FAILURE_THRESHOLD", "3"))
+LLM_DEPLOYMENT_COOLDOWN_SECONDS= float(os.getenv("LLM_DEPLOYMENT_COOLDOWN_SECONDS", "30"))
+
+# LLM CACHE AND RATE LIMITS
+# Deterministic (temperature 0) LLM responses are cached in the shared-state backend
+# so identical prompts are paid for once per host; LLM_RPM_LIMIT caps requests per
+# minute across all workers (0 disables the limit)
+LLM_CACHE_ENABLED= os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS= int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_RPM_LIMIT= int(os.getenv("LLM_RPM_LIMIT", "0"))
+
+# LLM HTTP CLIENT
+# One long-lived, keep-alive connection pool per worker is shared by every LLM call.
+# Connections are opened and TLS-handshaked at startup (per STARTUP_WARMUP) by sending
+# LLM_HTTP_WARMUP_CONNECTIONS lightweight requests to LLM_API_BASE; 0 skips the warm-up.
+# HTTP/2 is used when the h2 package is installed
+LLM_API_BASE= os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+LLM_HTTP_MAX_CONNECTIONS= int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS= int(os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS= float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+LLM_HTTP_TIMEOUT_SECONDS= float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "120"))
+LLM_HTTP2= os.getenv("LLM_HTTP2", "true").lower() == "true"
+LLM_HTTP_WARMUP_CONNECTIONS= int(os.getenv("LLM_HTTP_WARMUP_CONNECTIONS", "4"))
+
+# LLM REQUEST HEDGING
+# When a call runs past the LLM_HEDGE_PERCENTILE latency of the last LLM_HEDGE_WINDOW
+# calls to the same model (once LLM_HEDGE_MIN_SAMPLES are known), a duplicate request
+# is sent, to LLM_HEDGE_MODEL when set. The first valid response wins and the other
+# request is cancelled. Hedges are capped at LLM_HEDGE_BUDGET_RATIO of all calls
+LLM_HEDGING_ENABLED= os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE= float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_WINDOW= int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+LLM_HEDGE_MIN_SAMPLES= int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_BUDGET_RATIO= float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.05"))
+LLM_HEDGE_MODEL= os.getenv("LLM_HEDGE_MODEL", "")
+
+# LOGGING
+# Records are emitted as JSON lines through a queue drained off the event loop.
+# Verbose payloads (full LLM results, ranking lists) are logged at DEBUG and only
+# a LOG_PAYLOAD_SAMPLE_RATE fraction of them is kept
+LOG_LEVEL= os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_PAYLOAD_SAMPLE_RATE= float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
+
+# PROFILING
+# Per-request profiling is opt-in: either for every request via PROFILING_ENABLED,
+# or for a single request by sending PROFILING_HEADER with a truthy value, which is only
+# honoured with PROFILING_ALLOW_HEADER (any client can send it, so keep it off in production)
+PROFILING_ENABLED= os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_ALLOW_HEADER= os.getenv("PROFILING_ALLOW_HEADER", "false").lower() == "true"
+PROFILING_HEADER= "X-Profile"
+PROFILING_OUTPUT_DIR= os.getenv("PROFILING_OUTPUT_DIR", "output_files/profiles")
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import tarfile
+import zipfile
+from typing import AsyncIterator, BinaryIO, Iterator, List, NamedTuple, Optional
+
+from configuration.config import (
+    ARCHIVE_MAX_MEMBERS,
+    ARCHIVE_MAX_MEMBER_BYTES,
+    ARCHIVE_MAX_TOTAL_BYTES,
+    ARCHIVE_MAX_COMPRESSION_RATIO
+)
+from core.text_extractor import TextExtractor
+
+logger = logging.getLogger(__name__)
+
+# Chunk size used when decompressing members, so limits trip before a member is fully inflated
+_READ_CHUNK_BYTES = 1024 * 1024
+
+
+class ArchiveError(ValueError):
+    """Raised when an upload is not a supported archive, is corrupt or exceeds an archive limit."""
+
+
+class ArchiveMember(NamedTuple):
+    """
+    A supported document read from an archive.
+
+    Attributes:
+        name: Path of the member inside the archive
+        content: The member's decompressed bytes
+        content_type: Document type detected from the member's magic bytes
+    """
+    name: str
+    content: bytes
+    content_type: str
+
+
+class ArchiveExtractor:
+    """
+    Streams the documents contained in a ZIP or TAR archive one at a time.
+
+    The archive type and each member's type are detected from magic bytes, not
+    from client-supplied content types or file extensions. Unsupported members
+    are skipped, as are members over the size or compression-ratio limit.
+    Decompression-bomb limits (member count, total decompressed size, counting
+    skipped members, and overall compression ratio) abort the archive; they are
+    enforced while reading, so at most one member is held in memory at a time.
+    """
+    def __init__(
+        self,
+        max_members: int = ARCHIVE_MAX_MEMBERS,
+        max_member_bytes: int = ARCHIVE_MAX_MEMBER_BYTES,
+        max_total_bytes: int = ARCHIVE_MAX_TOTAL_BYTES,
+        max_compression_ratio: float = ARCHIVE_MAX_COMPRESSION_RATIO
+    ):
+        self.max_members = max_members
+        self.max_member_bytes = max_member_bytes
+        self.max_total_bytes = max_total_bytes
+        self.max_compression_ratio = max_compression_ratio
+        self.skipped: List[str] = []
+
+    @staticmethod
+    def detect_archive_type(header: bytes) -> Optional[str]:
+        """
+        Detect the archive type from the first bytes of the file.
+
+        Args:
+            header (bytes): At least the first 512 bytes of the file
+
+        Returns:
+            Optional[str]: "zip" or "tar" (possibly gzip/bzip2/xz compressed), or None
+        """
+        if header[:4] in (b"PK\x03\x04", b"PK\x05\x06"):
+            return "zip"
+        if header[257:262] == b"ustar":
+            return "tar"
+        # Compressed tarballs; the tar header is only checked once decompressed
+        if header[:2] == b"\x1f\x8b" or header[:3] == b"BZh" or header[:6] == b"\xfd7zXZ\x00":
+            return "tar"
+        return None
+
+    def iter_members(self, fileobj: BinaryIO) -> Iterator[ArchiveMember]:
+        """
+        Yield the supported documents of an archive, one at a time.
+
+        Args:
+            fileobj (BinaryIO): Seekable file object positioned anywhere in the archive
+
+        Yields:
+            ArchiveMember: Each supported document
+
+        Raises:
+            ArchiveError: If the file is not a supported archive or a limit is exceeded
+        """
+        fileobj.seek(0)
+        header = fileobj.read(512)
+        fileobj.seek(0)
+
+        archive_type = self.detect_archive_type(header)
+        if archive_type == "zip":
+            yield from self._iter_zip(fileobj)
+        elif archive_type == "tar":
+            yield from self._iter_tar(fileobj)
+        else:
+            raise ArchiveError("Unsupported archive format. Only ZIP and TAR archives are supported.")
+
+    async def aiter_members(self, fileobj: BinaryIO) -> AsyncIterator[ArchiveMember]:
+        """
+        Async version of iter_members; decompression runs in a worker thread.
+
+        Args:
+            fileobj (BinaryIO): Seekable file object holding the archive
+
+        Yields:
+            ArchiveMember: Each supported document
+        """
+        members = self.iter_members(fileobj)
+        sentinel = object()
+        while True:
+            member = await asyncio.to_thread(next, members, sentinel)
+            if member is sentinel:
+                return
+            yield member
+
+    def _iter_zip(self, fileobj: BinaryIO) -> Iterator[ArchiveMember]:
+        """Yield the supported documents of a ZIP archive."""
+        total_bytes = 0
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f"Invalid ZIP archive: {e}")
+        with archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+            self._check_member_count(len(infos))
+
+            for info in infos:
+                # Declared sizes are checked first but not trusted; reads are capped below.
+                # Skipped members still count towards the total, so they cannot be used to dodge it
+                if info.file_size > self.max_member_bytes:
+                    self._skip(info.filename, "member too large")
+                    total_bytes += info.file_size
+                    self._check_total(total_bytes, fileobj)
+                    continue
+                if info.compress_size and info.file_size / info.compress_size > self.max_compression_ratio:
+                    self._skip(info.filename, "compression ratio too high")
+                    continue
+
+                with archive.open(info) as member_file:
+                    content = self._read_capped(member_file, info.filename)
+                if content is None:
+                    total_bytes += self.max_member_bytes
+                    self._check_total(total_bytes, fileobj)
+                    continue
+
+                total_bytes += len(content)
+                self._check_total(total_bytes, fileobj)
+                member = self._to_member(info.filename, content)
+                if member is not None:
+                    yield member
+
+    def _iter_tar(self, fileobj: BinaryIO) -> Iterator[ArchiveMember]:
+        """Yield the supported documents of a (possibly compressed) TAR archive, in streaming mode."""
+        total_bytes = 0
+        member_count = 0
+        try:
+            with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+                for info in archive:
+                    if not info.isfile():
+                        continue
+                    member_count += 1
+                    self._check_member_count(member_count)
+
+                    # A streamed archive still inflates a skipped member to get past it,
+                    # so skipped members count towards the total decompressed size
+                    if info.size > self.max_member_bytes:
+                        self._skip(info.name, "member too large")
+                        total_bytes += info.size
+                        self._check_total(total_bytes, fileobj)
+                        continue
+
+                    member_file = archive.extractfile(info)
+                    content = self._read_capped(member_file, info.name)
+                    if content is None:
+                        total_bytes += info.size
+                        self._check_total(total_bytes, fileobj)
+                        continue
+
+                    total_bytes += len(content)
+                    self._check_total(total_bytes, fileobj)
+                    member = self._to_member(info.name, content)
+                    if member is not None:
+                        yield member
+        except tarfile.TarError as e:
+            raise ArchiveError(f"Invalid TAR archive: {e}")
+
+    def _read_capped(self, member_file: BinaryIO, name: str) -> Optional[bytes]:
+        """Read a member in chunks, skipping it if it inflates beyond max_member_bytes."""
+        chunks = []
+        size = 0
+        while True:
+            chunk = member_file.read(_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > self.max_member_bytes:
+                self._skip(name, "member too large")
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _check_member_count(self, count: int) -> None:
+        if count > self.max_members:
+            raise ArchiveError(f"Archive contains more than {self.max_members} files.")
+
+    def _check_total(self, total_bytes: int, fileobj: BinaryIO) -> None:
+        """Enforce the total decompressed size and the overall compression ratio."""
+        if total_bytes > self.max_total_bytes:
+            raise ArchiveError(f"Archive exceeds the maximum decompressed size of {self.max_total_bytes} bytes.")
+        # Compressed bytes consumed so far; an approximation for streamed archives
+        compressed_bytes = max(fileobj.tell(), 1)
+        if total_bytes > _READ_CHUNK_BYTES and total_bytes / compressed_bytes > self.max_compression_ratio:
+            raise ArchiveError("Archive exceeds the maximum compression ratio.")
+
+    def _to_member(self, name: str, content: bytes) -> Optional[ArchiveMember]:
+        """Wrap a supported document as an ArchiveMember, skipping anything else."""
+        content_type = TextExtractor.detect_file_type(content)
+        if content_type is None:
+            self._skip(name, "unsupported file type")
+            return None
+        return ArchiveMember(name=name, content=content, content_type=content_type)
+
+    def _skip(self, name: str, reason: str) -> None:
+        logger.info("Skipping archive member", extra={"member": name, "reason": reason})
+        self.skipped.append(name)
@@ -1,15 +1,23 @@
 import ast
+import asyncio
+import logging
 from pydantic import BaseModel, Field
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 from core.utils.llm_handler import LLMHandler
+from core.utils.prompt_builder import PromptBuilder
+from core.utils.token_budget import fit_to_budget
+from core.utils.tracing import current_span, traced
 from configuration.config import (
     CRITERIA_EXTRACTOR_SYSTEM_PROMPT,
     CRITERIA_EXTRACTOR_USER_PROMPT,
     CRITERIA_EXTRACTOR_MODEL,
-    CRITERIA_EXTRACTOR_TEMPERATURE
+    CRITERIA_EXTRACTOR_TEMPERATURE,
+    CRITERIA_EXTRACTOR_MAX_INPUT_TOKENS
 )
 
+logger = logging.getLogger(__name__)
+
 class CriteriaExtractorOutput(BaseModel):
     """
     Pydantic model defining the structure for job criteria extraction output.
@@ -39,10 +47,18 @@ class CriteriaExtractor:
     This class uses a language model to analyze job descriptions and extract
     key criteria like required skills, experience, and qualifications.
     """
-    def __init__(self):
-        """Initialize the CriteriaExtractor with an LLM handler."""
-        self.llm_handler = LLMHandler()
+    def __init__(self, llm_handler: Optional[LLMHandler] = None):
+        """
+        Initialize the CriteriaExtractor with an LLM handler.
 
+        Args:
+            llm_handler (Optional[LLMHandler]): Handler to share, e.g. one with a warm
+                connection pool. A new handler is created when omitted.
+        """
+        self.llm_handler = llm_handler or LLMHandler()
+        self.prompt_builder = PromptBuilder(CRITERIA_EXTRACTOR_SYSTEM_PROMPT, CRITERIA_EXTRACTOR_USER_PROMPT)
+
+    @traced("criteria_extractor.extract_criteria")
     async def extract_criteria(self, job_description: str) -> Dict[str, List[str]]:
         """
         Extract structured job criteria from a job description text.
@@ -55,13 +71,30 @@ class CriteriaExtractor:
                 with keys for required_skills, preferred_skills, certifications,
                 experience, qualifications, and soft_skills
         """
-        print("Extracting criteria")
+        logger.info("Extracting criteria", extra={"job_description_chars": len(job_description)})
+
+        # Fit the job description into the model's input budget before paying for the call.
+        # The criteria dictionary itself stays limited to the criteria keys, so truncation
+        # is reported through the logs and the enclosing trace span.
+        budget = await asyncio.to_thread(fit_to_budget, job_description, CRITERIA_EXTRACTOR_MAX_INPUT_TOKENS, CRITERIA_EXTRACTOR_MODEL)
+        if budget.removed_tokens:
+            logger.info("Job description truncated to fit the token budget", extra={
+                "original_tokens": budget.original_tokens,
+                "removed_tokens": budget.removed_tokens
+            })
+        span = current_span()
+        if span is not None:
+            span.set_attribute("input_tokens", budget.kept_tokens)
+            span.set_attribute("truncated_tokens", budget.removed_tokens)
         
+        # The instructions form the cacheable prefix; the job description comes last
+        system_prompt, user_prompt = self.prompt_builder.build(job_description=budget.text)
+
         # Call the language model with the job description to extract criteria
         # Using JSON mode to ensure structured output format
         response = await self.llm_handler.call_llm(
-            system_prompt=CRITERIA_EXTRACTOR_SYSTEM_PROMPT,
-            user_prompt=CRITERIA_EXTRACTOR_USER_PROMPT.format(job_description=job_description),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
             model=CRITERIA_EXTRACTOR_MODEL,
             response_format=CriteriaExtractorOutput,
             temperature=CRITERIA_EXTRACTOR_TEMPERATURE
@@ -71,8 +104,8 @@ class CriteriaExtractor:
         # ast.literal_eval safely evaluates the string as a Python literal
         final_response = ast.literal_eval(response)
         
-        # Log the extracted criteria for debugging
-        print(final_response)
+        # Log the extracted criteria for debugging (sampled)
+        logger.debug("Criteria extracted", extra={"payload": final_response})
         
         # Return the structured criteria dictionary
         return final_response
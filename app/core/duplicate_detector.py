@@ -0,0 +1,222 @@
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from configuration.config import (
+    DEDUP_NUM_HASHES,
+    DEDUP_BANDS,
+    DEDUP_SHINGLE_SIZE,
+    DEDUP_THRESHOLD,
+    DEDUP_CROSS_BATCH_TTL_SECONDS
+)
+from core.utils.shared_state import SharedStateBackend
+
+_WORD_RE = re.compile(r"\w+")
+_MAX_HASH = (1 << 64) - 1
+
+
+class NearDuplicateDetector:
+    """
+    Finds near-duplicate resumes (e.g. the same resume as PDF and DOCX, or two
+    revisions of it) from their extracted text.
+
+    Texts are reduced to word shingles and summarized with a one-permutation
+    MinHash signature: every shingle is hashed once and assigned to one of
+    `num_hashes` bins, keeping the minimum per bin. Signatures are indexed with
+    LSH banding, so each new document is only compared with documents sharing
+    at least one band, which keeps batches of thousands of resumes linear.
+
+    Documents are added incrementally; the first document of a group is its
+    representative. When a shared-state backend is given, signatures are also
+    remembered across batches.
+    """
+    def __init__(
+        self,
+        num_hashes: int = DEDUP_NUM_HASHES,
+        bands: int = DEDUP_BANDS,
+        shingle_size: int = DEDUP_SHINGLE_SIZE,
+        threshold: float = DEDUP_THRESHOLD,
+        state_backend: Optional[SharedStateBackend] = None,
+        cross_batch_ttl: int = DEDUP_CROSS_BATCH_TTL_SECONDS
+    ):
+        if num_hashes % bands:
+            raise ValueError("num_hashes must be a multiple of bands")
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.rows = num_hashes // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.state_backend = state_backend
+        self.cross_batch_ttl = cross_batch_ttl
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[Hashable]] = defaultdict(list)
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text (str): The extracted document text
+
+        Returns:
+            Optional[Tuple[int, ...]]: The signature, or None for texts without any words
+        """
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return None
+
+        size = min(self.shingle_size, len(words))
+        bins = [_MAX_HASH] * self.num_hashes
+        for i in range(len(words) - size + 1):
+            shingle = " ".join(words[i:i + size]).encode("utf-8")
+            value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+            index = value % self.num_hashes
+            if value < bins[index]:
+                bins[index] = value
+
+        return self._densify(bins)
+
+    def _densify(self, bins: List[int]) -> Tuple[int, ...]:
+        """
+        Fill empty bins by borrowing from the next non-empty bin (rotation densification).
+
+        The offset keeps borrowed values distinguishable from genuine ones, so two
+        documents only agree on a bin when they agree on the bin it came from.
+        """
+        filled = [index for index, value in enumerate(bins) if value != _MAX_HASH]
+        if len(filled) == len(bins):
+            return tuple(bins)
+
+        result = list(bins)
+        for index, value in enumerate(bins):
+            if value != _MAX_HASH:
+                continue
+            for distance in range(1, self.num_hashes):
+                source = bins[(index + distance) % self.num_hashes]
+                if source != _MAX_HASH:
+                    result[index] = (source + distance * 0x9E3779B97F4A7C15) & _MAX_HASH
+                    break
+        return tuple(result)
+
+    @staticmethod
+    def similarity(signature_a: Tuple[int, ...], signature_b: Tuple[int, ...]) -> float:
+        """Estimate the Jaccard similarity of two documents from their signatures."""
+        matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+        return matches / len(signature_a)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def add(self, doc_id: Hashable, text: str) -> Optional[Hashable]:
+        """
+        Add a document to the batch index.
+
+        Args:
+            doc_id (Hashable): Identifier of the document within the batch
+            text (str): The extracted document text
+
+        Returns:
+            Optional[Hashable]: The id of the representative this document duplicates,
+                or None if it is the first of its group
+        """
+        return self.add_signature(doc_id, self.signature(text))
+
+    def add_signature(self, doc_id: Hashable, signature: Optional[Tuple[int, ...]]) -> Optional[Hashable]:
+        """
+        Add a document to the batch index by its precomputed signature; see add.
+
+        Args:
+            doc_id (Hashable): Identifier of the document within the batch
+            signature (Optional[Tuple[int, ...]]): The document's signature, as returned by signature()
+
+        Returns:
+            Optional[Hashable]: The id of the representative this document duplicates,
+                or None if it is the first of its group
+        """
+        if signature is None:
+            return None
+
+        band_keys = self._band_keys(signature)
+        checked = set()
+        for key in band_keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if self.similarity(signature, self._signatures[candidate]) >= self.threshold:
+                    return candidate
+
+        # Only representatives are indexed, so duplicates always resolve to the group's first document
+        self._signatures[doc_id] = signature
+        for key in band_keys:
+            self._buckets[key].append(doc_id)
+        return None
+
+    def group(self, texts: List[str]) -> List[int]:
+        """
+        Group a list of texts into near-duplicate sets.
+
+        Args:
+            texts (List[str]): The extracted document texts
+
+        Returns:
+            List[int]: For each text, the index of its group's representative
+                (its own index when it is a representative)
+        """
+        representatives = []
+        for index, text in enumerate(texts):
+            duplicate_of = self.add(index, text)
+            representatives.append(index if duplicate_of is None else duplicate_of)
+        return representatives
+
+    def match_previous_batches(self, doc_ref: str, text: str) -> Optional[str]:
+        """
+        Look a document up among those seen in earlier batches, then remember it.
+
+        Args:
+            doc_ref (str): Reference stored for this document, e.g. "<job id>/<file name>"
+            text (str): The extracted document text
+
+        Returns:
+            Optional[str]: The reference of a near-duplicate from an earlier batch, or None
+        """
+        if self.state_backend is None:
+            return None
+        return self.match_signature(doc_ref, self.signature(text))
+
+    def match_signature(self, doc_ref: str, signature: Optional[Tuple[int, ...]]) -> Optional[str]:
+        """
+        Look a document up among earlier batches by its precomputed signature; see match_previous_batches.
+
+        Args:
+            doc_ref (str): Reference stored for this document, e.g. "<job id>/<file name>"
+            signature (Optional[Tuple[int, ...]]): The document's signature, as returned by signature()
+
+        Returns:
+            Optional[str]: The reference of a near-duplicate from an earlier batch, or None
+        """
+        if self.state_backend is None or signature is None:
+            return None
+
+        band_hashes = [
+            hashlib.blake2b(repr(key).encode("utf-8"), digest_size=12).hexdigest()
+            for key in self._band_keys(signature)
+        ]
+        match = None
+        checked = set()
+        for band_hash in band_hashes:
+            previous_ref = self.state_backend.get(f"dedup:band:{band_hash}")
+            if previous_ref is None or previous_ref in checked or previous_ref == doc_ref:
+                continue
+            checked.add(previous_ref)
+            previous_signature = self.state_backend.get(f"dedup:sig:{previous_ref}")
+            if previous_signature and self.similarity(signature, tuple(previous_signature)) >= self.threshold:
+                match = previous_ref
+                break
+
+        if match is None:
+            self.state_backend.set(f"dedup:sig:{doc_ref}", list(signature), self.cross_batch_ttl)
+            for band_hash in band_hashes:
+                self.state_backend.set(f"dedup:band:{band_hash}", doc_ref, self.cross_batch_ttl)
+        return match
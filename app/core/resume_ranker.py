@@ -1,14 +1,25 @@
 import ast
-from typing import List
+import asyncio
+import logging
+from typing import List, Optional, Tuple
 from pydantic import BaseModel, Field
+from core.section_segmenter import ResumeSegmenter
 from core.utils.llm_handler import LLMHandler
+from core.utils.prompt_builder import PromptBuilder
+from core.utils.token_budget import BudgetResult, fit_to_budget
+from core.utils.tracing import traced
 from configuration.config import (
     RESUME_RANKER_SYSTEM_PROMPT,
+    RESUME_RANKER_CRITERIA_PROMPT,
     RESUME_RANKER_USER_PROMPT,
     RESUME_RANKER_MODEL,
-    RESUME_RANKER_TEMPERATURE
+    RESUME_RANKER_TEMPERATURE,
+    RESUME_RANKER_MAX_INPUT_TOKENS,
+    RESUME_SECTIONS_ENABLED
 )
 
+logger = logging.getLogger(__name__)
+
 class ScoreModel(BaseModel):
     criteria: str = Field(description="The criteria being rated")
     score: int = Field(description="Score of the given criteria")
@@ -18,22 +29,63 @@ class ResumeRankerOutput(BaseModel):
     scores: List[ScoreModel]
 
 class ResumeRanker:
-    def __init__(self):
-        self.llm_handler = LLMHandler()
+    def __init__(self, llm_handler: Optional[LLMHandler] = None, segmenter: Optional[ResumeSegmenter] = None):
+        self.llm_handler = llm_handler or LLMHandler()
+        self.segmenter = segmenter or (ResumeSegmenter() if RESUME_SECTIONS_ENABLED else None)
+        self.prompt_builder = PromptBuilder(
+            RESUME_RANKER_SYSTEM_PROMPT, RESUME_RANKER_USER_PROMPT, RESUME_RANKER_CRITERIA_PROMPT
+        )
+
+    def _prepare_resume(self, resume: str, criteria: dict) -> Tuple[BudgetResult, Optional[List[str]]]:
+        """
+        Select the resume sections to send and fit them into the input budget.
+
+        Returns:
+            Tuple[BudgetResult, Optional[List[str]]]: The budgeted text and the kinds of
+                the sections sent, or None when the full text is sent
+        """
+        # Send only the sections the criteria are scored from, when the resume's headings are clear
+        sections = None
+        if self.segmenter is not None:
+            payload = self.segmenter.build_payload(resume, criteria)
+            resume, sections = payload.text, payload.sections
+            logger.debug("Resume segmented", extra={"sections": sections, "confidence": payload.confidence})
+
+        # Fit the resume into the model's input budget before paying for the call
+        return fit_to_budget(resume, RESUME_RANKER_MAX_INPUT_TOKENS, RESUME_RANKER_MODEL), sections
 
+    @traced("resume_ranker.rank_resume")
     async def rank_resume(self, resume: str, criteria: dict):
-        print("Extracting criteria")
+        logger.info("Ranking resume", extra={"resume_chars": len(resume)})
+
+        # Segmentation and tokenization are CPU-bound, so both run in one worker thread
+        budget, sections = await asyncio.to_thread(self._prepare_resume, resume, criteria)
+        if budget.removed_tokens:
+            logger.info("Resume truncated to fit the token budget", extra={
+                "original_tokens": budget.original_tokens,
+                "removed_tokens": budget.removed_tokens
+            })
+
+        # The criteria go into the system prompt, shared by the whole batch; the resume comes last
+        system_prompt, user_prompt = self.prompt_builder.build(context={"criteria": criteria}, resume=budget.text)
+
         # Use JSON mode instead of passing the Pydantic model directly
         response = await self.llm_handler.call_llm(
-            system_prompt=RESUME_RANKER_SYSTEM_PROMPT,
-            user_prompt=RESUME_RANKER_USER_PROMPT.format(resume=resume, criteria=criteria),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
             model=RESUME_RANKER_MODEL,
             response_format=ResumeRankerOutput,
             temperature=RESUME_RANKER_TEMPERATURE
         )
         final_response = ast.literal_eval(response)
-        print(final_response)
-        # print(CriteriaExtractorOutput.model_validate(response))
+        logger.debug("Resume ranked", extra={"payload": final_response})
+
+        # Report how much of the resume was sent alongside the scores
+        final_response["metadata"] = {
+            "input_tokens": budget.kept_tokens,
+            "truncated_tokens": budget.removed_tokens,
+            "sections": sections
+        }
         # Parse the JSON response and convert to the Pydantic model
         return final_response
 
@@ -0,0 +1,208 @@
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from configuration.config import RESUME_SECTIONS_MIN_CONFIDENCE, RESUME_SECTIONS_MIN_HEADINGS
+
+# Text before the first recognised heading: the candidate's name and contact details
+HEADER = "header"
+
+# Heading wordings, normalised (lowercase, "&" as "and", no punctuation), by section kind
+SECTION_HEADINGS: Dict[str, tuple] = {
+    "summary": (
+        "summary", "profile", "professional summary", "career summary", "professional profile",
+        "objective", "career objective", "about me", "about",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "relevant experience",
+        "employment", "employment history", "work history", "career history", "internships",
+    ),
+    "education": (
+        "education", "academic background", "academics", "academic qualifications",
+        "educational qualifications", "qualifications", "education and training",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core skills", "core competencies",
+        "competencies", "technologies", "tools and technologies", "skills and tools",
+    ),
+    "certifications": (
+        "certifications", "certification", "certificates", "licenses", "licenses and certifications",
+        "certifications and licenses", "courses", "courses and certifications",
+    ),
+    "projects": ("projects", "personal projects", "key projects", "academic projects"),
+    "awards": ("awards", "achievements", "honors", "honours", "awards and achievements", "accomplishments"),
+    "volunteering": ("volunteering", "volunteer experience", "extracurricular activities"),
+    "publications": ("publications",),
+    "interests": ("interests", "hobbies", "hobbies and interests"),
+    "references": ("references",),
+    "personal": ("personal details", "personal information", "declaration"),
+}
+
+# Sections each criteria category is scored from; the header is always sent
+CRITERIA_SECTIONS: Dict[str, tuple] = {
+    "required_skills": ("summary", "skills", "experience", "projects"),
+    "preferred_skills": ("summary", "skills", "experience", "projects"),
+    "certifications": ("certifications", "education"),
+    "experience": ("summary", "experience", "projects"),
+    "qualifications": ("education", "certifications"),
+    "soft_skills": ("summary", "experience", "volunteering", "awards"),
+}
+
+_HEADING_KINDS = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+_LONGEST_HEADING_WORDS = max(len(heading.split()) for heading in _HEADING_KINDS)
+_BULLETS = "-•●▪‣◦*>–"
+_NUMBERING_RE = re.compile(r"^(?:#+|\d+[.)]|[ivx]+[.)])\s*", re.IGNORECASE)
+_SPACED_LETTERS_RE = re.compile(r"^(?:\w ){2,}\w$")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+
+
+class Section(NamedTuple):
+    """
+    A run of resume lines under one heading.
+
+    Attributes:
+        kind: The section kind, e.g. "experience", or HEADER
+        text: The section's lines, including its heading
+    """
+    kind: str
+    text: str
+
+
+class Segmentation(NamedTuple):
+    """
+    A resume split into sections.
+
+    Attributes:
+        sections: The sections in document order
+        confidence: 0-1; the share of the text that falls under a recognised heading,
+            or 0 when fewer than RESUME_SECTIONS_MIN_HEADINGS kinds of heading were found
+    """
+    sections: List[Section]
+    confidence: float
+
+
+class SectionPayload(NamedTuple):
+    """
+    The resume text to send for a set of criteria.
+
+    Attributes:
+        text: The selected sections, or the full text on fallback
+        sections: Kinds of the sections sent, or None when the full text is sent
+        confidence: Confidence of the segmentation
+    """
+    text: str
+    sections: Optional[List[str]]
+    confidence: float
+
+
+class ResumeSegmenter:
+    """
+    Splits extracted resume text into sections by recognising common headings
+    (Education, Experience, Skills, Certifications, ...) and selects the
+    sections a set of criteria is scored from.
+
+    Headings are matched line by line against SECTION_HEADINGS, so the rules
+    work the same on PDF and DOCX text: upper-case, letter-spaced
+    ("E X P E R I E N C E") and numbered headings are recognised, as are
+    inline ones ("Skills: Python, SQL"); bulleted lines never are. Lines that
+    are not a known heading stay in the current section. When segmentation
+    looks unreliable, or a criterion has no known sections, the full text is
+    used instead.
+    """
+    def __init__(
+        self,
+        min_confidence: float = RESUME_SECTIONS_MIN_CONFIDENCE,
+        min_headings: int = RESUME_SECTIONS_MIN_HEADINGS
+    ):
+        self.min_confidence = min_confidence
+        self.min_headings = min_headings
+
+    @staticmethod
+    def heading_kind(line: str) -> Optional[str]:
+        """
+        Recognise a heading line.
+
+        Args:
+            line (str): One line of extracted text
+
+        Returns:
+            Optional[str]: The section kind the heading starts, or None if the line is not a heading
+        """
+        line = line.strip()
+        # Bulleted lines are list items, e.g. "Leadership" under Soft Skills
+        if not line or line[0] in _BULLETS:
+            return None
+        label = line.partition(":")[0]
+        label = _NUMBERING_RE.sub("", label).strip()
+        if not label or len(label) > 50:
+            return None
+        if _SPACED_LETTERS_RE.match(label):
+            label = label.replace(" ", "")
+        label = _NON_WORD_RE.sub(" ", label.lower().replace("&", " and "))
+        words = label.split()
+        if not words or len(words) > _LONGEST_HEADING_WORDS:
+            return None
+        return _HEADING_KINDS.get(" ".join(words))
+
+    def segment(self, text: str) -> Segmentation:
+        """
+        Split a resume into sections.
+
+        Args:
+            text (str): Text extracted from the resume
+
+        Returns:
+            Segmentation: The sections and how confident the split is
+        """
+        sections: List[Section] = []
+        kind, lines = HEADER, []
+        for line in text.splitlines():
+            heading = self.heading_kind(line)
+            if heading is None:
+                lines.append(line)
+                continue
+            if any(existing.strip() for existing in lines):
+                sections.append(Section(kind, "\n".join(lines).strip()))
+            kind, lines = heading, [line]
+        if any(existing.strip() for existing in lines):
+            sections.append(Section(kind, "\n".join(lines).strip()))
+
+        kinds = {section.kind for section in sections if section.kind != HEADER}
+        total = sum(len(section.text) for section in sections)
+        if len(kinds) < self.min_headings or not total:
+            return Segmentation(sections, 0.0)
+        header = sum(len(section.text) for section in sections if section.kind == HEADER)
+        return Segmentation(sections, 1 - header / total)
+
+    def build_payload(self, text: str, criteria: Dict[str, Any]) -> SectionPayload:
+        """
+        Select the resume sections the criteria are scored from.
+
+        Criteria without values are ignored. The full text is returned when
+        segmentation confidence is below min_confidence, when a criterion is not
+        in CRITERIA_SECTIONS, or when none of the wanted sections were found.
+
+        Args:
+            text (str): Text extracted from the resume
+            criteria (Dict[str, Any]): The job criteria, keyed by category
+
+        Returns:
+            SectionPayload: The text to send and the sections it holds
+        """
+        segmentation = self.segment(text)
+        if segmentation.confidence < self.min_confidence:
+            return SectionPayload(text, None, segmentation.confidence)
+
+        wanted = set()
+        for category, values in criteria.items():
+            if not values:
+                continue
+            if category not in CRITERIA_SECTIONS:
+                return SectionPayload(text, None, segmentation.confidence)
+            wanted.update(CRITERIA_SECTIONS[category])
+
+        selected = [section for section in segmentation.sections if section.kind == HEADER or section.kind in wanted]
+        if not any(section.kind in wanted for section in selected):
+            return SectionPayload(text, None, segmentation.confidence)
+
+        kinds = list(dict.fromkeys(section.kind for section in selected))
+        return SectionPayload("\n\n".join(section.text for section in selected), kinds, segmentation.confidence)
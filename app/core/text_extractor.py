@@ -1,8 +1,16 @@
+import asyncio
 import io
-import pymupdf
-import docx
+import zipfile
+from typing import Optional
 from fastapi import UploadFile
 
+from core.utils.tracing import traced, tracer
+
+PDF_CONTENT_TYPE = "application/pdf"
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+# Separator written after every PDF page
+PAGE_BREAK = "\f"
+
 
 class TextExtractor:
     """
@@ -10,8 +18,18 @@ class TextExtractor:
     
     This class provides methods to extract plain text from PDF and DOCX files,
     which can then be processed by other components of the application.
+
+    pymupdf and python-docx are imported on first use so that importing this
+    module stays cheap at application startup.
     """
+
+    @staticmethod
+    def warm_up() -> None:
+        """Import the document parsing libraries ahead of the first request."""
+        import pymupdf  # noqa: F401
+        import docx  # noqa: F401
     
+    @traced("text_extractor.extract_text")
     async def extract_text(self, file: UploadFile) -> str:
         """
         Extract text content from an uploaded file.
@@ -26,19 +44,76 @@ class TextExtractor:
             ValueError: If the file format is not supported
         """
         # Read the file content into memory
-        content = await file.read()
+        with tracer.span("text_extractor.read_upload") as span:
+            content = await file.read()
+            if span is not None:
+                span.set_attribute("bytes", len(content))
         text = ""
         
         # Process the file based on its content type
         if file.content_type == "application/pdf":
-            text = self._extract_from_pdf(content)
+            with tracer.span("text_extractor.parse_pdf"):
+                text = self._extract_from_pdf(content)
         elif file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            text = self._extract_from_docx(content)
+            with tracer.span("text_extractor.parse_docx"):
+                text = self._extract_from_docx(content)
         else:
             raise ValueError("Unsupported file format. Only PDF and DOCX files are supported.")
         
         # Return the extracted text
         return text
+
+    @staticmethod
+    def detect_file_type(content: bytes) -> Optional[str]:
+        """
+        Detect the document type from its magic bytes rather than a client-supplied content type.
+
+        Args:
+            content (bytes): The binary content of the document
+
+        Returns:
+            Optional[str]: PDF_CONTENT_TYPE or DOCX_CONTENT_TYPE, or None if unsupported
+        """
+        # PDF readers accept the header anywhere in the first kilobyte
+        if b"%PDF-" in content[:1024]:
+            return PDF_CONTENT_TYPE
+
+        # A DOCX is a ZIP container holding word/document.xml
+        if content[:4] == b"PK\x03\x04":
+            try:
+                with zipfile.ZipFile(io.BytesIO(content)) as container:
+                    if "word/document.xml" in container.namelist():
+                        return DOCX_CONTENT_TYPE
+            except zipfile.BadZipFile:
+                return None
+
+        return None
+
+    @traced("text_extractor.extract_text_from_bytes")
+    async def extract_text_from_bytes(self, content: bytes, content_type: Optional[str] = None) -> str:
+        """
+        Extract text content from raw document bytes, e.g. a member of an uploaded archive.
+
+        Parsing runs in a worker thread so it does not block the event loop.
+
+        Args:
+            content (bytes): The binary content of the document
+            content_type (Optional[str]): The document type; detected from the content when omitted
+
+        Returns:
+            str: The extracted text content from the document
+
+        Raises:
+            ValueError: If the file format is not supported
+        """
+        content_type = content_type or self.detect_file_type(content)
+        if content_type == PDF_CONTENT_TYPE:
+            with tracer.span("text_extractor.parse_pdf"):
+                return await asyncio.to_thread(self._extract_from_pdf, content)
+        if content_type == DOCX_CONTENT_TYPE:
+            with tracer.span("text_extractor.parse_docx"):
+                return await asyncio.to_thread(self._extract_from_docx, content)
+        raise ValueError("Unsupported file format. Only PDF and DOCX files are supported.")
     
     def _extract_from_pdf(self, content: bytes) -> str:
         """
@@ -48,16 +123,19 @@ class TextExtractor:
             content (bytes): The binary content of the PDF file
             
         Returns:
-            str: The extracted text from all pages of the PDF
+            str: The extracted text from all pages of the PDF, each followed by PAGE_BREAK
         """
+        import pymupdf
+
         # Open the PDF document from memory
         doc = pymupdf.open("pdf", content)
         text = ""
         
-        # Iterate through each page and extract text
+        # Iterate through each page and extract text; pages end with a form feed
+        # so repeated headers and footers can be told apart from the content
         for page_num in range(doc.page_count):
             page = doc.load_page(page_num)
-            text += page.get_text() + "\n"
+            text += page.get_text() + PAGE_BREAK
         
         # Close the document to free resources
         doc.close()
@@ -73,6 +151,8 @@ class TextExtractor:
         Returns:
             str: The extracted text from all paragraphs of the document
         """
+        import docx
+
         # Create a document object from the binary content
         doc = docx.Document(io.BytesIO(content))
         text = ""
@@ -0,0 +1,245 @@
+import re
+from collections import Counter
+from typing import List, NamedTuple, Sequence
+
+from configuration.config import TEXT_NORMALIZATION_STEPS, RESUME_RANKER_MODEL
+from core.text_extractor import PAGE_BREAK
+from core.utils.token_budget import count_tokens
+
+# Steps in the order they run
+NORMALIZATION_STEPS = ("page_furniture", "bullets", "hyphenation", "wrapped_lines", "contact_info", "whitespace")
+
+# Lines at least this long that end mid-sentence were wrapped at the page margin
+_WRAP_MIN_CHARS = 40
+# Lines at the top and bottom of each page checked for repeated headers and footers
+_PAGE_EDGE_LINES = 3
+# Whole words that start hyphenated compounds ("self-motivated"); a line ending in one of
+# them followed by a hyphen keeps the hyphen when rejoined
+_COMPOUND_HEADS = frozenset((
+    "self", "well", "cross", "full", "part", "high", "long", "short", "real", "non", "multi",
+    "team", "client", "customer", "data", "detail", "results", "goal", "fast", "hands",
+    "problem", "decision", "time", "cost", "user", "open", "senior", "entry", "world", "state",
+    "best", "large", "small", "low", "end", "front", "back", "cloud", "award", "mission",
+))
+
+_BULLET_GLYPHS = "•●▪‣◦■□➢➤►✓✔⁃∙·"
+_BULLET_RE = re.compile(f"^[{_BULLET_GLYPHS}]\\s*")
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?[-–\s]*\d+[-–\s]*(?:(?:of|/)\s*\d+)?$", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACES_RE = re.compile(r"[ \t\u00a0]+")
+_LINE_EDGE_SPACES_RE = re.compile(r" ?\n ?")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github)\.com/\S*", re.IGNORECASE)
+_PHONE_RE = re.compile(r"\+?\(?\d[\d\s().-]{7,}\d")
+_CONTACT_LABELS_RE = re.compile(
+    r"\b(?:e-?mail|phone|mobile|mob|tel|cell|contact|linkedin|github|portfolio|website)\b\s*[.:]?", re.IGNORECASE
+)
+_SEPARATORS_RE = re.compile(r"^[\s|,;:/•·\-–]*$")
+_EDGE_SEPARATORS_RE = re.compile(r"^[\s|,;•·]+|[\s|,;•·]+$")
+_REPEATED_SEPARATORS_RE = re.compile(r"\s*[|•·](?:\s*[|•·])+\s*")
+
+
+class NormalizationResult(NamedTuple):
+    """
+    Outcome of normalizing an extracted text.
+
+    Attributes:
+        text: The normalized text
+        original_tokens: Token count of the extracted text
+        normalized_tokens: Token count of the normalized text
+        saved_tokens: Tokens removed by normalization
+    """
+    text: str
+    original_tokens: int
+    normalized_tokens: int
+    saved_tokens: int
+
+
+class TextNormalizer:
+    """
+    Compacts text extracted from PDF and DOCX documents before it is sent to the LLM.
+
+    Extraction keeps layout artefacts that cost tokens without carrying
+    content: headers, footers and page numbers repeated on every page, words
+    hyphenated or lines wrapped at the margin, bullet glyphs, whitespace runs
+    and contact details. Each artefact is handled by one step; the steps to run
+    are configurable and always run in NORMALIZATION_STEPS order.
+
+    Steps:
+        page_furniture: Drop lines repeated at the top or bottom of most pages (keeping
+            their first occurrence, which often holds the candidate's name) and page numbers
+        bullets: Write bullet glyphs as "- " and join bullets extracted on their own line
+        hyphenation: Rejoin words hyphenated across a wrapped line. The hyphen is kept after
+            the whole words in _COMPOUND_HEADS ("self-" + "motivated"); other compounds wrapped
+            at their hyphen ("fault-" + "tolerant") lose it, the price of rejoining split words
+        wrapped_lines: Join lines wrapped mid-sentence
+        contact_info: Drop e-mail addresses, phone numbers, profile URLs and their labels
+        whitespace: Collapse runs of spaces and blank lines
+    """
+    def __init__(self, steps: Sequence[str] = TEXT_NORMALIZATION_STEPS):
+        unknown = set(steps) - set(NORMALIZATION_STEPS)
+        if unknown:
+            raise ValueError(f"Unknown text normalization steps: {', '.join(sorted(unknown))}")
+        self.steps = [step for step in NORMALIZATION_STEPS if step in steps]
+
+    def normalize_text(self, text: str) -> str:
+        """
+        Run the configured steps on a text.
+
+        Args:
+            text (str): Text as returned by the text extractor
+
+        Returns:
+            str: The normalized text
+        """
+        for step in self.steps:
+            text = getattr(self, f"_{step}")(text)
+        return text
+
+    def normalize(self, text: str, model: str = RESUME_RANKER_MODEL) -> NormalizationResult:
+        """
+        Normalize a text and measure how many tokens it saves.
+
+        Args:
+            text (str): Text as returned by the text extractor
+            model (str): The model whose tokenizer applies
+
+        Returns:
+            NormalizationResult: The normalized text and its token counts
+        """
+        normalized = self.normalize_text(text)
+        original_tokens = count_tokens(text, model)
+        normalized_tokens = count_tokens(normalized, model)
+        return NormalizationResult(normalized, original_tokens, normalized_tokens, original_tokens - normalized_tokens)
+
+    @staticmethod
+    def _page_furniture(text: str) -> str:
+        pages = text.split(PAGE_BREAK)
+        if pages and not pages[-1].strip():
+            pages.pop()
+        if len(pages) < 2:
+            return text
+
+        def key(line: str) -> str:
+            return _DIGITS_RE.sub("#", _SPACES_RE.sub(" ", line.strip().lower()))
+
+        def edges(lines: List[str]) -> List[int]:
+            content = [i for i, line in enumerate(lines) if line.strip()]
+            return content[:_PAGE_EDGE_LINES] + content[-_PAGE_EDGE_LINES:]
+
+        page_lines = [page.split("\n") for page in pages]
+        counts = Counter()
+        for lines in page_lines:
+            counts.update({key(lines[i]) for i in edges(lines)})
+        # Furniture appears on at least half of the pages
+        repeated = {line for line, count in counts.items() if count >= max(2, (len(pages) + 1) // 2)}
+
+        kept_pages, seen = [], set()
+        for lines in page_lines:
+            dropped = set()
+            for i in edges(lines):
+                line_key = key(lines[i])
+                if _PAGE_NUMBER_RE.match(lines[i].strip()):
+                    dropped.add(i)
+                elif line_key in repeated:
+                    if line_key in seen:
+                        dropped.add(i)
+                    seen.add(line_key)
+            kept_pages.append("\n".join(line for i, line in enumerate(lines) if i not in dropped))
+        return PAGE_BREAK.join(kept_pages)
+
+    @staticmethod
+    def _bullets(text: str) -> str:
+        lines = text.split("\n")
+        result: List[str] = []
+        pending = False
+        for line in lines:
+            stripped = line.strip()
+            if pending:
+                if stripped:
+                    result.append("- " + stripped)
+                    pending = False
+                continue
+            if stripped and stripped[0] in _BULLET_GLYPHS:
+                rest = _BULLET_RE.sub("", stripped)
+                if rest:
+                    result.append("- " + rest)
+                else:
+                    # PDF extraction often puts the glyph on its own line
+                    pending = True
+                continue
+            result.append(line)
+        return "\n".join(result)
+
+    @staticmethod
+    def _join_lines(text: str, hyphenated: bool) -> str:
+        lines = text.split("\n")
+        result: List[str] = []
+        for line in lines:
+            stripped = line.strip()
+            if result and stripped and stripped[0].islower():
+                previous = result[-1].rstrip()
+                if len(previous.lstrip()) >= _WRAP_MIN_CHARS:
+                    if hyphenated and re.search(r"[a-z]-$", previous):
+                        head = previous[:-1].rsplit(None, 1)[-1].lstrip("(\"'").lower()
+                        result[-1] = (previous if head in _COMPOUND_HEADS else previous[:-1]) + stripped
+                        continue
+                    if not hyphenated and previous[-1] not in ".!?:;":
+                        result[-1] = previous + " " + stripped
+                        continue
+            result.append(line)
+        return "\n".join(result)
+
+    def _hyphenation(self, text: str) -> str:
+        return self._join_lines(text, hyphenated=True)
+
+    def _wrapped_lines(self, text: str) -> str:
+        return self._join_lines(text, hyphenated=False)
+
+    @staticmethod
+    def _contact_info(text: str) -> str:
+        result = []
+        for line in text.split("\n"):
+            # Substring checks first: most lines hold no contact details and skip the regexes
+            cleaned = _EMAIL_RE.sub("", line) if "@" in line else line
+            if "://" in cleaned or "www." in cleaned or ".com/" in cleaned:
+                cleaned = _URL_RE.sub("", cleaned)
+
+            def strip_phone(match: re.Match) -> str:
+                is_contact_line = cleaned != line or _CONTACT_LABELS_RE.search(line) is not None
+                return "" if _is_phone(match.group(), is_contact_line) else match.group()
+
+            cleaned = _PHONE_RE.sub(strip_phone, cleaned)
+            if cleaned == line:
+                result.append(line)
+                continue
+            cleaned = _CONTACT_LABELS_RE.sub("", cleaned)
+            # Keep what is left of the line (e.g. the candidate's name), minus dangling separators
+            if not _SEPARATORS_RE.match(cleaned):
+                result.append(_EDGE_SEPARATORS_RE.sub("", _REPEATED_SEPARATORS_RE.sub(" | ", cleaned)))
+        return "\n".join(result)
+
+    @staticmethod
+    def _whitespace(text: str) -> str:
+        text = _SPACES_RE.sub(" ", text.replace(PAGE_BREAK, "\n\n"))
+        text = _LINE_EDGE_SPACES_RE.sub("\n", text)
+        return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+def _is_phone(candidate: str, is_contact_line: bool) -> bool:
+    """
+    Tell a phone number from other digit runs, such as "2018 - 2020" or "GPA 3.8 4.0".
+
+    Args:
+        candidate (str): A run of digits, spaces and punctuation
+        is_contact_line (bool): Whether the line also holds an e-mail, URL or contact label
+    """
+    groups = _DIGITS_RE.findall(candidate)
+    digits = sum(len(group) for group in groups)
+    if not 9 <= digits <= 15:
+        return False
+    if candidate.startswith("+") or is_contact_line:
+        return True
+    if all(len(group) == 4 and group[:2] in ("19", "20") for group in groups):
+        return False
+    return all(len(group) >= 3 for group in groups)
@@ -0,0 +1,261 @@
+import asyncio
+import itertools
+import math
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from configuration.config import (
+    ADMISSION_MAX_CONCURRENT_BATCHES,
+    ADMISSION_MAX_QUEUED_ITEMS,
+    ADMISSION_MAX_FILES_PER_REQUEST,
+    ADMISSION_MAX_REQUEST_BYTES,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_PER_TENANT_MAX_CONCURRENT
+)
+
+# Spelled out: Starlette renamed its 413 constant, and neither name exists in every supported version
+HTTP_413_CONTENT_TOO_LARGE = 413
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted.
+
+    Attributes:
+        status_code: 413 for oversized requests, 429 when the queue wait timed out,
+            503 when the service is saturated
+        retry_after: Suggested seconds to wait before retrying, if any
+        detail: Human-readable reason
+    """
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds the work the scoring API accepts, so overload turns into fast
+    429/503 responses instead of memory exhaustion.
+
+    Each batch request holds one of `max_concurrent_batches` slots while it
+    runs. Requests that cannot run yet wait in a per-tenant queue for at most
+    `queue_timeout` seconds; freed slots go to the waiting tenant with the
+    fewest running batches (earliest request first on ties), so one tenant's
+    burst cannot starve the others. The number of items (resumes or job
+    descriptions) running or waiting is capped by `max_queued_items`.
+
+    Limits apply per worker process, since each process has its own memory.
+    """
+    def __init__(
+        self,
+        max_concurrent_batches: int = ADMISSION_MAX_CONCURRENT_BATCHES,
+        max_queued_items: int = ADMISSION_MAX_QUEUED_ITEMS,
+        max_files_per_request: int = ADMISSION_MAX_FILES_PER_REQUEST,
+        max_request_bytes: int = ADMISSION_MAX_REQUEST_BYTES,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        per_tenant_max_concurrent: int = ADMISSION_PER_TENANT_MAX_CONCURRENT
+    ):
+        self.max_concurrent_batches = max_concurrent_batches
+        self.max_queued_items = max_queued_items
+        self.max_files_per_request = max_files_per_request
+        self.max_request_bytes = max_request_bytes
+        self.queue_timeout = queue_timeout
+        self.per_tenant_max_concurrent = per_tenant_max_concurrent
+
+        self._active = 0
+        self._queued_items = 0
+        self._tenant_active: Dict[str, int] = defaultdict(int)
+        self._waiting: Dict[str, Deque[Tuple[int, asyncio.Future]]] = {}
+        self._sequence = itertools.count()
+        # Moving average of how long a batch holds its slot, used for Retry-After
+        self._avg_batch_seconds = 30.0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the current number of running batches, waiting batches and queued items."""
+        return {
+            "active_batches": self._active,
+            "waiting_batches": sum(len(waiters) for waiters in self._waiting.values()),
+            "queued_items": self._queued_items,
+        }
+
+    def check_request(self, file_count: int, total_bytes: int) -> None:
+        """
+        Enforce the per-request file count and size limits.
+
+        Raises:
+            AdmissionRejected: 413 if the request carries too many files or bytes
+        """
+        if file_count > self.max_files_per_request:
+            raise AdmissionRejected(
+                HTTP_413_CONTENT_TOO_LARGE,
+                f"At most {self.max_files_per_request} files can be uploaded per request."
+            )
+        if total_bytes > self.max_request_bytes:
+            raise AdmissionRejected(
+                HTTP_413_CONTENT_TOO_LARGE,
+                f"At most {self.max_request_bytes} bytes can be uploaded per request."
+            )
+
+    def _retry_after(self) -> int:
+        waiting = self.stats()["waiting_batches"]
+        return max(1, math.ceil(self._avg_batch_seconds * (waiting + 1) / self.max_concurrent_batches))
+
+    def _can_run(self, tenant: str) -> bool:
+        if self._active >= self.max_concurrent_batches:
+            return False
+        return not self.per_tenant_max_concurrent or self._tenant_active[tenant] < self.per_tenant_max_concurrent
+
+    def _grant(self, tenant: str) -> None:
+        self._active += 1
+        self._tenant_active[tenant] += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting requests, fairest tenant first."""
+        while self._waiting:
+            # Drop waiters that timed out or were cancelled
+            for tenant in list(self._waiting):
+                waiters = self._waiting[tenant]
+                while waiters and waiters[0][1].done():
+                    waiters.popleft()
+                if not waiters:
+                    del self._waiting[tenant]
+
+            eligible = [tenant for tenant in self._waiting if self._can_run(tenant)]
+            if not eligible:
+                return
+            tenant = min(eligible, key=lambda t: (self._tenant_active[t], self._waiting[t][0][0]))
+            _, future = self._waiting[tenant].popleft()
+            self._grant(tenant)
+            future.set_result(None)
+
+    def _release(self, tenant: str, items: int, held_seconds: Optional[float] = None) -> None:
+        self._active -= 1
+        self._tenant_active[tenant] -= 1
+        if not self._tenant_active[tenant]:
+            del self._tenant_active[tenant]
+        self._queued_items -= items
+        if held_seconds is not None:
+            self._avg_batch_seconds = 0.8 * self._avg_batch_seconds + 0.2 * held_seconds
+        self._dispatch()
+
+    async def acquire(self, tenant: str, items: int) -> Callable[[], None]:
+        """
+        Wait for a batch slot.
+
+        Args:
+            tenant (str): Tenant the request belongs to, used for fair queuing
+            items (int): Number of resumes or documents the batch carries
+
+        Returns:
+            Callable[[], None]: Function to call exactly once when the batch is done
+
+        Raises:
+            AdmissionRejected: 503 if too many items are already queued,
+                429 if no slot became free within the queue timeout
+        """
+        if self._queued_items + items > self.max_queued_items:
+            raise AdmissionRejected(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "The service is processing too many documents, please retry later.",
+                self._retry_after()
+            )
+        self._queued_items += items
+
+        if not self._waiting and self._can_run(tenant):
+            self._grant(tenant)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(tenant, deque()).append((next(self._sequence), future))
+            # A slot may already be free if the queue only held abandoned waiters
+            self._dispatch()
+            try:
+                await asyncio.wait_for(future, self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._queued_items -= items
+                raise AdmissionRejected(
+                    status.HTTP_429_TOO_MANY_REQUESTS,
+                    "Too many concurrent scoring requests, please retry later.",
+                    self._retry_after()
+                )
+            except BaseException:
+                # Cancelled while waiting; give the slot back if it was granted in the meantime
+                if future.done() and not future.cancelled():
+                    self._release(tenant, items)
+                else:
+                    self._queued_items -= items
+                raise
+
+        started = time.monotonic()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._release(tenant, items, time.monotonic() - started)
+
+        return release
+
+    def admit(self, tenant: str, items: int) -> "_Admission":
+        """
+        Async context manager holding a batch slot for the duration of the block.
+
+        Args:
+            tenant (str): Tenant the request belongs to
+            items (int): Number of resumes or documents the batch carries
+        """
+        return _Admission(self, tenant, items)
+
+
+class _Admission:
+    def __init__(self, controller: AdmissionController, tenant: str, items: int):
+        self.controller = controller
+        self.tenant = tenant
+        self.items = items
+        self.release = None
+
+    async def __aenter__(self):
+        self.release = await self.controller.acquire(self.tenant, self.items)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+        return False
+
+
+def admission_rejected_response(error: AdmissionRejected) -> JSONResponse:
+    """Build the JSON error response for a rejected request, with Retry-After when known."""
+    headers = {"Retry-After": str(error.retry_after)} if error.retry_after else None
+    return JSONResponse(
+        status_code=error.status_code,
+        content={"data": {}, "message": "Request not admitted", "error": error.detail},
+        headers=headers
+    )
+
+
+class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Rejects uploads whose declared Content-Length exceeds the per-request byte
+    limit before the multipart body is read. Requests without a length are
+    checked after parsing, from the uploaded file sizes.
+    """
+    def __init__(self, app, max_request_bytes: int = ADMISSION_MAX_REQUEST_BYTES):
+        super().__init__(app)
+        self.max_request_bytes = max_request_bytes
+
+    async def dispatch(self, request: Request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_request_bytes:
+            return admission_rejected_response(AdmissionRejected(
+                HTTP_413_CONTENT_TOO_LARGE,
+                f"At most {self.max_request_bytes} bytes can be uploaded per request."
+            ))
+        return await call_next(request)
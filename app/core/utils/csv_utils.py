@@ -1,13 +1,17 @@
 import csv
 import os
+import uuid
 from typing import List, Dict, Any
 from datetime import datetime
 
+from core.utils.tracing import traced
+
 class CSVUtils:
     """
     Utility class for creating CSV files from candidate scores.
     """
     @staticmethod
+    @traced("csv_utils.create_csv")
     def create_csv(data: List[Dict[str, Any]]) -> str:
         """
         Creates a CSV file from a list of dictionaries containing candidate scores.
@@ -36,9 +40,9 @@ class CSVUtils:
         output_dir = "output_files"
         os.makedirs(output_dir, exist_ok=True)
         
-        # Generate a unique filename with timestamp
+        # Generate a unique filename; the random suffix keeps concurrent batches finished in the same second apart
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        csv_filename = f"{output_dir}/resume_scores_{timestamp}.csv"
+        csv_filename = f"{output_dir}/resume_scores_{timestamp}_{uuid.uuid4().hex[:12]}.csv"
         
         # Extract all unique criteria from the data
         all_criteria = set()
@@ -53,6 +57,14 @@ class CSVUtils:
             # Convert criteria to title case for the header
             title_case_criteria = [criteria.replace('_', ' ').title() for criteria in all_criteria]
             fieldnames = ['Candidate Name'] + title_case_criteria + ['Total Score']
+
+            # Near-duplicate markers are only added as columns when present in the batch
+            optional_columns = {'duplicate_of': 'Duplicate Of', 'previously_seen_in': 'Previously Seen In'}
+            optional_columns = {
+                key: title for key, title in optional_columns.items()
+                if any(candidate.get(key) for candidate in data)
+            }
+            fieldnames += list(optional_columns.values())
             
             # Create a mapping from original criteria to title case criteria
             criteria_mapping = {orig: title for orig, title in zip(all_criteria, title_case_criteria)}
@@ -82,6 +94,8 @@ class CSVUtils:
                 
                 # Format total score as score/total
                 row['Total Score'] = f"{total_score}/{max_possible_score}"
+                for key, title in optional_columns.items():
+                    row[title] = candidate.get(key) or ''
                 writer.writerow(row)
         
         return csv_filename
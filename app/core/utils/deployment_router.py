@@ -0,0 +1,264 @@
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from configuration.config import (
+    LLM_DEPLOYMENTS,
+    OPENAI_API_KEYS,
+    LLM_RPM_LIMIT,
+    LLM_DEPLOYMENT_FAILURE_THRESHOLD,
+    LLM_DEPLOYMENT_COOLDOWN_SECONDS,
+    CRITERIA_EXTRACTOR_MODEL,
+    RESUME_RANKER_MODEL
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors that say the deployment itself is unusable for now, not that the request was bad
+_COOLDOWN_STATUS_CODES = {401, 403, 429}
+# Errors caused by the request; another deployment would fail the same way
+_REQUEST_ERROR_STATUS_CODES = {400, 404, 413, 422}
+
+
+class Deployment:
+    """
+    One place an LLM call can be sent: a model on an endpoint with an API key.
+
+    Attributes:
+        name: Unique name, also used for the deployment's shared rate limit
+        model_group: The model name callers ask for, e.g. "gpt-4o-mini"
+        model: The litellm model string sent to the provider, e.g. "azure/ranker-eu"
+        api_key: API key, or None for the provider's default
+        api_base: Endpoint URL, or None for the provider's default
+        rpm: Requests-per-minute quota, 0 if unlimited
+        tpm: Tokens-per-minute quota, 0 if unlimited
+    """
+    def __init__(
+        self,
+        name: str,
+        model_group: str,
+        model: str,
+        api_key: Optional[str] = None,
+        api_base: Optional[str] = None,
+        rpm: int = 0,
+        tpm: int = 0
+    ):
+        self.name = name
+        self.model_group = model_group
+        self.model = model
+        self.api_key = api_key
+        self.api_base = api_base
+        self.rpm = rpm
+        self.tpm = tpm
+
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._window = 0
+        self._window_requests = 0
+        self._window_tokens = 0
+
+    @classmethod
+    def from_config(cls, entry: Dict[str, Any]) -> "Deployment":
+        """
+        Build a deployment from an LLM_DEPLOYMENTS entry.
+
+        The key is read from the environment variable named by `api_key_env`
+        when given, so keys need not be written into the JSON itself.
+
+        Raises:
+            ValueError: If the entry lacks a name or a model
+        """
+        if not entry.get("name") or not entry.get("model"):
+            raise ValueError(f"LLM deployment needs a name and a model: {entry}")
+        api_key = entry.get("api_key")
+        if entry.get("api_key_env"):
+            api_key = os.getenv(entry["api_key_env"])
+        return cls(
+            name=entry["name"],
+            model_group=entry.get("model_group", entry["model"]),
+            model=entry["model"],
+            api_key=api_key,
+            api_base=entry.get("api_base"),
+            rpm=int(entry.get("rpm", 0)),
+            tpm=int(entry.get("tpm", 0))
+        )
+
+    def _roll_window(self, now: float) -> None:
+        window = int(now // 60)
+        if window != self._window:
+            self._window = window
+            self._window_requests = 0
+            self._window_tokens = 0
+
+    def remaining_quota(self, now: float) -> float:
+        """Fraction of this minute's request and token quota still unused (1.0 when unlimited)."""
+        self._roll_window(now)
+        remaining = 1.0
+        if self.rpm:
+            remaining = min(remaining, 1 - self._window_requests / self.rpm)
+        if self.tpm:
+            remaining = min(remaining, 1 - self._window_tokens / self.tpm)
+        return max(remaining, 0.0)
+
+    def record_request(self, now: float) -> None:
+        """Count a request against this minute's quota."""
+        self._roll_window(now)
+        self._window_requests += 1
+
+    def record_tokens(self, tokens: int, now: float) -> None:
+        """Count used tokens against this minute's quota."""
+        self._roll_window(now)
+        self._window_tokens += tokens
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "model_group": self.model_group,
+            "model": self.model,
+            "healthy": self.is_healthy(now),
+            "cooldown_seconds": max(0.0, round(self.cooldown_until - now, 1)),
+            "in_flight": self.in_flight,
+            "consecutive_failures": self.consecutive_failures,
+            "remaining_quota": round(self.remaining_quota(now), 3),
+        }
+
+
+class DeploymentRouter:
+    """
+    Balances LLM calls over a pool of deployments serving the same model group.
+
+    Each call goes to the healthy deployment with the fewest calls in flight,
+    preferring the one with the most quota left this minute on ties. Failing
+    deployments are put in cooldown: immediately on rate-limit or
+    authentication errors, otherwise after `failure_threshold` consecutive
+    failures. The caller then fails over to the next deployment. Health and
+    quota are tracked per worker process.
+    """
+    def __init__(
+        self,
+        deployments: Iterable[Deployment] = (),
+        failure_threshold: int = LLM_DEPLOYMENT_FAILURE_THRESHOLD,
+        cooldown_seconds: float = LLM_DEPLOYMENT_COOLDOWN_SECONDS
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.deployments: List[Deployment] = []
+        self._groups: Dict[str, List[Deployment]] = defaultdict(list)
+        for deployment in deployments:
+            self.add(deployment)
+
+    @classmethod
+    def from_config(cls) -> "DeploymentRouter":
+        """
+        Build the router from LLM_DEPLOYMENTS and OPENAI_API_KEYS.
+
+        Each key in OPENAI_API_KEYS adds one deployment per configured OpenAI
+        model, with LLM_RPM_LIMIT as its quota.
+        """
+        router = cls(Deployment.from_config(entry) for entry in LLM_DEPLOYMENTS)
+        for model in sorted({CRITERIA_EXTRACTOR_MODEL, RESUME_RANKER_MODEL}):
+            for index, api_key in enumerate(OPENAI_API_KEYS):
+                router.add(Deployment(f"{model}-key{index + 1}", model, model, api_key=api_key, rpm=LLM_RPM_LIMIT))
+        return router
+
+    def add(self, deployment: Deployment) -> None:
+        """Add a deployment to the pool of its model group."""
+        if any(existing.name == deployment.name for existing in self.deployments):
+            raise ValueError(f"Duplicate LLM deployment name: {deployment.name}")
+        self.deployments.append(deployment)
+        self._groups[deployment.model_group].append(deployment)
+
+    def has_group(self, model_group: str) -> bool:
+        """Whether any deployment serves the model group."""
+        return model_group in self._groups
+
+    def acquire(self, model_group: str, exclude: Iterable[str] = (), avoid: Iterable[str] = ()) -> Optional[Deployment]:
+        """
+        Pick a deployment for a call and count the call as in flight.
+
+        Args:
+            model_group (str): The model name the caller asked for
+            exclude (Iterable[str]): Deployment names that must not be used, e.g. ones
+                that already failed this call
+            avoid (Iterable[str]): Deployment names to use only when nothing else is
+                available, e.g. the one a hedged call is already running on
+
+        Returns:
+            Optional[Deployment]: The chosen deployment, or None if every deployment
+                of the group is excluded. When all remaining deployments are cooling
+                down, the one whose cooldown ends first is returned.
+        """
+        now = time.time()
+        exclude, avoid = set(exclude), set(avoid)
+        available = [deployment for deployment in self._groups.get(model_group, ()) if deployment.name not in exclude]
+        if not available:
+            return None
+
+        candidates = [deployment for deployment in available if deployment.is_healthy(now)]
+        if candidates:
+            deployment = min(candidates, key=lambda d: (
+                d.name in avoid,
+                d.in_flight,
+                -d.remaining_quota(now)
+            ))
+        else:
+            # Everything is cooling down; try the deployment that recovers first rather than failing outright
+            deployment = min(available, key=lambda d: d.cooldown_until)
+        deployment.in_flight += 1
+        deployment.record_request(now)
+        return deployment
+
+    def release(self, deployment: Deployment, tokens: int = 0, error: Optional[BaseException] = None) -> None:
+        """
+        Record the outcome of a call made on a deployment.
+
+        Args:
+            deployment (Deployment): The deployment returned by acquire
+            tokens (int): Tokens the call used, counted against the deployment's quota
+            error (Optional[BaseException]): The call's error, None if it succeeded.
+                Cancellations and request errors do not count against the deployment.
+        """
+        now = time.time()
+        deployment.in_flight -= 1
+        deployment.record_tokens(tokens, now)
+
+        if error is None:
+            deployment.consecutive_failures = 0
+            return
+        if not is_deployment_error(error):
+            return
+
+        deployment.consecutive_failures += 1
+        status_code = getattr(error, "status_code", None)
+        if status_code in _COOLDOWN_STATUS_CODES or deployment.consecutive_failures >= self.failure_threshold:
+            deployment.cooldown_until = now + self.cooldown_seconds
+            logger.warning("LLM deployment cooling down", extra={
+                "deployment": deployment.name,
+                "status_code": status_code,
+                "error": str(error),
+                "cooldown_seconds": self.cooldown_seconds
+            })
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return the health, load and remaining quota of every deployment."""
+        now = time.time()
+        return [deployment.stats(now) for deployment in self.deployments]
+
+
+def is_deployment_error(error: BaseException) -> bool:
+    """
+    Whether an LLM error may succeed on another deployment.
+
+    Errors caused by the request itself (bad request, unknown model, context
+    window exceeded) and cancellations are not; rate limits, authentication,
+    timeouts, connection and server errors are.
+    """
+    if not isinstance(error, Exception):
+        return False
+    return getattr(error, "status_code", None) not in _REQUEST_ERROR_STATUS_CODES
@@ -0,0 +1,295 @@
+import abc
+import importlib.util
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from configuration.config import EXPORT_CHUNK_ROWS, MAX_CRITERIA_SCORE, RESUME_RANKER_MODEL
+from core.utils.tracing import traced
+
+OUTPUT_DIR = "output_files"
+
+
+class ExportFormat(NamedTuple):
+    """
+    A downloadable result format.
+
+    Attributes:
+        extension: File extension, without the dot
+        media_type: MIME type of the response
+        requires: Module that must be installed to write the format, if any
+    """
+    extension: str
+    media_type: str
+    requires: Optional[str] = None
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("csv", "text/csv"),
+    "parquet": ExportFormat("parquet", "application/vnd.apache.parquet", "pyarrow"),
+    "arrow": ExportFormat("arrow", "application/vnd.apache.arrow.file", "pyarrow"),
+    "xlsx": ExportFormat("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+}
+
+
+def check_export_format(export_format: str) -> ExportFormat:
+    """
+    Validate a requested export format before any work is done.
+
+    Args:
+        export_format (str): The format name, e.g. "parquet"
+
+    Returns:
+        ExportFormat: The format's extension and media type
+
+    Raises:
+        ValueError: If the format is unknown or its library is not installed
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {export_format}. Choose one of: {', '.join(EXPORT_FORMATS)}.")
+    export = EXPORT_FORMATS[export_format]
+    if export.requires and importlib.util.find_spec(export.requires) is None:
+        raise ValueError(f"The {export_format} export format requires the {export.requires} package.")
+    return export
+
+
+def criteria_names(results: Iterable[Dict[str, Any]]) -> List[str]:
+    """Return the sorted criteria scored across all results."""
+    return sorted({item["criteria"] for result in results for item in result.get("scores", [])})
+
+
+def result_rows(
+    results: Iterable[Dict[str, Any]],
+    criteria: Sequence[str],
+    job_id: str,
+    names: Optional[Sequence[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten ranking results into typed rows, one per candidate.
+
+    Totals follow the CSV export: the sum of the scores given and the maximum
+    possible for the criteria scored. Criteria the ranker did not score are None.
+
+    Args:
+        results (Iterable[Dict[str, Any]]): Ranking results as returned by the ranker
+        criteria (Sequence[str]): Criteria to give a score column each
+        job_id (str): The scoring job the results belong to
+        names (Optional[Sequence[str]]): File or archive member name of each result
+
+    Yields:
+        Dict[str, Any]: The row, keyed by column name
+    """
+    for index, result in enumerate(results):
+        score_items = result.get("scores", [])
+        scores = {item["criteria"]: item["score"] for item in score_items}
+        total_score = sum(item["score"] for item in score_items)
+        max_score = MAX_CRITERIA_SCORE * len(score_items)
+        metadata = result.get("metadata") or {}
+
+        row = {
+            "job_id": job_id,
+            "resume": names[index] if names is not None else None,
+            "candidate_name": result.get("candidate_name", "Unknown"),
+        }
+        for criterion in criteria:
+            row[f"score_{criterion}"] = scores.get(criterion)
+        row.update({
+            "total_score": total_score,
+            "max_score": max_score,
+            "score_ratio": total_score / max_score if max_score else None,
+            "input_tokens": metadata.get("input_tokens"),
+            "truncated_tokens": metadata.get("truncated_tokens"),
+            "normalization_saved_tokens": metadata.get("normalization_saved_tokens"),
+            "duplicate_of": result.get("duplicate_of"),
+            "previously_seen_in": result.get("previously_seen_in"),
+        })
+        yield row
+
+
+class ResultExporter(abc.ABC):
+    """
+    Base class for typed result files.
+
+    Rows are buffered and handed to the format in chunks of `chunk_size`, so
+    the writer holds one chunk at a time; the rows themselves come from the
+    batch's results, which are in memory already. Subclasses implement
+    _write_chunk and _close.
+    """
+    def __init__(self, path: str, criteria: Sequence[str], metadata: Dict[str, str], chunk_size: int = EXPORT_CHUNK_ROWS):
+        """
+        Args:
+            path (str): File to write
+            criteria (Sequence[str]): Criteria that get a score column each
+            metadata (Dict[str, str]): Batch metadata stored alongside the rows
+            chunk_size (int): Rows per written chunk (Parquet row group, Arrow record batch)
+        """
+        self.path = path
+        self.criteria = list(criteria)
+        self.metadata = metadata
+        self.chunk_size = chunk_size
+        self.columns = (
+            ["job_id", "resume", "candidate_name"]
+            + [f"score_{criterion}" for criterion in self.criteria]
+            + ["total_score", "max_score", "score_ratio", "input_tokens", "truncated_tokens", "normalization_saved_tokens"]
+            + ["duplicate_of", "previously_seen_in"]
+        )
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Write rows in chunks.
+
+        Returns:
+            int: Number of rows written
+        """
+        count = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk)
+            count += len(chunk)
+        return count
+
+    def close(self) -> None:
+        """Finish the file."""
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @abc.abstractmethod
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        """Write one chunk of rows."""
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        """Finish the file, writing the batch metadata."""
+
+
+class ArrowExporter(ResultExporter):
+    """Writes an Arrow IPC file with one record batch per chunk; batch metadata goes into the schema."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        import pyarrow as pa
+
+        self._pa = pa
+        text, score, count = pa.string(), pa.int16(), pa.int32()
+        types = {"score_ratio": pa.float64(), "total_score": count, "max_score": count}
+        types.update({column: count for column in ("input_tokens", "truncated_tokens", "normalization_saved_tokens")})
+        types.update({f"score_{criterion}": score for criterion in self.criteria})
+        self.schema = pa.schema(
+            [pa.field(column, types.get(column, text)) for column in self.columns],
+            metadata={key: str(value) for key, value in self.metadata.items()}
+        )
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        return self._pa.ipc.new_file(self.path, self.schema)
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.write_batch(self._pa.RecordBatch.from_pylist(rows, schema=self.schema))
+
+    def _close(self) -> None:
+        self._writer.close()
+
+
+class ParquetExporter(ArrowExporter):
+    """Writes a zstd-compressed Parquet file with one row group per chunk."""
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, self.schema, compression="zstd")
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self.schema))
+
+
+class XLSXExporter(ResultExporter):
+    """
+    Writes an Excel workbook with a typed Results sheet and a Metadata sheet.
+
+    openpyxl's write-only mode streams rows to disk, keeping memory bounded.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Results")
+        self._sheet.append(self.columns)
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._sheet.append([row.get(column) for column in self.columns])
+
+    def _close(self) -> None:
+        metadata_sheet = self._workbook.create_sheet("Metadata")
+        for key, value in self.metadata.items():
+            metadata_sheet.append([key, str(value)])
+        self._workbook.save(self.path)
+
+
+_EXPORTERS = {"parquet": ParquetExporter, "arrow": ArrowExporter, "xlsx": XLSXExporter}
+
+
+@traced("exporters.export_results")
+def export_results(
+    results: List[Dict[str, Any]],
+    export_format: str,
+    job_id: str,
+    requested_criteria: Optional[Dict[str, Any]] = None,
+    names: Optional[Sequence[str]] = None
+) -> str:
+    """
+    Write ranking results to a typed file (Parquet, Arrow or XLSX).
+
+    The CSV format is produced by CSVUtils.create_csv instead. Rows are built
+    from the results list as they are written, but the list itself is held for
+    the whole export, so peak memory grows with the batch size.
+
+    Args:
+        results (List[Dict[str, Any]]): Ranking results as returned by the ranker
+        export_format (str): "parquet", "arrow" or "xlsx"
+        job_id (str): The scoring job, stored in every row and in the metadata
+        requested_criteria (Optional[Dict[str, Any]]): The job criteria the batch was scored against
+        names (Optional[Sequence[str]]): File or archive member name of each result
+
+    Returns:
+        str: Path to the created file
+
+    Raises:
+        ValueError: If the format is not a typed export format or its library is missing
+    """
+    export = check_export_format(export_format)
+    if export_format not in _EXPORTERS:
+        raise ValueError(f"{export_format} is not a typed export format.")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    # The job id may come from the client, so it only goes into the file's contents;
+    # a random suffix keeps exports finished in the same second apart
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = f"{OUTPUT_DIR}/resume_scores_{timestamp}_{uuid.uuid4().hex[:12]}.{export.extension}"
+
+    criteria = criteria_names(results)
+    metadata = {
+        "job_id": job_id,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "model": RESUME_RANKER_MODEL,
+        "candidates": len(results),
+        "max_criteria_score": MAX_CRITERIA_SCORE,
+        "criteria": json.dumps(requested_criteria or {}, sort_keys=True),
+    }
+    with _EXPORTERS[export_format](path, criteria, metadata) as exporter:
+        exporter.write(result_rows(results, criteria, job_id, names))
+    return path
@@ -0,0 +1,70 @@
+import math
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from configuration.config import LLM_HEDGE_WINDOW, LLM_HEDGE_MIN_SAMPLES, LLM_HEDGE_BUDGET_RATIO
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the most recent calls per model and answers
+    percentile queries over them, so the hedging delay follows the provider's
+    current behaviour rather than a fixed timeout.
+    """
+    def __init__(self, window: int = LLM_HEDGE_WINDOW, min_samples: int = LLM_HEDGE_MIN_SAMPLES):
+        """
+        Args:
+            window (int): Number of recent latencies kept per model
+            min_samples (int): Samples needed before percentiles are reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, key: str, seconds: float) -> None:
+        """Add one observed latency for a model."""
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """
+        Return the given latency percentile for a model (nearest-rank).
+
+        Args:
+            key (str): The model
+            percentile (float): Percentile between 0 and 100
+
+        Returns:
+            Optional[float]: The latency in seconds, or None while fewer than min_samples are known
+        """
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+
+class HedgeBudget:
+    """
+    Caps hedged requests to a fraction of all calls, bounding the extra spend
+    hedging can cause even when the provider is uniformly slow.
+    """
+    def __init__(self, ratio: float = LLM_HEDGE_BUDGET_RATIO):
+        """
+        Args:
+            ratio (float): Maximum number of hedges per call, e.g. 0.05 for 5%
+        """
+        self.ratio = ratio
+        self.calls = 0
+        self.hedges = 0
+
+    def record_call(self) -> None:
+        """Count a call that could be hedged."""
+        self.calls += 1
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget, returning False when it is exhausted."""
+        if self.hedges + 1 > self.ratio * self.calls:
+            return False
+        self.hedges += 1
+        return True
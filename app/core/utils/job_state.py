@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from configuration.config import JOB_STATE_TTL_SECONDS
+from core.utils.shared_state import SharedStateBackend
+
+
+class JobStateStore:
+    """
+    Tracks the progress of scoring jobs in the shared-state backend, so any
+    worker process can report on a job started by another one.
+    """
+    def __init__(self, backend: SharedStateBackend, ttl: int = JOB_STATE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def start(self, job_id: str, total: int) -> None:
+        """Record a new running job that will process total items."""
+        await asyncio.to_thread(self.backend.set, f"job:{job_id}", {"status": "running", "total": total}, self.ttl)
+
+    async def set_total(self, job_id: str, total: int) -> None:
+        """Update the number of items of a job whose size is only known as it runs."""
+        state = await asyncio.to_thread(self.backend.get, f"job:{job_id}") or {"status": "running"}
+        state["total"] = total
+        await asyncio.to_thread(self.backend.set, f"job:{job_id}", state, self.ttl)
+
+    async def mark_progress(self, job_id: str, amount: int = 1) -> None:
+        """Count amount more items of the job as processed."""
+        await asyncio.to_thread(self.backend.incr, f"job:{job_id}:completed", amount, self.ttl)
+
+    async def finish(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Mark the job as completed with a result summary."""
+        state = await asyncio.to_thread(self.backend.get, f"job:{job_id}") or {}
+        state.update(status="completed", result=result)
+        await asyncio.to_thread(self.backend.set, f"job:{job_id}", state, self.ttl)
+
+    async def fail(self, job_id: str, error: str) -> None:
+        """Mark the job as failed."""
+        state = await asyncio.to_thread(self.backend.get, f"job:{job_id}") or {}
+        state.update(status="failed", error=error)
+        await asyncio.to_thread(self.backend.set, f"job:{job_id}", state, self.ttl)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's state including its processed count, or None if unknown."""
+        state = await asyncio.to_thread(self.backend.get, f"job:{job_id}")
+        if state is None:
+            return None
+        state["completed"] = await asyncio.to_thread(self.backend.get, f"job:{job_id}:completed") or 0
+        return state
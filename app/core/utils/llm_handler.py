@@ -1,41 +1,484 @@
-from litellm import acompletion
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple
+
+from configuration.config import (
+    OPENAI_API_KEY,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_RPM_LIMIT,
+    LLM_API_BASE,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_HTTP_TIMEOUT_SECONDS,
+    LLM_HTTP2,
+    LLM_HTTP_WARMUP_CONNECTIONS,
+    LLM_HEDGING_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MODEL
+)
+from core.utils.deployment_router import Deployment, DeploymentRouter, is_deployment_error
+from core.utils.hedging import HedgeBudget, LatencyTracker
+from core.utils.prompt_builder import PromptCacheStats
+from core.utils.rate_limiter import SharedRateLimiter
+from core.utils.shared_state import SharedStateBackend, get_state_backend
+from core.utils.tracing import current_span, tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
 
 
 class LLMHandler:
     """
     A handler class for interacting with Large Language Models (LLMs) using litellm.
     Provides methods to make asynchronous calls to LLM APIs.
+
+    Deterministic responses are cached and request budgets are enforced through
+    the shared-state backend, so both hold across all worker processes.
+
+    litellm is imported on first use because importing it takes seconds.
+
+    Once opened, the handler owns a long-lived, explicitly sized HTTP connection
+    pool (keep-alive, HTTP/2 when available) that OpenAI calls go through, so
+    concurrent calls reuse warm connections instead of paying for DNS lookups
+    and TLS handshakes. Without it, litellm falls back to its own clients.
+
+    With LLM_HEDGING_ENABLED, a call still running past the model's recent
+    LLM_HEDGE_PERCENTILE latency is duplicated and the first valid response
+    is used, within the hedge budget.
+
+    Models with configured deployments (LLM_DEPLOYMENTS, OPENAI_API_KEYS) are
+    balanced over them by a DeploymentRouter, failing over to the next
+    deployment when one errors. Other models are called directly.
     """
 
+    def __init__(self, state_backend: Optional[SharedStateBackend] = None, router: Optional[DeploymentRouter] = None):
+        """
+        Initialize the handler.
+
+        Args:
+            state_backend (Optional[SharedStateBackend]): Store for the response cache and
+                rate-limit counters. Defaults to the process's configured backend.
+            router (Optional[DeploymentRouter]): Deployments to balance calls over.
+                Defaults to the deployments in the configuration.
+        """
+        self.state_backend = state_backend or get_state_backend()
+        self.router = router if router is not None else DeploymentRouter.from_config()
+        self._rate_limiters: Dict[str, SharedRateLimiter] = {}
+        self.http_client: Optional["httpx.AsyncClient"] = None
+        self._openai_clients: Dict[Tuple[str, str], Any] = {}
+        self._http_requests = 0
+        self.latencies = LatencyTracker()
+        self.hedge_budget = HedgeBudget()
+        self.prompt_cache = PromptCacheStats()
+
+    @staticmethod
+    def warm_up() -> None:
+        """Import litellm ahead of the first LLM call."""
+        import litellm  # noqa: F401
+
+    def open(self) -> None:
+        """
+        Create the shared HTTP connection pool. Safe to call more than once.
+
+        HTTP/2 is enabled when LLM_HTTP2 is set and the h2 package is installed.
+        """
+        if self.http_client is not None:
+            return
+
+        import httpx
+
+        http2 = LLM_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("h2 is not installed, LLM calls use HTTP/1.1")
+                http2 = False
+
+        self.http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            timeout=httpx.Timeout(LLM_HTTP_TIMEOUT_SECONDS, connect=10.0),
+            event_hooks={"request": [self._count_request]}
+        )
+
+    async def _count_request(self, request: "httpx.Request") -> None:
+        self._http_requests += 1
+
+    async def warm_connections(self, count: int = LLM_HTTP_WARMUP_CONNECTIONS) -> int:
+        """
+        Open pool connections ahead of the first LLM call.
+
+        Sends `count` concurrent lightweight requests to the API base, so DNS
+        resolution and TLS handshakes happen at startup. Any HTTP response counts
+        as a warm connection; network errors are logged, not raised.
+
+        Args:
+            count (int): Number of concurrent warm-up requests
+
+        Returns:
+            int: Number of warm-up requests that got a response
+        """
+        self.open()
+        import httpx
+
+        headers = {"Authorization": f"Bearer {OPENAI_API_KEY}"} if OPENAI_API_KEY else {}
+
+        async def ping() -> bool:
+            try:
+                await self.http_client.get(f"{LLM_API_BASE.rstrip('/')}/models", headers=headers)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning("LLM connection warm-up failed", extra={"error": str(e)})
+                return False
+
+        results = await asyncio.gather(*(ping() for _ in range(count)))
+        warmed = sum(results)
+        logger.info("Warmed LLM connections", extra={"warmed": warmed, **self.pool_stats()})
+        return warmed
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+            self._openai_clients.clear()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Describe the HTTP connection pool, for tuning its limits.
+
+        Returns:
+            Dict[str, Any]: Pool limits, requests sent so far, and the number of open,
+                idle, busy and HTTP/2 connections plus requests waiting for a connection
+        """
+        stats = {
+            "open": self.http_client is not None,
+            "max_connections": LLM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "requests_sent": self._http_requests,
+            "connections": 0,
+            "idle_connections": 0,
+            "busy_connections": 0,
+            "http2_connections": 0,
+            "waiting_requests": 0,
+        }
+        # httpx does not expose its pool publicly; read the httpcore pool it wraps. These are
+        # private attributes, so the counts are left at 0 if a new version moves them
+        pool = getattr(getattr(self.http_client, "_transport", None), "_pool", None)
+        if pool is None:
+            return stats
+        try:
+            counts = _connection_counts(pool)
+        except Exception as e:
+            logger.debug("Could not read the HTTP connection pool", extra={"error": str(e)})
+            return stats
+        stats.update(counts)
+        return stats
+
+    def _client_for(self, model: str, api_key: Optional[str] = None, api_base: Optional[str] = None):
+        """
+        Return the pooled OpenAI client to use for a model, or None for litellm's default.
+
+        Only OpenAI models go through the pool, and only once the handler is open.
+        Each key and endpoint gets its own client, all sharing the one connection pool.
+
+        Args:
+            model (str): The litellm model string
+            api_key (Optional[str]): The deployment's key, defaults to OPENAI_API_KEY
+            api_base (Optional[str]): The deployment's endpoint, defaults to LLM_API_BASE
+        """
+        api_key = api_key or OPENAI_API_KEY
+        api_base = api_base or LLM_API_BASE
+        if self.http_client is None or not api_key:
+            return None
+        from litellm import get_llm_provider
+        try:
+            _, provider, _, _ = get_llm_provider(model)
+        except Exception:
+            return None
+        if provider != "openai":
+            return None
+
+        if (api_key, api_base) not in self._openai_clients:
+            from openai import AsyncOpenAI
+            self._openai_clients[(api_key, api_base)] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=api_base,
+                http_client=self.http_client
+            )
+        return self._openai_clients[(api_key, api_base)]
+
     @staticmethod
-    async def call_llm(system_prompt: str, user_prompt: str, model: str = "gpt-4o-mini", response_format: dict = None, temperature: float = 0.0):
+    def _cache_key(system_prompt: str, user_prompt: str, model: str, response_format) -> str:
+        """Build a stable cache key from everything that determines the response."""
+        if hasattr(response_format, "model_json_schema"):
+            response_format = response_format.model_json_schema()
+        payload = json.dumps([model, system_prompt, user_prompt, response_format], sort_keys=True, default=str)
+        return "llm_cache:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _rate_limiter(self, name: str, limit_per_minute: int = LLM_RPM_LIMIT) -> SharedRateLimiter:
+        """Return the shared requests-per-minute budget for a model or deployment."""
+        if name not in self._rate_limiters:
+            self._rate_limiters[name] = SharedRateLimiter(self.state_backend, name, limit_per_minute)
+        return self._rate_limiters[name]
+
+    async def call_llm(self, system_prompt: str, user_prompt: str, model: str = "gpt-4o-mini", response_format: dict = None, temperature: float = 0.0):
         """
         Asynchronously generates a response from the LLM using the provided system and user prompts.
-        
+
         Args:
             system_prompt (str): The system instructions for the LLM that define its behavior
             user_prompt (str): The user's input or query to the LLM
             model (str, optional): The LLM model to use. Defaults to "gpt-4o-mini".
             response_format (dict, optional): Format specification for the response. Defaults to None.
             temperature (float, optional): Controls randomness in the output. Lower values make output more deterministic. Defaults to 0.0.
-            
+
         Returns:
             str: The generated text response from the LLM
         """
+        # Only deterministic calls are safe to serve from the cache
+        cache_key = None
+        if LLM_CACHE_ENABLED and temperature == 0.0:
+            cache_key = self._cache_key(system_prompt, user_prompt, model, response_format)
+            cached = await asyncio.to_thread(self.state_backend.get, cache_key)
+            if cached is not None:
+                return cached
+
         # Prepare the messages in the format expected by the LLM API
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
-        
-        # Make the asynchronous API call to the LLM
-        response = await acompletion(
-            model=model,
-            temperature=temperature,
-            response_format=response_format,
-            messages=messages
-        )
-        
+        request = {"temperature": temperature, "response_format": response_format, "messages": messages}
+
+        # Make the asynchronous API call to the LLM, timed as a span tagged with the model
+        with tracer.span("llm_handler.call_llm", model=model) as span:
+            response = await self._hedged_completion(model, request, span)
+            usage = getattr(response, "usage", None)
+            if span is not None and usage is not None:
+                span.set_attribute("prompt_tokens", usage.prompt_tokens)
+                span.set_attribute("completion_tokens", usage.completion_tokens)
+            # Prompt tokens the provider served from its prompt cache, billed at a discount
+            cached_tokens = self.prompt_cache.record(model, usage)
+            if span is not None and cached_tokens is not None:
+                span.set_attribute("cached_tokens", cached_tokens)
+
         # Extract and return just the content from the response
         # The full response contains additional metadata we don't need
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+
+        if cache_key is not None and content:
+            await asyncio.to_thread(self.state_backend.set, cache_key, content, LLM_CACHE_TTL_SECONDS)
+
+        return content
+
+    async def _completion(
+        self,
+        model: str,
+        request: Dict[str, Any],
+        tried: Optional[Set[str]] = None,
+        sent: Optional[asyncio.Event] = None
+    ):
+        """
+        Send one completion request, failing over between deployments.
+
+        Args:
+            model (str): The model the caller asked for
+            request (Dict[str, Any]): Messages, temperature and response format
+            tried (Optional[Set[str]]): Deployments already used for this call, avoided
+                when possible and extended with the ones this request uses
+            sent (Optional[asyncio.Event]): Set once the request leaves the rate limiter
+
+        Returns:
+            The litellm response
+
+        Raises:
+            Exception: The last deployment's error when every deployment failed, or the
+                first error that another deployment could not fix
+        """
+        if not self.router.has_group(model):
+            return await self._send(model, request, sent=sent)
+
+        tried = tried if tried is not None else set()
+        failed: Set[str] = set()
+        last_error = None
+        while True:
+            deployment = self.router.acquire(model, exclude=failed, avoid=tried)
+            if deployment is None:
+                raise last_error
+            tried.add(deployment.name)
+            try:
+                response = await self._send(model, request, deployment, sent)
+            except BaseException as e:
+                self.router.release(deployment, error=e)
+                if not is_deployment_error(e):
+                    raise
+                logger.warning("LLM deployment failed, failing over", extra={
+                    "deployment": deployment.name,
+                    "error": str(e)
+                })
+                failed.add(deployment.name)
+                last_error = e
+                continue
+            self.router.release(deployment, tokens=_total_tokens(response))
+            return response
+
+    async def _send(
+        self,
+        model: str,
+        request: Dict[str, Any],
+        deployment: Optional[Deployment] = None,
+        sent: Optional[asyncio.Event] = None
+    ):
+        """
+        Send a request to one deployment (or to the model directly) within its rate limit,
+        recording the latency of completed calls under the requested model.
+        """
+        from litellm import acompletion
+
+        extra_args = {}
+        if deployment is not None:
+            target, limiter = deployment.model, self._rate_limiter(deployment.name, deployment.rpm)
+            if deployment.api_key:
+                extra_args["api_key"] = deployment.api_key
+            if deployment.api_base:
+                extra_args["api_base"] = deployment.api_base
+            client = self._client_for(target, deployment.api_key, deployment.api_base)
+            span = current_span()
+            if span is not None:
+                span.set_attribute("deployment", deployment.name)
+        else:
+            target, limiter = model, self._rate_limiter(model)
+            client = self._client_for(target)
+        if client is not None:
+            extra_args["client"] = client
+
+        # Wait for a slot in the host-wide request budget
+        await limiter.acquire()
+        if sent is not None:
+            sent.set()
+
+        # Latency is measured from here, so rate-limit waits do not skew the hedging percentile.
+        # Only completed calls are recorded: a cancelled hedge loser's time is truncated at
+        # the moment the other request won, and would pull the percentile towards the hedge delay
+        started = time.monotonic()
+        response = await acompletion(model=target, **request, **extra_args)
+        self.latencies.record(model, time.monotonic() - started)
+        return response
+
+    async def _hedged_completion(self, model: str, request: Dict[str, Any], span=None):
+        """
+        Send a completion request, hedging it if it straggles.
+
+        The request is duplicated once it runs longer than the model's recent
+        LLM_HEDGE_PERCENTILE latency, as long as the hedge budget allows. The
+        first response with content wins and the other request is cancelled.
+
+        Args:
+            model (str): The LLM model to use
+            request (Dict[str, Any]): Messages, temperature and response format
+            span: The call's trace span, tagged with the hedging outcome
+
+        Returns:
+            The winning litellm response
+
+        Raises:
+            Exception: The primary request's error when no request produced a response
+        """
+        tried: Set[str] = set()
+        sent = asyncio.Event()
+        primary = asyncio.create_task(self._completion(model, request, tried, sent))
+        tasks = [primary]
+        try:
+            if not LLM_HEDGING_ENABLED:
+                return await primary
+
+            self.hedge_budget.record_call()
+            delay = self.latencies.percentile(model, LLM_HEDGE_PERCENTILE)
+            if delay is None:
+                return await primary
+
+            # Start the hedge timer once the request is sent, not while it waits for a rate-limit slot
+            sent_wait = asyncio.create_task(sent.wait())
+            try:
+                await asyncio.wait([primary, sent_wait], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                sent_wait.cancel()
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self.hedge_budget.try_spend():
+                return await primary
+
+            hedge_model = LLM_HEDGE_MODEL or model
+            logger.info("Hedging slow LLM call", extra={"model": model, "hedge_model": hedge_model, "delay": delay})
+            # With deployments, the hedge goes to a different deployment than the primary when possible
+            hedge = asyncio.create_task(self._completion(hedge_model, request, tried))
+            tasks.append(hedge)
+            if span is not None:
+                span.set_attribute("hedged", True)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and _has_content(task.result()):
+                        if span is not None:
+                            span.set_attribute("hedge_won", task is hedge)
+                        return task.result()
+
+            # Neither response was usable; prefer any response over an error
+            for task in tasks:
+                if task.exception() is None:
+                    return task.result()
+            raise primary.exception()
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+
+def _total_tokens(response) -> int:
+    """Tokens a completion response reports as used, 0 when unknown."""
+    tokens = getattr(getattr(response, "usage", None), "total_tokens", 0)
+    return tokens if isinstance(tokens, int) else 0
+
+
+def _has_content(response) -> bool:
+    """Whether a completion response carries a non-empty message."""
+    try:
+        return bool(response.choices[0].message.content)
+    except (AttributeError, IndexError, TypeError):
+        return False
+
+
+def _connection_counts(pool: Any) -> Dict[str, int]:
+    """Count the open, idle, busy and HTTP/2 connections and waiting requests of an httpcore pool."""
+    counts = {"connections": 0, "idle_connections": 0, "busy_connections": 0, "http2_connections": 0}
+    for connection in pool.connections:
+        if connection.is_closed():
+            continue
+        counts["connections"] += 1
+        if connection.is_idle():
+            counts["idle_connections"] += 1
+        else:
+            counts["busy_connections"] += 1
+        if "HTTP/2" in connection.info():
+            counts["http2_connections"] += 1
+    counts["waiting_requests"] = sum(
+        1 for pool_request in pool._requests if getattr(pool_request, "connection", None) is None
+    )
+    return counts
@@ -0,0 +1,125 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from configuration.config import LOG_LEVEL, LOG_PAYLOAD_SAMPLE_RATE
+from core.utils.tracing import get_request_id
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamps each record with the current request's correlation id.
+
+    Attached to the queue handler so it runs in the emitting task, where the
+    request context is still available.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        return True
+
+
+class PayloadSamplingFilter(logging.Filter):
+    """
+    Samples records that carry a verbose `payload` extra (e.g. full LLM
+    results), keeping roughly `sample_rate` of them. Records without a
+    payload always pass.
+    """
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "payload"):
+            return True
+        return random.random() < self.sample_rate
+
+
+class JSONQueueHandler(QueueHandler):
+    """
+    Queue handler that keeps a record's traceback.
+
+    QueueHandler.prepare drops exc_info before the record crosses the queue,
+    so the traceback is formatted here, in the emitting thread, into an
+    `exception` attribute that JSONFormatter writes out.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exception = logging.Formatter().formatException(record.exc_info)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects including any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level: str = LOG_LEVEL, sample_rate: float = LOG_PAYLOAD_SAMPLE_RATE) -> None:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Emitting a record only enqueues it, so request handlers never block on
+    stdout; formatting and writing happen in the listener thread. Safe to call
+    more than once.
+
+    Args:
+        level (str): Root log level, e.g. "INFO"
+        sample_rate (float): Fraction of records with a verbose payload to keep
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = JSONQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(PayloadSamplingFilter(sample_rate))
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
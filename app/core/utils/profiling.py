@@ -0,0 +1,89 @@
+import asyncio
+import cProfile
+import os
+import pstats
+import threading
+import uuid
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from configuration.config import (
+    PROFILING_ENABLED,
+    PROFILING_ALLOW_HEADER,
+    PROFILING_HEADER,
+    PROFILING_OUTPUT_DIR
+)
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Captures a cProfile profile for opted-in requests.
+
+    Profiling is enabled for every request when PROFILING_ENABLED is set, or for
+    a single request when it carries the PROFILING_HEADER header. The profile is
+    stored under PROFILING_OUTPUT_DIR and its path is returned in the
+    X-Profile-Path response header; the top functions by cumulative time are
+    also written next to it as a text report.
+
+    cProfile traces the whole event loop thread, so a profile taken while other
+    requests are in flight also contains their work. Only one request is
+    profiled at a time; concurrent opt-in requests get X-Profile-Status: busy.
+    """
+    _lock = threading.Lock()
+
+    def _should_profile(self, request: Request) -> bool:
+        if PROFILING_ENABLED:
+            return True
+        if not PROFILING_ALLOW_HEADER:
+            return False
+        return request.headers.get(PROFILING_HEADER, "").lower() in ("1", "true", "yes")
+
+    async def dispatch(self, request: Request, call_next):
+        if not self._should_profile(request):
+            return await call_next(request)
+
+        # cProfile cannot run two profilers at once on the same thread
+        if not self._lock.acquire(blocking=False):
+            response = await call_next(request)
+            response.headers["X-Profile-Status"] = "busy"
+            return response
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+        finally:
+            self._lock.release()
+
+        # Writing the dump and the report is blocking file I/O
+        profile_path = await asyncio.to_thread(self._store_profile, profiler)
+        response.headers["X-Profile-Path"] = profile_path
+        response.headers["X-Profile-Status"] = "captured"
+        return response
+
+    @staticmethod
+    def _store_profile(profiler: cProfile.Profile) -> str:
+        """
+        Write the profile and a text summary to the output directory.
+
+        Args:
+            profiler (cProfile.Profile): The finished profiler
+
+        Returns:
+            str: Path to the stored .prof file
+        """
+        os.makedirs(PROFILING_OUTPUT_DIR, exist_ok=True)
+        # The name is generated: the client's X-Request-ID must not reach the file system
+        profile_path = os.path.join(PROFILING_OUTPUT_DIR, f"profile_{uuid.uuid4().hex}.prof")
+        profiler.dump_stats(profile_path)
+
+        # Human-readable summary for quick inspection without a viewer
+        with open(os.path.splitext(profile_path)[0] + ".txt", "w") as summary_file:
+            stats = pstats.Stats(profiler, stream=summary_file)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+
+        return profile_path
@@ -0,0 +1,114 @@
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+def canonical_json(value: Any) -> str:
+    """
+    Serialize a value the same way every time, whatever the order its keys were built in.
+
+    Args:
+        value (Any): A JSON-serializable value, e.g. a criteria dictionary
+
+    Returns:
+        str: Compact JSON with sorted keys
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class PromptBuilder:
+    """
+    Lays prompts out for provider-side prompt caching.
+
+    Providers cache the longest prompt prefix they have seen recently, so
+    content shared by many calls has to come first and be byte-for-byte
+    identical. The system prompt holds the instructions followed by the shared
+    context (e.g. a batch's criteria), canonically serialized; the user prompt
+    holds only the per-call input (e.g. one resume). The response schema,
+    passed as response_format, is placed ahead of the messages by the provider.
+    """
+    def __init__(self, instructions: str, user_template: str, context_template: Optional[str] = None):
+        """
+        Args:
+            instructions (str): The system prompt
+            user_template (str): Template of the per-call input
+            context_template (Optional[str]): Template of the shared context, appended to
+                the instructions; its fields are filled with canonical JSON
+        """
+        self.instructions = instructions.strip()
+        self.user_template = user_template
+        self.context_template = context_template
+
+    def build(self, context: Optional[Dict[str, Any]] = None, **variables: Any) -> Tuple[str, str]:
+        """
+        Render the system and user prompts.
+
+        Args:
+            context (Optional[Dict[str, Any]]): Values shared by many calls, by context
+                template field
+            **variables (Any): Values of the user template fields
+
+        Returns:
+            Tuple[str, str]: The system prompt (stable prefix) and the user prompt (variable suffix)
+        """
+        system_prompt = self.instructions
+        if self.context_template is not None:
+            fields = {name: canonical_json(value) for name, value in (context or {}).items()}
+            system_prompt = f"{system_prompt}\n\n{self.context_template.format(**fields)}"
+        return system_prompt, self.user_template.format(**variables)
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    Prompt tokens a completion's usage reports as served from the provider's prompt cache.
+
+    Reads usage.prompt_tokens_details.cached_tokens (OpenAI), falling back to
+    usage.cache_read_input_tokens (Anthropic via litellm); 0 when unreported.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    tokens = getattr(details, "cached_tokens", None)
+    if not isinstance(tokens, int):
+        tokens = getattr(usage, "cache_read_input_tokens", None)
+    return tokens if isinstance(tokens, int) else 0
+
+
+class PromptCacheStats:
+    """Counts prompt tokens sent and served from the provider's prompt cache, per model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Dict[str, int]] = {}
+
+    def record(self, model: str, usage: Any) -> Optional[int]:
+        """
+        Record one completion's prompt usage.
+
+        Args:
+            model (str): The model called
+            usage (Any): The response's usage, as reported by litellm
+
+        Returns:
+            Optional[int]: The cached prompt tokens, or None if the usage reports no prompt tokens
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if not isinstance(prompt_tokens, int):
+            return None
+        cached_tokens = cached_prompt_tokens(usage)
+        with self._lock:
+            counts = self._models.setdefault(model, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            counts["calls"] += 1
+            counts["prompt_tokens"] += prompt_tokens
+            counts["cached_tokens"] += cached_tokens
+        return cached_tokens
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            Dict[str, Dict[str, Any]]: Per model, the calls, prompt tokens and cached tokens
+                recorded, and the share of prompt tokens that were cached
+        """
+        with self._lock:
+            models = {model: dict(counts) for model, counts in self._models.items()}
+        for counts in models.values():
+            counts["cached_ratio"] = counts["cached_tokens"] / counts["prompt_tokens"] if counts["prompt_tokens"] else 0.0
+        return models
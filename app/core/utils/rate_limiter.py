@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+from core.utils.shared_state import SharedStateBackend
+
+
+class SharedRateLimiter:
+    """
+    Fixed-window requests-per-minute budget shared by all worker processes.
+
+    Each acquisition increments a per-minute counter in the shared-state
+    backend, so the budget is enforced for the whole host rather than per
+    process. Callers over budget wait for the next window.
+    """
+    def __init__(self, backend: SharedStateBackend, name: str, limit_per_minute: int):
+        """
+        Args:
+            backend (SharedStateBackend): Store holding the counters
+            name (str): Budget name, e.g. the model or deployment being limited
+            limit_per_minute (int): Allowed acquisitions per minute; 0 disables the limit
+        """
+        self.backend = backend
+        self.name = name
+        self.limit_per_minute = limit_per_minute
+
+    async def acquire(self) -> None:
+        """Wait until a slot in the current or a later window is available."""
+        if self.limit_per_minute <= 0:
+            return
+
+        while True:
+            now = time.time()
+            window = int(now // 60)
+            count = await asyncio.to_thread(self.backend.incr, f"rate:{self.name}:{window}", 1, 120)
+            if count <= self.limit_per_minute:
+                return
+            # Over budget: sleep until the next window starts
+            await asyncio.sleep((window + 1) * 60 - now)
@@ -0,0 +1,271 @@
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from configuration.config import (
+    RESULTS_STORE_PATH,
+    RESULTS_STORE_RETENTION_SECONDS,
+    RESULTS_STORE_MAX_BATCHES,
+    MAX_CRITERIA_SCORE
+)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS batches ("
+    "job_id TEXT PRIMARY KEY, created_at REAL NOT NULL, criteria TEXT, candidates INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS candidates ("
+    "job_id TEXT NOT NULL, row_id INTEGER NOT NULL, resume TEXT, candidate_name TEXT, "
+    "total_score INTEGER NOT NULL, max_score INTEGER NOT NULL, duplicate_of TEXT, previously_seen_in TEXT, "
+    "PRIMARY KEY (job_id, row_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS candidates_by_total ON candidates (job_id, total_score DESC, row_id)",
+    "CREATE TABLE IF NOT EXISTS scores ("
+    "job_id TEXT NOT NULL, row_id INTEGER NOT NULL, criterion TEXT NOT NULL, score INTEGER NOT NULL, "
+    "PRIMARY KEY (job_id, row_id, criterion)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS scores_by_criterion ON scores (job_id, criterion, score)",
+)
+
+
+def encode_cursor(sort_value: float, row_id: int) -> str:
+    """Encode the position after a result row as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a pagination cursor.
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return float(sort_value), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+
+class ResultsStore:
+    """
+    Local SQLite store of scoring results, queryable after the batch is done.
+
+    Each batch keeps one row per candidate (with its total score) and one row
+    per candidate and criterion. Indexes on (job, total score) and (job,
+    criterion, score) keep top-K, threshold and paging queries fast on
+    batches with tens of thousands of candidates. Pages are cut with keyset
+    cursors, so deep pages cost the same as the first one.
+
+    The database is opened on first use, in WAL mode so queries do not block
+    a batch being saved by another worker. Saving a batch deletes the batches
+    past the retention limits.
+    """
+    def __init__(
+        self,
+        path: str = RESULTS_STORE_PATH,
+        retention_seconds: float = RESULTS_STORE_RETENTION_SECONDS,
+        max_batches: int = RESULTS_STORE_MAX_BATCHES
+    ):
+        """
+        Args:
+            path (str): The SQLite database file
+            retention_seconds (float): Age after which a batch is deleted; 0 keeps batches forever
+            max_batches (int): Number of most recent batches kept; 0 for no limit
+        """
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.max_batches = max_batches
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def save_batch(
+        self,
+        job_id: str,
+        results: List[Dict[str, Any]],
+        criteria: Optional[Dict[str, Any]] = None,
+        names: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Store a batch's ranking results, replacing any earlier results under the id.
+
+        Args:
+            job_id (str): Id the results are stored under; generated by the server, so
+                clients cannot overwrite or read each other's batches by reusing an id
+            results (List[Dict[str, Any]]): Ranking results as returned by the ranker
+            criteria (Optional[Dict[str, Any]]): The job criteria the batch was scored against
+            names (Optional[Sequence[str]]): File or archive member name of each result
+
+        Returns:
+            int: Number of candidates stored
+        """
+        candidate_rows = []
+        score_rows = []
+        for index, result in enumerate(results):
+            row_id = index + 1
+            score_items = result.get("scores", [])
+            candidate_rows.append((
+                job_id,
+                row_id,
+                names[index] if names is not None else None,
+                result.get("candidate_name", "Unknown"),
+                sum(item["score"] for item in score_items),
+                MAX_CRITERIA_SCORE * len(score_items),
+                result.get("duplicate_of"),
+                result.get("previously_seen_in"),
+            ))
+            score_rows.extend((job_id, row_id, item["criteria"], item["score"]) for item in score_items)
+
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ("scores", "candidates", "batches"):
+                    conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+                conn.execute(
+                    "INSERT INTO batches (job_id, created_at, criteria, candidates) VALUES (?, ?, ?, ?)",
+                    (job_id, time.time(), json.dumps(criteria or {}, sort_keys=True), len(candidate_rows)),
+                )
+                conn.executemany("INSERT INTO candidates VALUES (?, ?, ?, ?, ?, ?, ?, ?)", candidate_rows)
+                # A criterion scored twice for one candidate keeps the last score, as in the CSV
+                conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", score_rows)
+                self._purge(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(candidate_rows)
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        """Delete the batches past the retention limits."""
+        conditions, params = [], []
+        if self.retention_seconds:
+            conditions.append("created_at < ?")
+            params.append(time.time() - self.retention_seconds)
+        if self.max_batches:
+            conditions.append("job_id IN (SELECT job_id FROM batches ORDER BY created_at DESC LIMIT -1 OFFSET ?)")
+            params.append(self.max_batches)
+        if not conditions:
+            return
+        expired = [row[0] for row in conn.execute(f"SELECT job_id FROM batches WHERE {' OR '.join(conditions)}", params)]
+        for job_id in expired:
+            for table in ("scores", "candidates", "batches"):
+                conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+
+    def query(
+        self,
+        job_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        weights: Optional[Dict[str, float]] = None,
+        min_scores: Optional[Dict[str, int]] = None,
+        exclude_duplicates: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return one page of a batch's candidates, best first.
+
+        Args:
+            job_id (str): Id the results were stored under
+            limit (int): Page size; the first page is the top-K
+            cursor (Optional[str]): The previous page's next_cursor
+            weights (Optional[Dict[str, float]]): Rank by the weighted sum of these criteria's
+                scores instead of the total score
+            min_scores (Optional[Dict[str, int]]): Only candidates scoring at least this
+                much on each criterion
+            exclude_duplicates (bool): Leave out near-duplicates of other candidates
+
+        Returns:
+            Optional[Dict[str, Any]]: The page's items and the cursor of the next page
+                (None on the last page), or None if nothing is stored under the id
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        join, join_params = "", []
+        if weights:
+            # Weighted totals are computed from the criterion index, reading only the weighted criteria
+            cases = " ".join("WHEN ? THEN ?" for _ in weights)
+            placeholders = ", ".join("?" for _ in weights)
+            join = (
+                f"LEFT JOIN (SELECT row_id, SUM(score * CASE criterion {cases} ELSE 0 END) AS weighted "
+                f"FROM scores WHERE job_id = ? AND criterion IN ({placeholders}) GROUP BY row_id) w "
+                "ON w.row_id = c.row_id "
+            )
+            join_params = [value for item in weights.items() for value in item] + [job_id] + list(weights)
+            sort_expr = "COALESCE(w.weighted, 0)"
+        else:
+            sort_expr = "c.total_score"
+
+        conditions, params = ["c.job_id = ?"], [job_id]
+        for criterion, minimum in (min_scores or {}).items():
+            conditions.append("c.row_id IN (SELECT row_id FROM scores WHERE job_id = ? AND criterion = ? AND score >= ?)")
+            params += [job_id, criterion, minimum]
+        if exclude_duplicates:
+            conditions.append("c.duplicate_of IS NULL")
+        if cursor:
+            sort_value, row_id = decode_cursor(cursor)
+            conditions.append(f"({sort_expr} < ? OR ({sort_expr} = ? AND c.row_id > ?))")
+            params += [sort_value, sort_value, row_id]
+
+        sql = (
+            "SELECT c.row_id, c.resume, c.candidate_name, c.total_score, c.max_score, "
+            f"c.duplicate_of, c.previously_seen_in, {sort_expr} AS sort_score "
+            f"FROM candidates c {join}WHERE {' AND '.join(conditions)} "
+            "ORDER BY sort_score DESC, c.row_id LIMIT ?"
+        )
+
+        with self._lock:
+            conn = self._connection()
+            if conn.execute("SELECT 1 FROM batches WHERE job_id = ?", (job_id,)).fetchone() is None:
+                return None
+            # One extra row tells whether there is a next page
+            rows = conn.execute(sql, join_params + params + [limit + 1]).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+
+            scores: Dict[int, Dict[str, int]] = {row[0]: {} for row in rows}
+            if rows:
+                placeholders = ", ".join("?" for _ in rows)
+                for row_id, criterion, score in conn.execute(
+                    f"SELECT row_id, criterion, score FROM scores WHERE job_id = ? AND row_id IN ({placeholders})",
+                    [job_id] + [row[0] for row in rows],
+                ):
+                    scores[row_id][criterion] = score
+
+        items = []
+        for row_id, resume, candidate_name, total_score, max_score, duplicate_of, previously_seen_in, sort_score in rows:
+            item = {
+                "row_id": row_id,
+                "resume": resume,
+                "candidate_name": candidate_name,
+                "scores": scores[row_id],
+                "total_score": total_score,
+                "max_score": max_score,
+                "duplicate_of": duplicate_of,
+                "previously_seen_in": previously_seen_in,
+            }
+            if weights:
+                item["weighted_score"] = sort_score
+            items.append(item)
+
+        next_cursor = encode_cursor(rows[-1][-1], rows[-1][0]) if has_more else None
+        return {"results_id": job_id, "items": items, "next_cursor": next_cursor}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,257 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from configuration.config import SHARED_STATE_BACKEND, SHARED_STATE_PATH, SHARED_STATE_PURGE_INTERVAL_SECONDS, WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class SharedStateBackend(abc.ABC):
+    """
+    Key/value store for state that must be consistent across worker processes:
+    LLM response caches, rate-limit budgets and job progress.
+
+    Values are JSON-serializable objects. Keys may carry a time-to-live after
+    which they behave as if they were never set.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the value stored under key, or None if it is missing or expired."""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value under key, optionally expiring after ttl seconds."""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key if present."""
+
+    @abc.abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """
+        Atomically add amount to the integer stored under key.
+
+        A missing or expired key starts from 0 and gets the given ttl; the ttl
+        of an existing key is left unchanged.
+
+        Returns:
+            int: The value after the increment
+        """
+
+    @abc.abstractmethod
+    def purge_expired(self) -> int:
+        """Delete expired keys and return how many were removed."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class InMemoryStateBackend(SharedStateBackend):
+    """
+    Process-local backend, suitable for a single worker and for tests.
+
+    Expired keys are dropped when read, and all of them are swept on the
+    first write after every sweep_interval seconds, so keys that are never
+    read again (e.g. past rate-limit windows) do not accumulate.
+    """
+
+    def __init__(self, sweep_interval: float = SHARED_STATE_PURGE_INTERVAL_SECONDS):
+        self._data: Dict[str, Tuple[Any, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+
+    def _get_live(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    def _sweep(self, force: bool = False) -> int:
+        now = time.time()
+        if not force and now < self._next_sweep:
+            return 0
+        self._next_sweep = now + self.sweep_interval
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        return len(expired)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._get_live(key)
+            return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._sweep()
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            self._sweep()
+            entry = self._get_live(key)
+            if entry is None:
+                entry = (0, time.time() + ttl if ttl else None)
+            value = int(entry[0]) + amount
+            self._data[key] = (value, entry[1])
+            return value
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._sweep(force=True)
+
+
+class SQLiteStateBackend(SharedStateBackend):
+    """
+    Backend stored in a local SQLite database, shared by all worker processes
+    on the host.
+
+    The database runs in WAL mode so readers do not block the writer, and every
+    increment runs in an immediate transaction so concurrent workers never lose
+    updates.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_state ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM shared_state WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_state WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM shared_state WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or (row[1] is not None and row[1] <= now):
+                    value, expires_at = amount, (now + ttl if ttl else None)
+                else:
+                    value, expires_at = int(json.loads(row[0])) + amount, row[1]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM shared_state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_backend: Optional[SharedStateBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_state_backend(kind: str = SHARED_STATE_BACKEND, path: str = SHARED_STATE_PATH) -> SharedStateBackend:
+    """
+    Create the shared-state backend selected in the configuration.
+
+    Args:
+        kind (str): "memory", "sqlite" or "auto" (sqlite when running more than one worker)
+        path (str): Database path for the sqlite backend
+
+    Returns:
+        SharedStateBackend: The new backend
+    """
+    if kind == "auto":
+        kind = "sqlite" if WORKERS > 1 else "memory"
+    if kind == "memory":
+        return InMemoryStateBackend()
+    if kind == "sqlite":
+        return SQLiteStateBackend(path)
+    raise ValueError(f"Unknown shared state backend: {kind}")
+
+
+def get_state_backend() -> SharedStateBackend:
+    """Return this process's shared-state backend, creating it on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_state_backend()
+        return _backend
+
+
+def close_state_backend() -> None:
+    """Close this process's shared-state backend, if one was created."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+
+
+async def purge_state_periodically(interval: float = SHARED_STATE_PURGE_INTERVAL_SECONDS) -> None:
+    """
+    Delete expired keys from this process's backend every interval seconds, until cancelled.
+
+    Response-cache entries, past rate-limit windows, job progress and dedup
+    signatures are written with a ttl but mostly never read again, so without
+    this they would pile up in memory or in the SQLite file.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await asyncio.to_thread(get_state_backend().purge_expired)
+        except Exception:
+            logger.exception("Purging expired shared state failed")
+            continue
+        if removed:
+            logger.debug("Purged %d expired shared-state keys", removed)
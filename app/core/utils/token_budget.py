@@ -0,0 +1,126 @@
+import logging
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from configuration.config import INPUT_TRUNCATION_STRATEGY, INPUT_HEAD_RATIO
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English text, used when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+# Inserted where head/tail sampling removed text, so the model knows the input is partial
+TRUNCATION_MARKER = "\n[... content truncated ...]\n"
+
+
+class BudgetResult(NamedTuple):
+    """
+    Outcome of fitting a text into a token budget.
+
+    Attributes:
+        text: The text to send, truncated if needed
+        original_tokens: Token count of the input text
+        kept_tokens: Token count of the returned text, excluding the truncation marker
+        removed_tokens: Number of tokens removed to fit the budget
+    """
+    text: str
+    original_tokens: int
+    kept_tokens: int
+    removed_tokens: int
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """
+    Return the tiktoken encoding for a model, or None if it cannot be loaded.
+
+    tiktoken downloads encodings on first use; failures (e.g. no network) are
+    cached so the character-based estimate is used from then on.
+    """
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("Tokenizer unavailable, estimating token counts", extra={"model": model, "error": str(e)})
+        return None
+
+
+def load_encodings(*models: str) -> None:
+    """
+    Load the tokenizers of the given models ahead of the first call.
+
+    Loading may download the encoding, so it is meant to run in a worker
+    thread during application startup rather than on the event loop.
+    """
+    for model in models:
+        _get_encoding(model)
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens text uses for the given model.
+
+    Args:
+        text (str): The text to measure
+        model (str): The model whose tokenizer applies
+
+    Returns:
+        int: The exact token count, or an estimate if the tokenizer is unavailable
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def fit_to_budget(
+    text: str,
+    max_tokens: int,
+    model: str,
+    strategy: str = INPUT_TRUNCATION_STRATEGY,
+    head_ratio: float = INPUT_HEAD_RATIO
+) -> BudgetResult:
+    """
+    Deterministically shrink text to at most max_tokens tokens.
+
+    Tokenizing long texts is CPU-bound; call it from a worker thread on the request path.
+
+    Args:
+        text (str): The text to fit
+        max_tokens (int): The token budget; 0 or less disables budgeting
+        model (str): The model whose tokenizer applies
+        strategy (str): "truncate" keeps the beginning of the text, "head_tail" keeps
+            the beginning and the end and drops the middle
+        head_ratio (float): Share of the budget given to the head with "head_tail"
+
+    Returns:
+        BudgetResult: The fitted text and how many tokens were removed
+    """
+    encoding = _get_encoding(model)
+    tokens: Optional[list] = encoding.encode(text, disallowed_special=()) if encoding is not None else None
+    original_tokens = len(tokens) if tokens is not None else count_tokens(text, model)
+
+    if max_tokens <= 0 or original_tokens <= max_tokens:
+        return BudgetResult(text, original_tokens, original_tokens, 0)
+
+    if strategy == "head_tail":
+        head_tokens = int(max_tokens * head_ratio)
+        tail_tokens = max_tokens - head_tokens
+    elif strategy == "truncate":
+        head_tokens, tail_tokens = max_tokens, 0
+    else:
+        raise ValueError(f"Unknown truncation strategy: {strategy}")
+
+    if tokens is not None:
+        # A cut can fall inside a multibyte character; drop its partial bytes instead of emitting U+FFFD
+        head = encoding.decode(tokens[:head_tokens], errors="ignore")
+        tail = encoding.decode(tokens[len(tokens) - tail_tokens:], errors="ignore") if tail_tokens else ""
+    else:
+        head = text[:head_tokens * _CHARS_PER_TOKEN]
+        tail = text[len(text) - tail_tokens * _CHARS_PER_TOKEN:] if tail_tokens else ""
+
+    fitted = head + TRUNCATION_MARKER + tail if tail else head + TRUNCATION_MARKER
+    return BudgetResult(fitted, original_tokens, max_tokens, original_tokens - max_tokens)
@@ -0,0 +1,235 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from configuration.config import TRACING_ENABLED, TRACING_EXPORTER, TRACING_OUTPUT_FILE
+
+# Correlation id of the request currently being served, shared by spans and logs
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+# Innermost open span, used to link child spans to their parent
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Return the correlation id of the request currently being served, if any."""
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """
+    Bind a correlation id to the current context.
+
+    Args:
+        request_id (Optional[str]): The id to bind, or None to clear it
+
+    Returns:
+        contextvars.Token: Token that can be passed to reset_request_id
+    """
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    """Restore the correlation id that was bound before set_request_id."""
+    _request_id.reset(token)
+
+
+class Span:
+    """
+    A single timed operation within a request.
+
+    Attributes:
+        name: Name of the traced operation, e.g. "llm.call_llm"
+        trace_id: Correlation id of the request the span belongs to
+        span_id: Unique id of this span
+        parent_id: Id of the enclosing span, if any
+        attributes: Free-form key/value pairs describing the operation
+    """
+    def __init__(self, name: str, trace_id: Optional[str], parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = datetime.now(timezone.utc)
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def finish(self) -> None:
+        """Stop the span's clock."""
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span into a JSON-compatible dictionary."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time.isoformat(),
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class ConsoleSpanExporter:
+    """Writes finished spans to stderr as JSON lines."""
+
+    def export(self, span: Span) -> None:
+        sys.stderr.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class FileSpanExporter:
+    """Appends finished spans as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a") as trace_file:
+                trace_file.write(line)
+
+
+class Tracer:
+    """
+    Minimal span-based tracer.
+
+    Spans nest through a context variable, so they follow the request across
+    awaits and are linked to the request's correlation id.
+    """
+    def __init__(self, exporter=None, enabled: bool = True):
+        self.exporter = exporter
+        self.enabled = enabled and exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Time the enclosed block as a span.
+
+        Args:
+            name (str): Name of the traced operation
+            **attributes: Initial span attributes
+
+        Yields:
+            Optional[Span]: The open span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=get_request_id() or (parent.trace_id if parent else None),
+            parent_id=parent.span_id if parent else None,
+            attributes=dict(attributes),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            try:
+                self.exporter.export(span)
+            except Exception:
+                # Tracing must never break the traced operation
+                pass
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """
+        Decorator that wraps a sync or async callable in a span.
+
+        Args:
+            name (Optional[str]): Span name, defaults to the function's qualified name
+
+        Returns:
+            Callable: The decorator
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost open span, if any."""
+    return _current_span.get()
+
+
+def _build_exporter(exporter_name: str):
+    """Create the span exporter selected in the configuration."""
+    if exporter_name == "console":
+        return ConsoleSpanExporter()
+    if exporter_name == "file":
+        return FileSpanExporter(TRACING_OUTPUT_FILE)
+    return None
+
+
+# Process-wide tracer configured from the environment
+tracer = Tracer(exporter=_build_exporter(TRACING_EXPORTER), enabled=TRACING_ENABLED)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorate a function so each call is recorded as a span on the global tracer."""
+    return tracer.traced(name)
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """
+    Assigns a correlation id to every request and wraps it in a root span.
+
+    An incoming X-Request-ID header is reused so traces can be joined with
+    upstream systems; the id is echoed back on the response.
+    """
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        token = set_request_id(request_id)
+        try:
+            with tracer.span("http.request", method=request.method, path=request.url.path) as span:
+                response = await call_next(request)
+                if span is not None:
+                    span.set_attribute("status_code", response.status_code)
+        finally:
+            reset_request_id(token)
+        response.headers["X-Request-ID"] = request_id
+        return response
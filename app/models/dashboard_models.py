@@ -1,6 +1,9 @@
+import logging
 from pydantic import BaseModel, Field
 from fastapi import UploadFile, File
 from typing import List, Optional
+
+logger = logging.getLogger(__name__)
         
 def validate_file_type(file: UploadFile = File(...)):
     """
@@ -23,7 +26,7 @@ def validate_file_type(file: UploadFile = File(...)):
         raise ValueError("Only PDF and DOCX files are accepted")
     
     # Log validation success
-    print("File type is valid")
+    logger.debug("File type is valid", extra={"content_type": file.content_type})
     return file
     
 class Criteria(BaseModel):
@@ -47,3 +50,29 @@ class ExtractCriteriaResponse(BaseModel):
     data: Criteria | dict = Field(default_factory=dict)
     message: str
     error: Optional[str] = None
+
+class CriteriaBatchItem(BaseModel):
+    """
+    Pydantic model representing the outcome for one job description of a batch.
+
+    Attributes:
+        filename (Optional[str]): Name of the uploaded job description file
+        data (dict): The extracted criteria, empty if extraction failed
+        error (Optional[str]): The error message if extraction failed
+    """
+    filename: Optional[str] = None
+    data: dict = Field(default_factory=dict)
+    error: Optional[str] = None
+
+class ExtractCriteriaBatchResponse(BaseModel):
+    """
+    Pydantic model representing the response format for batch criteria extraction.
+
+    Attributes:
+        data (List[CriteriaBatchItem]): One result per uploaded file, in upload order
+        message (str): A message describing the result of the operation
+        error (Optional[str]): An optional error message if something went wrong
+    """
+    data: List[CriteriaBatchItem] = Field(default_factory=list)
+    message: str
+    error: Optional[str] = None
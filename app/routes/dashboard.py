@@ -1,13 +1,121 @@
 import json
-from typing import List
-from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, Depends, status
-from fastapi.responses import JSONResponse, FileResponse
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, Form, BackgroundTasks, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
 
+from configuration.config import (
+    ADMISSION_TENANT_HEADER,
+    ADMISSION_TRUST_TENANT_HEADER,
+    ADMISSION_ARCHIVE_BYTES_PER_ITEM,
+    EXPORT_DEFAULT_FORMAT,
+    RESULTS_MAX_PAGE_SIZE
+)
+from core.utils.admission import AdmissionController
+from core.utils.exporters import EXPORT_FORMATS, check_export_format
 from views.dashboard_views import DashboardViews
-from models.dashboard_models import ExtractCriteriaResponse, validate_file_type
+from models.dashboard_models import ExtractCriteriaResponse, ExtractCriteriaBatchResponse, validate_file_type
+
+
+def get_dashboard_views(request: Request) -> DashboardViews:
+    """
+    Return the DashboardViews instance built in the application lifespan.
+
+    Args:
+        request (Request): The incoming request
+
+    Returns:
+        DashboardViews: The shared views object holding the service graph
+    """
+    return request.app.state.dashboard_views
+
+
+def get_admission_controller(request: Request) -> AdmissionController:
+    """
+    Return the AdmissionController built in the application lifespan.
+
+    Args:
+        request (Request): The incoming request
+
+    Returns:
+        AdmissionController: The process-wide admission controller
+    """
+    return request.app.state.admission_controller
+
+
+def get_tenant(request: Request) -> str:
+    """
+    Return the tenant the request belongs to, used for fair queuing.
+
+    The tenant is the client address. The ADMISSION_TENANT_HEADER header is only
+    used when ADMISSION_TRUST_TENANT_HEADER is set, i.e. behind a gateway that
+    sets it: a client choosing its own id could rotate ids to get more fair-share slots.
+    """
+    if ADMISSION_TRUST_TENANT_HEADER:
+        tenant = request.headers.get(ADMISSION_TENANT_HEADER)
+        if tenant:
+            return tenant
+    return request.client.host if request.client else "default"
+
+
+def _invalid_format_response(message: str, error: ValueError) -> JSONResponse:
+    """Return the 400 response for an unknown or unavailable export format."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content=ExtractCriteriaResponse(data={}, message=message, error=str(error)).model_dump()
+    )
+
+
+def _new_results_id(view_obj: DashboardViews) -> Optional[str]:
+    """Generate the id a batch's scores are stored under, or None if the results store is disabled."""
+    return uuid.uuid4().hex if view_obj.results_store is not None else None
+
+
+def _results_headers(results_id: Optional[str]) -> Dict[str, str]:
+    """Response headers telling the client where to query the batch's stored scores."""
+    return {"X-Results-ID": results_id} if results_id is not None else {}
+
+
+def _new_job_id() -> str:
+    """
+    Generate the id a scoring job's progress is kept under.
+
+    The id is chosen here rather than taken from the client's X-Request-ID, so
+    clients cannot overwrite each other's jobs or read a job by guessing its id.
+    """
+    return uuid.uuid4().hex
+
+
+def _job_headers(job_id: str) -> Dict[str, str]:
+    """Response headers telling the client where to look up the scoring job."""
+    return {"X-Job-ID": job_id}
+
+
+async def _read_uploads(files: List[UploadFile]) -> List[Tuple[Optional[str], bytes]]:
+    """Return the (filename, content) of each upload."""
+    return [(file.filename, await file.read()) for file in files]
+
+
+def _parse_criterion_values(values: List[str], cast, name: str) -> Dict[str, Any]:
+    """
+    Parse repeated "criterion:value" query parameters.
+
+    Raises:
+        ValueError: If a value is malformed
+    """
+    parsed = {}
+    for value in values:
+        criterion, separator, number = value.rpartition(":")
+        if not separator or not criterion:
+            raise ValueError(f"Invalid {name} {value!r}, expected criterion:value.")
+        try:
+            parsed[criterion] = cast(number)
+        except ValueError:
+            raise ValueError(f"Invalid {name} {value!r}, expected criterion:value.")
+    return parsed
 
-view_obj = DashboardViews()
 
 router = APIRouter(
     prefix="/dashboard",
@@ -67,7 +175,12 @@ router = APIRouter(
         }
     }
 )
-async def extract_criteria(file: UploadFile = Depends(validate_file_type)):
+async def extract_criteria(
+    file: UploadFile = Depends(validate_file_type),
+    view_obj: DashboardViews = Depends(get_dashboard_views),
+    admission: AdmissionController = Depends(get_admission_controller),
+    tenant: str = Depends(get_tenant)
+):
     """
     Extract job criteria from an uploaded job description document.
     
@@ -81,40 +194,127 @@ async def extract_criteria(file: UploadFile = Depends(validate_file_type)):
         ValueError: If the file format is invalid
         Exception: For any other processing errors
     """
-    try:
-        # Extract criteria from the uploaded file
-        status_code, response = await view_obj.extract_criteria(file)
+    async with admission.admit(tenant, items=1):
+        try:
+            # Extract criteria from the uploaded file
+            status_code, response = await view_obj.extract_criteria(file)
 
-        # Return the response
-        return JSONResponse(
-            status_code=status_code,
-            content=response
-        )
+            # Return the response
+            return JSONResponse(
+                status_code=status_code,
+                content=response
+            )
     
-    except ValueError as e:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content=ExtractCriteriaResponse(
-                data={},
-                message="Invalid file format. Only PDF and DOCX files are accepted.",
-                error=str(e)
-            ).model_dump()
-        )
-    except Exception as e:
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content=ExtractCriteriaResponse(
-                data={},
-                message="Error extracting criteria",
-                error=str(e)
-            ).model_dump()
-        )
+        except ValueError as e:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content=ExtractCriteriaResponse(
+                    data={},
+                    message="Invalid file format. Only PDF and DOCX files are accepted.",
+                    error=str(e)
+                ).model_dump()
+            )
+        except Exception as e:
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content=ExtractCriteriaResponse(
+                    data={},
+                    message="Error extracting criteria",
+                    error=str(e)
+                ).model_dump()
+            )
+
+
+@router.post(
+    "/extract-criteria/batch",
+    response_model=ExtractCriteriaBatchResponse,
+    summary="Extract criteria from many job description documents",
+    description="Upload many job description documents (PDF or DOCX) at once. Files are processed concurrently; each gets its own result or error. With stream=true the results are streamed as newline-delimited JSON in completion order.",
+    responses={
+        200: {
+            "description": "Batch processed; per-file errors are reported in each item",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "data": [
+                            {
+                                "filename": "backend_engineer.pdf",
+                                "data": {"required_skills": ["Python", "FastAPI"]},
+                                "error": None
+                            },
+                            {
+                                "filename": "notes.txt",
+                                "data": {},
+                                "error": "Unsupported file format. Only PDF and DOCX files are supported."
+                            }
+                        ],
+                        "message": "Criteria extracted for 1 of 2 files",
+                        "error": None
+                    }
+                },
+                "application/x-ndjson": {
+                    "example": '{"index": 0, "filename": "backend_engineer.pdf", "data": {...}, "error": null}'
+                }
+            }
+        }
+    }
+)
+async def extract_criteria_batch(
+    files: List[UploadFile] = File(...),
+    stream: bool = Query(False, description="Stream results as newline-delimited JSON as they complete"),
+    view_obj: DashboardViews = Depends(get_dashboard_views),
+    admission: AdmissionController = Depends(get_admission_controller),
+    tenant: str = Depends(get_tenant)
+):
+    """
+    Extract job criteria from many uploaded job description documents.
+
+    Args:
+        files (List[UploadFile]): The job description documents (PDF or DOCX format)
+        stream (bool): Whether to stream results as newline-delimited JSON
+
+    Returns:
+        JSONResponse: All per-file results in upload order
+        StreamingResponse: Per-file results as newline-delimited JSON, in completion order
+    """
+    admission.check_request(len(files), sum(file.size or 0 for file in files))
+
+    if stream:
+        # The slot is held until the stream is fully sent, not just until this handler returns
+        release = await admission.acquire(tenant, items=len(files))
+        try:
+            # Read the uploads now: they are closed once this handler returns, before the stream is sent
+            documents = await _read_uploads(files)
+        except BaseException:
+            release()
+            raise
+
+        async def ndjson():
+            try:
+                async for result in view_obj.iter_extract_criteria_batch(documents):
+                    yield json.dumps(result) + "\n"
+            finally:
+                release()
+
+        # The background task frees the slot even if the stream is never started; release is idempotent
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson", background=BackgroundTask(release))
+
+    async with admission.admit(tenant, items=len(files)):
+        results = await view_obj.extract_criteria_batch(await _read_uploads(files))
+    succeeded = sum(1 for result in results if result["error"] is None)
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=ExtractCriteriaBatchResponse(
+            data=results,
+            message=f"Criteria extracted for {succeeded} of {len(results)} files"
+        ).model_dump()
+    )
 
 
 @router.post(
     "/score-resumes",
     summary="Score and rank resumes against job criteria",
-    description="Upload multiple resumes (PDF or DOCX) and job criteria to score and rank candidates. Returns a CSV file with rankings.",
+    description="Upload multiple resumes (PDF or DOCX) and job criteria to score and rank candidates. Returns the rankings as CSV by default, or as Parquet, Arrow or XLSX with ?format=.",
     responses={
         200: {
             "description": "Resumes successfully scored and ranked",
@@ -150,45 +350,312 @@ async def extract_criteria(file: UploadFile = Depends(validate_file_type)):
         }
     }
 )
-async def score_resumes(criteria: str = Form(...), files: List[UploadFile] = File(...)):
+async def score_resumes(
+    criteria: str = Form(...),
+    files: List[UploadFile] = File(...),
+    export_format: str = Query(
+        EXPORT_DEFAULT_FORMAT,
+        alias="format",
+        description=f"Result file format: {', '.join(EXPORT_FORMATS)}"
+    ),
+    view_obj: DashboardViews = Depends(get_dashboard_views),
+    admission: AdmissionController = Depends(get_admission_controller),
+    tenant: str = Depends(get_tenant)
+):
     """
     Score and rank multiple resumes against specified job criteria.
     
     Args:
         criteria (str): JSON string containing job criteria (required skills, preferred skills, etc.)
         files (List[UploadFile]): List of resume documents to evaluate (PDF or DOCX format)
+        export_format (str): Result file format, from the "format" query parameter
         
     Returns:
-        FileResponse: A CSV file containing the ranked results of all resumes
-        JSONResponse: Error details if processing fails
+        FileResponse: A CSV (or Parquet, Arrow, XLSX) file containing the ranked results of all resumes,
+            with the job id in the X-Job-ID header and the id of the stored scores in X-Results-ID
+        JSONResponse: Error details if processing fails, with the job id in the X-Job-ID header
         
     Raises:
         ValueError: If file formats are invalid or criteria cannot be parsed
         Exception: For any other processing errors
     """
     try:
-        # Parse the criteria from the JSON string
-        criteria = json.loads(criteria)
+        export = check_export_format(export_format)
+    except ValueError as e:
+        return _invalid_format_response("Error scoring resumes", e)
+
+    # Reject oversized requests and wait for a batch slot before doing any work
+    admission.check_request(len(files), sum(file.size or 0 for file in files))
+    job_id = _new_job_id()
+    async with admission.admit(tenant, items=len(files)):
+        try:
+            # Parse the criteria from the JSON string
+            criteria = json.loads(criteria)
 
-        # Validate the files
-        validated_files = [validate_file_type(file) for file in files]
+            # Validate the files
+            validated_files = [validate_file_type(file) for file in files]
         
-        # Score and rank the resumes
-        csv_path = await view_obj.score_resumes(criteria, validated_files)
-
-        # Return the CSV file
-        return FileResponse(
-            path=csv_path,
-            filename="resume_scores.csv",
-            media_type="text/csv"
+            # Score and rank the resumes; the job and the stored scores get ids of our own, not the client's
+            results_id = _new_results_id(view_obj)
+            result_path = await view_obj.score_resumes(criteria, validated_files, export_format, results_id, job_id)
+
+            # Return the result file
+            return FileResponse(
+                path=result_path,
+                filename=f"resume_scores.{export.extension}",
+                media_type=export.media_type,
+                headers={**_job_headers(job_id), **_results_headers(results_id)}
+            )
+        except Exception as e:
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content=ExtractCriteriaResponse(
+                    data={},
+                    message="Error scoring resumes",
+                    error=str(e)
+                ).model_dump(),
+                headers=_job_headers(job_id)
+            )
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ExtractCriteriaResponse,
+    summary="Get the progress of a scoring job",
+    description=(
+        "Return the status of a /score-resumes or /score-resume-archive batch; any worker process can answer. "
+        "The job id is generated by the server and returned in the X-Job-ID header of the scoring response, "
+        "including error responses, and stays queryable for JOB_STATE_TTL_SECONDS."
+    ),
+)
+async def get_job(job_id: str, view_obj: DashboardViews = Depends(get_dashboard_views)):
+    """
+    Report the state of a scoring job.
+
+    Args:
+        job_id (str): The X-Job-ID of the scoring response
+
+    Returns:
+        JSONResponse: The job's status, total and completed counts, or a 404 if unknown
+    """
+    job = await view_obj.get_job(job_id)
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content=ExtractCriteriaResponse(
+                data={},
+                message="Job not found",
+                error=f"No job with id {job_id}"
+            ).model_dump()
         )
-    except Exception as e:
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=ExtractCriteriaResponse(
+            data=job,
+            message="Job state retrieved successfully"
+        ).model_dump()
+    )
+
+
+@router.get(
+    "/results/{results_id}",
+    response_model=ExtractCriteriaResponse,
+    summary="Query the stored results of a scoring batch",
+    description=(
+        "Return the candidates of a finished /score-resumes or /score-resume-archive batch, best first. "
+        "The results id is returned in the X-Results-ID header of the scoring response and in the finished "
+        "job's state. The first page is the top-K by total score, or by a weighted score when "
+        "weight=criterion:value parameters are given. min_score=criterion:value parameters keep only "
+        "candidates meeting every threshold. Pass the returned next_cursor to fetch the next page."
+    ),
+)
+async def get_results(
+    results_id: str,
+    limit: int = Query(50, ge=1, le=RESULTS_MAX_PAGE_SIZE, description="Page size (K for top-K)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    weight: List[str] = Query([], description="Criterion weight as criterion:value, repeatable"),
+    min_score: List[str] = Query([], description="Minimum criterion score as criterion:value, repeatable"),
+    exclude_duplicates: bool = Query(False, description="Leave out near-duplicate resumes"),
+    view_obj: DashboardViews = Depends(get_dashboard_views)
+):
+    """
+    Page through a scoring batch's stored results.
+
+    Args:
+        results_id (str): The X-Results-ID of the scoring response
+        limit (int): Page size
+        cursor (Optional[str]): Cursor returned with the previous page
+        weight (List[str]): Criterion weights for a weighted ranking
+        min_score (List[str]): Per-criterion minimum scores
+        exclude_duplicates (bool): Whether to skip near-duplicate resumes
+
+    Returns:
+        JSONResponse: The page's candidates and the next cursor, a 400 for invalid
+            parameters, a 404 if nothing is stored under the id, or a 501 if the
+            results store is disabled
+    """
+    if view_obj.results_store is None:
+        return JSONResponse(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            content=ExtractCriteriaResponse(
+                data={},
+                message="Results store disabled",
+                error="Set RESULTS_STORE_ENABLED=true to keep scores for later queries."
+            ).model_dump()
+        )
+    try:
+        page = await view_obj.query_results(
+            results_id,
+            limit,
+            cursor,
+            weights=_parse_criterion_values(weight, float, "weight"),
+            min_scores=_parse_criterion_values(min_score, int, "min_score"),
+            exclude_duplicates=exclude_duplicates
+        )
+    except ValueError as e:
         return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=ExtractCriteriaResponse(data={}, message="Invalid results query", error=str(e)).model_dump()
+        )
+    if page is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
             content=ExtractCriteriaResponse(
                 data={},
-                message="Error scoring resumes",
-                error=str(e)
+                message="Results not found",
+                error=f"No stored results with id {results_id}"
             ).model_dump()
         )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=ExtractCriteriaResponse(data=page, message="Results retrieved successfully").model_dump()
+    )
+
+
+@router.get(
+    "/llm-pool",
+    response_model=ExtractCriteriaResponse,
+    summary="Get LLM connection pool, deployment and prompt cache statistics",
+    description="Return this worker's LLM HTTP connection pool limits and usage, for tuning the LLM_HTTP_* settings, the health, load and remaining quota of each LLM deployment, and per model the share of prompt tokens served from the provider's prompt cache.",
+)
+async def get_llm_pool(view_obj: DashboardViews = Depends(get_dashboard_views)):
+    """
+    Report the state of the LLM connection pool.
+
+    Returns:
+        JSONResponse: Pool limits, requests sent, open, idle, busy and HTTP/2 connections,
+            the state of each deployment, and prompt and cached tokens per model
+    """
+    llm_handler = view_obj.llm_handler
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content=ExtractCriteriaResponse(
+            data={
+                **llm_handler.pool_stats(),
+                "deployments": llm_handler.router.stats(),
+                "prompt_cache": llm_handler.prompt_cache.stats()
+            },
+            message="LLM pool statistics retrieved successfully"
+        ).model_dump()
+    )
+
+
+@router.post(
+    "/score-resume-archive",
+    summary="Score and rank a ZIP/TAR archive of resumes against job criteria",
+    description="Upload a single ZIP or TAR (optionally gzip/bzip2/xz compressed) archive of resumes and job criteria. PDF and DOCX members are detected by content and scored; other members are skipped. Returns the rankings as CSV by default, or as Parquet, Arrow or XLSX with ?format=.",
+    responses={
+        200: {
+            "description": "Resumes successfully scored and ranked",
+            "content": {
+                "text/csv": {
+                    "example": "File download (resume_scores.csv)"
+                }
+            }
+        },
+        400: {
+            "description": "Invalid archive, criteria or exceeded archive limits",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "data": {},
+                        "message": "Error scoring resume archive",
+                        "error": "Unsupported archive format. Only ZIP and TAR archives are supported."
+                    }
+                }
+            }
+        }
+    }
+)
+async def score_resume_archive(
+    criteria: str = Form(...),
+    archive: UploadFile = File(...),
+    export_format: str = Query(
+        EXPORT_DEFAULT_FORMAT,
+        alias="format",
+        description=f"Result file format: {', '.join(EXPORT_FORMATS)}"
+    ),
+    view_obj: DashboardViews = Depends(get_dashboard_views),
+    admission: AdmissionController = Depends(get_admission_controller),
+    tenant: str = Depends(get_tenant)
+):
+    """
+    Score and rank the resumes contained in an uploaded archive.
+
+    Args:
+        criteria (str): JSON string containing job criteria (required skills, preferred skills, etc.)
+        archive (UploadFile): ZIP or TAR archive of resume documents
+        export_format (str): Result file format, from the "format" query parameter
+
+    Returns:
+        FileResponse: A CSV (or Parquet, Arrow, XLSX) file containing the ranked results, with the number of skipped
+            members in the X-Skipped-Members header, the job id in X-Job-ID and the id of the stored scores in X-Results-ID
+        JSONResponse: Error details if processing fails, with the job id in the X-Job-ID header
+    """
+    try:
+        export = check_export_format(export_format)
+    except ValueError as e:
+        return _invalid_format_response("Error scoring resume archive", e)
+
+    # The number of resumes is unknown until the archive is read, so estimate it from the size.
+    # An archive within the byte limit must stay admissible, so the estimate is capped
+    admission.check_request(1, archive.size or 0)
+    estimated_items = min(
+        max(1, (archive.size or 0) // ADMISSION_ARCHIVE_BYTES_PER_ITEM),
+        admission.max_queued_items
+    )
+    job_id = _new_job_id()
+    async with admission.admit(tenant, items=estimated_items):
+        try:
+            criteria = json.loads(criteria)
+
+            results_id = _new_results_id(view_obj)
+            result_path, skipped = await view_obj.score_archive(criteria, archive, export_format, results_id, job_id)
 
+            return FileResponse(
+                path=result_path,
+                filename=f"resume_scores.{export.extension}",
+                media_type=export.media_type,
+                headers={"X-Skipped-Members": str(len(skipped)), **_job_headers(job_id), **_results_headers(results_id)}
+            )
+        except HTTPException as e:
+            return JSONResponse(
+                status_code=e.status_code,
+                content=ExtractCriteriaResponse(
+                    data={},
+                    message="Error scoring resume archive",
+                    error=str(e.detail)
+                ).model_dump(),
+                headers=_job_headers(job_id)
+            )
+        except Exception as e:
+            return JSONResponse(
+                # Invalid criteria JSON is the client's error; anything else is ours
+                status_code=status.HTTP_400_BAD_REQUEST if isinstance(e, json.JSONDecodeError) else status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content=ExtractCriteriaResponse(
+                    data={},
+                    message="Error scoring resume archive",
+                    error=str(e)
+                ).model_dump(),
+                headers=_job_headers(job_id)
+            )
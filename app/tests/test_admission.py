@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from core.utils.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController:
+    @pytest.mark.asyncio
+    async def test_batches_beyond_limit_wait_for_a_slot(self):
+        controller = AdmissionController(max_concurrent_batches=1, max_queued_items=100, queue_timeout=1)
+        release = await controller.acquire("tenant-a", items=5)
+
+        waiter = asyncio.create_task(controller.acquire("tenant-a", items=5))
+        await asyncio.sleep(0)
+        assert controller.stats() == {"active_batches": 1, "waiting_batches": 1, "queued_items": 10}
+
+        release()
+        second_release = await waiter
+        assert controller.stats()["active_batches"] == 1
+        second_release()
+        assert controller.stats() == {"active_batches": 0, "waiting_batches": 0, "queued_items": 0}
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_returns_429_with_retry_after(self):
+        controller = AdmissionController(max_concurrent_batches=1, queue_timeout=0.01)
+        await controller.acquire("tenant-a", items=1)
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("tenant-a", items=1)
+
+        assert excinfo.value.status_code == 429
+        assert excinfo.value.retry_after >= 1
+        assert controller.stats()["queued_items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_too_many_queued_items_returns_503(self):
+        controller = AdmissionController(max_queued_items=10)
+        await controller.acquire("tenant-a", items=8)
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire("tenant-b", items=3)
+
+        assert excinfo.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_freed_slots_go_to_the_least_served_tenant(self):
+        controller = AdmissionController(max_concurrent_batches=2, queue_timeout=1)
+        release_a1 = await controller.acquire("tenant-a", items=1)
+        await controller.acquire("tenant-a", items=1)
+
+        # tenant-a queues first, but tenant-b has nothing running
+        waiter_a = asyncio.create_task(controller.acquire("tenant-a", items=1))
+        await asyncio.sleep(0)
+        waiter_b = asyncio.create_task(controller.acquire("tenant-b", items=1))
+        await asyncio.sleep(0)
+
+        release_a1()
+        await asyncio.wait_for(waiter_b, 1)
+        assert not waiter_a.done()
+        waiter_a.cancel()
+
+    def test_per_request_limits_return_413(self):
+        controller = AdmissionController(max_files_per_request=2, max_request_bytes=100)
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            controller.check_request(file_count=3, total_bytes=10)
+        assert excinfo.value.status_code == 413
+
+        with pytest.raises(AdmissionRejected):
+            controller.check_request(file_count=1, total_bytes=101)
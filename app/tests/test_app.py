@@ -1,15 +1,27 @@
+import io
+import json
+import zipfile
+
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
-from fastapi import UploadFile
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
 
-from views.dashboard_views import DashboardViews
+from core.duplicate_detector import NearDuplicateDetector
+from core.utils.admission import AdmissionController
+from core.utils.results_store import ResultsStore
+from core.utils.shared_state import InMemoryStateBackend
+from routes import dashboard
+from views.dashboard_views import DashboardViews, _RankingBatch
 from fastapi import status
 
 
 class TestDashboardViews:
     @pytest.fixture
-    def dashboard_views(self):
-        return DashboardViews()
+    def dashboard_views(self, tmp_path):
+        results_store = ResultsStore(str(tmp_path / "results.sqlite3"))
+        yield DashboardViews(results_store=results_store)
+        results_store.close()
         
     @patch('views.dashboard_views.TextExtractor')
     @patch('views.dashboard_views.CriteriaExtractor')
@@ -141,3 +153,277 @@ class TestDashboardViews:
         assert response["message"] == "Error scoring resumes"
         assert response["error"] == "Test error"
 
+
+    @pytest.mark.asyncio
+    async def test_extract_criteria_batch_reports_per_file_errors(self, dashboard_views):
+        # Setup mocks: the second file cannot be parsed
+        mock_text_extractor = MagicMock()
+        mock_text_extractor.extract_text_from_bytes = AsyncMock(
+            side_effect=["JD 1", ValueError("Unsupported file format"), "JD 3"]
+        )
+        mock_criteria_extractor = MagicMock()
+        mock_criteria_extractor.extract_criteria = AsyncMock(return_value={"required_skills": ["Python"]})
+
+        dashboard_views.text_extractor = mock_text_extractor
+        dashboard_views.criteria_extractor = mock_criteria_extractor
+
+        # Create the uploaded documents
+        documents = [(name, b"content") for name in ["jd1.pdf", "jd2.txt", "jd3.docx"]]
+
+        # Test batch extraction
+        results = await dashboard_views.extract_criteria_batch(documents)
+
+        # Assertions: results keep upload order, failures do not fail the batch
+        assert [result["filename"] for result in results] == ["jd1.pdf", "jd2.txt", "jd3.docx"]
+        assert results[0]["data"] == {"required_skills": ["Python"]}
+        assert results[1]["data"] == {}
+        assert results[1]["error"] == "Unsupported file format"
+        assert mock_criteria_extractor.extract_criteria.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_score_archive_ranks_members_and_tracks_the_total(self, dashboard_views):
+        # Setup an in-memory ZIP with two resumes and one unsupported member
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("resumes/asha.pdf", b"%PDF-1.4 asha")
+            archive.writestr("resumes/bala.pdf", b"%PDF-1.4 bala")
+            archive.writestr("notes.txt", b"not a resume")
+        mock_archive = MagicMock(spec=UploadFile)
+        mock_archive.file = buffer
+
+        mock_text_extractor = MagicMock()
+        mock_text_extractor.extract_text_from_bytes = AsyncMock(side_effect=[
+            "Asha, backend engineer with Python and FastAPI",
+            "Bala, data analyst with SQL and Tableau"
+        ])
+        mock_resume_ranker = MagicMock()
+        mock_resume_ranker.rank_resume = AsyncMock(return_value={
+            "candidate_name": "Candidate",
+            "scores": [{"criteria": "required_skills", "score": 4}]
+        })
+        mock_csv_utils = MagicMock()
+        mock_csv_utils.create_csv = MagicMock(return_value="path/to/csv")
+
+        dashboard_views.text_extractor = mock_text_extractor
+        dashboard_views.resume_ranker = mock_resume_ranker
+        dashboard_views.csv_utils = mock_csv_utils
+
+        # Test archive scoring under a known job id
+        result_path, skipped = await dashboard_views.score_archive(
+            {"required_skills": ["Python"]}, mock_archive, job_id="archive-job"
+        )
+
+        # Assertions
+        assert result_path == "path/to/csv"
+        assert skipped == ["notes.txt"]
+        assert mock_resume_ranker.rank_resume.call_count == 2
+        job = await dashboard_views.get_job("archive-job")
+        assert job["status"] == "completed"
+        assert job["total"] == 2
+        assert job["completed"] == 2
+        assert set(job["result"]) == {"format", "results_id", "total", "skipped"}
+
+    @pytest.mark.asyncio
+    async def test_score_archive_maps_only_archive_errors_to_400(self, dashboard_views):
+        # Not an archive: a client error
+        mock_archive = MagicMock(spec=UploadFile)
+        mock_archive.file = io.BytesIO(b"plain text, not an archive")
+        with pytest.raises(HTTPException) as error:
+            await dashboard_views.score_archive({"required_skills": ["Python"]}, mock_archive)
+        assert error.value.status_code == status.HTTP_400_BAD_REQUEST
+
+        # A ValueError from the ranker is a server error
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("asha.pdf", b"%PDF-1.4 asha")
+        mock_archive.file = buffer
+        dashboard_views.text_extractor = MagicMock()
+        dashboard_views.text_extractor.extract_text_from_bytes = AsyncMock(return_value="Asha, backend engineer")
+        dashboard_views.resume_ranker = MagicMock()
+        dashboard_views.resume_ranker.rank_resume = AsyncMock(side_effect=ValueError("Unexpected LLM response"))
+        with pytest.raises(HTTPException) as error:
+            await dashboard_views.score_archive({"required_skills": ["Python"]}, mock_archive)
+        assert error.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    @pytest.mark.asyncio
+    async def test_ranking_batch_gives_every_resume_a_unique_name(self, dashboard_views):
+        dashboard_views.resume_ranker = MagicMock()
+        dashboard_views.resume_ranker.rank_resume = AsyncMock(return_value={"candidate_name": "Candidate", "scores": []})
+        batch = _RankingBatch(dashboard_views, "names-job", {"required_skills": ["Python"]})
+
+        # The third resume would be renamed to "cv.pdf#3", which the second one already uses
+        resumes = [
+            ("cv.pdf", "Asha, backend engineer with Python and FastAPI"),
+            ("cv.pdf#3", "Bala, data analyst with SQL and Tableau"),
+            ("cv.pdf", "Chen, mobile developer with Kotlin and Swift"),
+        ]
+        for name, resume_text in resumes:
+            await batch.add(name, resume_text)
+        await batch.results()
+
+        assert batch.names == ["cv.pdf", "cv.pdf#3", "cv.pdf#4"]
+
+    @pytest.mark.asyncio
+    async def test_ranking_batch_computes_each_signature_once(self, dashboard_views):
+        dashboard_views.resume_ranker = MagicMock()
+        dashboard_views.resume_ranker.rank_resume = AsyncMock(return_value={"candidate_name": "Candidate", "scores": []})
+        batch = _RankingBatch(dashboard_views, "signature-job", {"required_skills": ["Python"]})
+        batch.detector = NearDuplicateDetector(state_backend=InMemoryStateBackend())
+
+        with patch.object(batch.detector, "signature", wraps=batch.detector.signature) as signature:
+            await batch.add("asha.pdf", "Asha, backend engineer with Python and FastAPI")
+            await batch.add("bala.pdf", "Bala, data analyst with SQL and Tableau")
+            await batch.results()
+
+        assert signature.call_count == 2
+
+
+class TestDashboardRoutes:
+    @pytest.fixture
+    def dashboard_views(self, tmp_path):
+        results_store = ResultsStore(str(tmp_path / "results.sqlite3"))
+        dashboard_views = DashboardViews(results_store=results_store)
+        dashboard_views.text_extractor = MagicMock()
+        dashboard_views.text_extractor.extract_text_from_bytes = AsyncMock(
+            side_effect=lambda content: content.decode("utf-8")
+        )
+        dashboard_views.criteria_extractor = MagicMock()
+        dashboard_views.criteria_extractor.extract_criteria = AsyncMock(return_value={"required_skills": ["Python"]})
+        yield dashboard_views
+        results_store.close()
+
+    @pytest.fixture
+    def admission_controller(self):
+        return AdmissionController()
+
+    @pytest.fixture
+    def client(self, dashboard_views, admission_controller):
+        app = FastAPI()
+        app.include_router(dashboard.router)
+        app.state.dashboard_views = dashboard_views
+        app.state.admission_controller = admission_controller
+        return TestClient(app)
+
+    def test_tenant_header_is_only_trusted_when_configured(self, monkeypatch):
+        request = Request({
+            "type": "http",
+            "headers": [(b"x-tenant-id", b"rotated-id")],
+            "client": ("203.0.113.7", 50000),
+        })
+        assert dashboard.get_tenant(request) == "203.0.113.7"
+
+        monkeypatch.setattr(dashboard, "ADMISSION_TRUST_TENANT_HEADER", True)
+        assert dashboard.get_tenant(request) == "rotated-id"
+
+    def test_extract_criteria_batch_stream(self, client, dashboard_views, admission_controller):
+        files = [
+            ("files", ("jd1.pdf", b"Backend engineer, Python", "application/pdf")),
+            ("files", ("jd2.pdf", b"Data engineer, SQL", "application/pdf")),
+        ]
+
+        response = client.post("/dashboard/extract-criteria/batch?stream=true", files=files)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        items = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(item["filename"] for item in items) == ["jd1.pdf", "jd2.pdf"]
+        assert all(item["error"] is None for item in items)
+        assert all(item["data"] == {"required_skills": ["Python"]} for item in items)
+        # The uploads were read while the request was open
+        assert dashboard_views.text_extractor.extract_text_from_bytes.call_count == 2
+        assert admission_controller.stats()["active_batches"] == 0
+
+    @pytest.mark.asyncio
+    async def test_extract_criteria_batch_stream_outlives_the_uploads(self, dashboard_views, admission_controller):
+        # FastAPI closes the uploads as soon as the handler returns, before a streamed body is sent
+        files = [UploadFile(io.BytesIO(b"Backend engineer, Python"), filename="jd1.pdf")]
+        response = await dashboard.extract_criteria_batch(
+            files=files,
+            stream=True,
+            view_obj=dashboard_views,
+            admission=admission_controller,
+            tenant="default"
+        )
+        for file in files:
+            await file.close()
+
+        items = [json.loads(chunk) async for chunk in response.body_iterator]
+        assert [item["error"] for item in items] == [None]
+
+    @pytest.mark.asyncio
+    async def test_stream_slot_is_released_when_the_stream_never_starts(self, dashboard_views, admission_controller):
+        files = [UploadFile(io.BytesIO(b"Backend engineer, Python"), filename="jd1.pdf")]
+        response = await dashboard.extract_criteria_batch(
+            files=files,
+            stream=True,
+            view_obj=dashboard_views,
+            admission=admission_controller,
+            tenant="default"
+        )
+        assert admission_controller.stats()["active_batches"] == 1
+
+        # The client went away before the body was sent; only the background task runs
+        await response.background()
+        assert admission_controller.stats() == {"active_batches": 0, "waiting_batches": 0, "queued_items": 0}
+
+    def test_large_archive_estimate_is_capped_to_the_queue(self, client, dashboard_views, admission_controller, tmp_path, monkeypatch):
+        monkeypatch.setattr(dashboard, "ADMISSION_ARCHIVE_BYTES_PER_ITEM", 10)
+        admission_controller.max_queued_items = 2
+        result_path = tmp_path / "resume_scores.csv"
+        result_path.write_text("Candidate Name,Total Score\n")
+        dashboard_views.score_archive = AsyncMock(return_value=(str(result_path), []))
+
+        # About 100 estimated items against a queue of 2
+        response = client.post(
+            "/dashboard/score-resume-archive",
+            data={"criteria": json.dumps({"required_skills": ["Python"]})},
+            files={"archive": ("resumes.zip", b"x" * 1000, "application/zip")}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["X-Skipped-Members"] == "0"
+
+    def test_scores_are_stored_under_a_server_generated_id(self, client, dashboard_views, tmp_path):
+        dashboard_views.text_extractor.extract_text = AsyncMock(side_effect=[
+            "Asha, backend engineer with Python and FastAPI",
+            "Bala, data analyst with SQL and Tableau"
+        ])
+        dashboard_views.resume_ranker = MagicMock()
+        dashboard_views.resume_ranker.rank_resume = AsyncMock(side_effect=[
+            {"candidate_name": "Asha", "scores": [{"criteria": "required_skills", "score": 5}]},
+            {"candidate_name": "Bala", "scores": [{"criteria": "required_skills", "score": 2}]}
+        ])
+        result_path = tmp_path / "resume_scores.csv"
+        result_path.write_text("Candidate Name,Total Score\n")
+        dashboard_views.csv_utils = MagicMock()
+        dashboard_views.csv_utils.create_csv = MagicMock(return_value=str(result_path))
+
+        response = client.post(
+            "/dashboard/score-resumes",
+            headers={"X-Request-ID": "client-chosen-id"},
+            data={"criteria": json.dumps({"required_skills": ["Python"]})},
+            files=[
+                ("files", ("asha.pdf", b"%PDF-1.4 asha", "application/pdf")),
+                ("files", ("bala.pdf", b"%PDF-1.4 bala", "application/pdf")),
+            ]
+        )
+
+        assert response.status_code == 200
+        results_id = response.headers["X-Results-ID"]
+        assert results_id != "client-chosen-id"
+        page = client.get(f"/dashboard/results/{results_id}").json()["data"]
+        assert page["results_id"] == results_id
+        assert [item["resume"] for item in page["items"]] == ["asha.pdf", "bala.pdf"]
+        assert client.get("/dashboard/results/client-chosen-id").status_code == 404
+
+        # The job id is ours too, and the job state does not leak the result file's path
+        job_id = response.headers["X-Job-ID"]
+        assert job_id != "client-chosen-id"
+        assert client.get("/dashboard/jobs/client-chosen-id").status_code == 404
+        job = client.get(f"/dashboard/jobs/{job_id}").json()["data"]
+        assert job["status"] == "completed" and job["result"]["results_id"] == results_id
+        assert str(tmp_path) not in json.dumps(job)
+
+    def test_results_query_without_a_store_is_501(self, client, dashboard_views):
+        dashboard_views.results_store = None
+        assert client.get("/dashboard/results/anything").status_code == 501
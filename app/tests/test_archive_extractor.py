@@ -0,0 +1,101 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from core.archive_extractor import ArchiveExtractor
+from core.text_extractor import PDF_CONTENT_TYPE, DOCX_CONTENT_TYPE
+
+PDF_BYTES = b"%PDF-1.4\nmock pdf content"
+
+
+def make_docx_bytes():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as docx_file:
+        docx_file.writestr("[Content_Types].xml", "<Types/>")
+        docx_file.writestr("word/document.xml", "<document/>")
+    return buffer.getvalue()
+
+
+def make_zip(members, compression=zipfile.ZIP_STORED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def make_tar_gz(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    buffer.seek(0)
+    return buffer
+
+
+class TestArchiveExtractor:
+    def test_zip_members_detected_by_content(self):
+        archive = make_zip({
+            "resumes/jane.pdf": PDF_BYTES,
+            # Misleading extension: detected as DOCX from its content
+            "resumes/john.bin": make_docx_bytes(),
+            "notes.txt": b"not a resume",
+        })
+        extractor = ArchiveExtractor()
+
+        members = list(extractor.iter_members(archive))
+
+        assert [(m.name, m.content_type) for m in members] == [
+            ("resumes/jane.pdf", PDF_CONTENT_TYPE),
+            ("resumes/john.bin", DOCX_CONTENT_TYPE),
+        ]
+        assert extractor.skipped == ["notes.txt"]
+
+    def test_tar_gz_is_streamed(self):
+        archive = make_tar_gz({"jane.pdf": PDF_BYTES, "photo.jpg": b"\xff\xd8\xff"})
+        extractor = ArchiveExtractor()
+
+        members = list(extractor.iter_members(archive))
+
+        assert [m.name for m in members] == ["jane.pdf"]
+        assert extractor.skipped == ["photo.jpg"]
+
+    def test_oversized_member_is_skipped(self):
+        archive = make_zip({"big.pdf": PDF_BYTES + b"x" * 100, "small.pdf": PDF_BYTES})
+        extractor = ArchiveExtractor(max_member_bytes=len(PDF_BYTES))
+
+        assert [m.name for m in extractor.iter_members(archive)] == ["small.pdf"]
+        assert extractor.skipped == ["big.pdf"]
+
+    def test_member_count_limit(self):
+        archive = make_zip({f"{i}.pdf": PDF_BYTES for i in range(3)})
+
+        with pytest.raises(ValueError, match="more than 2 files"):
+            list(ArchiveExtractor(max_members=2).iter_members(archive))
+
+    def test_member_over_the_compression_ratio_is_skipped(self):
+        archive = make_zip({
+            "bomb.pdf": PDF_BYTES + b"\0" * (5 * 1024 * 1024),
+            "jane.pdf": PDF_BYTES,
+        }, compression=zipfile.ZIP_DEFLATED)
+        extractor = ArchiveExtractor()
+
+        assert [m.name for m in extractor.iter_members(archive)] == ["jane.pdf"]
+        assert extractor.skipped == ["bomb.pdf"]
+
+    def test_skipped_members_count_towards_the_total_size(self):
+        archive = make_tar_gz({f"{i}.pdf": PDF_BYTES + b"\0" * 1000 for i in range(5)})
+        extractor = ArchiveExtractor(max_member_bytes=100, max_total_bytes=3000)
+
+        with pytest.raises(ValueError, match="maximum decompressed size"):
+            list(extractor.iter_members(archive))
+        assert extractor.skipped == ["0.pdf", "1.pdf", "2.pdf"]
+
+    def test_unsupported_archive(self):
+        with pytest.raises(ValueError, match="Unsupported archive format"):
+            list(ArchiveExtractor().iter_members(io.BytesIO(PDF_BYTES)))
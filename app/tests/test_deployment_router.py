@@ -0,0 +1,84 @@
+import pytest
+
+from core.utils.deployment_router import Deployment, DeploymentRouter, is_deployment_error
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def router():
+    return DeploymentRouter([
+        Deployment("key-a", "gpt-4o-mini", "gpt-4o-mini", api_key="sk-a"),
+        Deployment("key-b", "gpt-4o-mini", "gpt-4o-mini", api_key="sk-b"),
+        Deployment("eu", "gpt-4o", "azure/gpt-4o-eu"),
+    ], failure_threshold=2, cooldown_seconds=60)
+
+
+class TestDeploymentRouter:
+    def test_calls_spread_over_the_least_busy_deployment(self, router):
+        first = router.acquire("gpt-4o-mini")
+        second = router.acquire("gpt-4o-mini")
+        assert {first.name, second.name} == {"key-a", "key-b"}
+
+        router.release(first)
+        assert router.acquire("gpt-4o-mini") is first
+
+    def test_ties_prefer_remaining_quota(self):
+        router = DeploymentRouter([
+            Deployment("small", "gpt-4o-mini", "gpt-4o-mini", rpm=10),
+            Deployment("large", "gpt-4o-mini", "gpt-4o-mini", rpm=1000),
+        ])
+        for _ in range(3):
+            router.release(router.acquire("gpt-4o-mini"))
+        assert router.acquire("gpt-4o-mini").name == "large"
+
+    def test_rate_limit_puts_deployment_in_cooldown(self, router):
+        failing = router.acquire("gpt-4o-mini")
+        router.release(failing, error=ProviderError(429))
+
+        for _ in range(3):
+            chosen = router.acquire("gpt-4o-mini")
+            assert chosen is not failing
+            router.release(chosen)
+
+    def test_consecutive_failures_trigger_cooldown(self, router):
+        deployment = router.acquire("gpt-4o-mini", exclude={"key-b"})
+        router.release(deployment, error=ProviderError(500))
+        assert router.stats()[0]["healthy"] is True
+
+        router.acquire("gpt-4o-mini", exclude={"key-b"})
+        router.release(deployment, error=ProviderError(500))
+        assert router.stats()[0]["healthy"] is False
+
+    def test_request_errors_and_cancellations_do_not_count(self, router):
+        deployment = router.acquire("gpt-4o-mini")
+        router.release(deployment, error=ProviderError(400))
+        deployment = router.acquire("gpt-4o-mini")
+        router.release(deployment, error=ProviderError(400))
+        assert all(stats["consecutive_failures"] == 0 for stats in router.stats())
+        assert not is_deployment_error(ProviderError(422))
+        assert is_deployment_error(TimeoutError())
+
+    def test_avoid_is_a_preference_and_exclude_is_not(self, router):
+        assert router.acquire("gpt-4o", avoid={"eu"}).name == "eu"
+        assert router.acquire("gpt-4o", exclude={"eu"}) is None
+        assert router.acquire("gpt-4o-mini", avoid={"key-a"}).name == "key-b"
+
+    def test_all_cooling_down_falls_back_to_earliest_recovery(self, router):
+        deployment = router.acquire("gpt-4o")
+        router.release(deployment, error=ProviderError(429))
+        assert router.acquire("gpt-4o") is deployment
+
+    def test_deployment_from_config_reads_key_from_environment(self, monkeypatch):
+        monkeypatch.setenv("EU_KEY", "sk-eu")
+        deployment = Deployment.from_config({
+            "name": "eu", "model": "azure/gpt-4o-eu", "model_group": "gpt-4o", "api_key_env": "EU_KEY", "rpm": 600
+        })
+        assert (deployment.model_group, deployment.api_key, deployment.rpm) == ("gpt-4o", "sk-eu", 600)
+
+        with pytest.raises(ValueError):
+            Deployment.from_config({"model": "gpt-4o"})
@@ -0,0 +1,44 @@
+import random
+
+from core.duplicate_detector import NearDuplicateDetector
+from core.utils.shared_state import InMemoryStateBackend
+
+WORDS = ["python", "fastapi", "docker", "aws", "kubernetes", "backend", "team", "led", "built", "api",
+         "service", "data", "pipeline", "design", "testing", "cloud", "scaled", "users", "latency", "sql"]
+
+
+def make_resume(seed, length=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+class TestNearDuplicateDetector:
+    def test_groups_near_duplicates(self):
+        original = make_resume(1)
+        # A revision with a few words changed at the end
+        revision = original + " certified kubernetes administrator"
+        other = make_resume(2)
+
+        representatives = NearDuplicateDetector().group([original, other, revision, original])
+
+        assert representatives == [0, 1, 0, 0]
+
+    def test_empty_texts_are_never_duplicates(self):
+        assert NearDuplicateDetector().group(["", "", "  "]) == [0, 1, 2]
+
+    def test_similarity_of_identical_and_different_texts(self):
+        detector = NearDuplicateDetector()
+        signature = detector.signature(make_resume(1))
+        assert detector.similarity(signature, signature) == 1.0
+        assert detector.similarity(signature, detector.signature(make_resume(3))) < 0.5
+
+    def test_matches_previous_batches(self):
+        backend = InMemoryStateBackend()
+        resume = make_resume(1)
+
+        first_batch = NearDuplicateDetector(state_backend=backend)
+        assert first_batch.match_previous_batches("job-1/jane.pdf", resume) is None
+
+        second_batch = NearDuplicateDetector(state_backend=backend)
+        assert second_batch.match_previous_batches("job-2/jane.docx", resume) == "job-1/jane.pdf"
+        assert second_batch.match_previous_batches("job-2/john.pdf", make_resume(2)) is None
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from core.utils.csv_utils import CSVUtils
+from core.utils.exporters import ArrowExporter, check_export_format, export_results, result_rows
+
+RESULTS = [
+    {
+        "candidate_name": "Rajat",
+        "scores": [{"criteria": "required_skills", "score": 4}, {"criteria": "experience", "score": 3}],
+        "metadata": {"input_tokens": 812, "truncated_tokens": 0}
+    },
+    {
+        "candidate_name": "Rajat",
+        "scores": [{"criteria": "required_skills", "score": 4}, {"criteria": "experience", "score": 3}],
+        "duplicate_of": "rajat.pdf"
+    },
+    {
+        "candidate_name": "Priya",
+        "scores": [{"criteria": "required_skills", "score": 5}]
+    },
+]
+NAMES = ["rajat.pdf", "rajat.docx", "priya.pdf"]
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+class TestExporters:
+    def test_rows_are_typed_with_totals(self):
+        rows = list(result_rows(RESULTS, ["experience", "required_skills"], "job-1", NAMES))
+
+        assert rows[0]["score_required_skills"] == 4
+        assert rows[0]["total_score"] == 7 and rows[0]["max_score"] == 10
+        assert rows[0]["score_ratio"] == pytest.approx(0.7)
+        assert rows[0]["input_tokens"] == 812
+        assert rows[1]["duplicate_of"] == "rajat.pdf"
+        assert rows[2]["score_experience"] is None
+        assert [row["resume"] for row in rows] == NAMES
+
+    def test_parquet_export_has_typed_columns_and_metadata(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = export_results(RESULTS, "parquet", "job-1", {"required_skills": ["Python"]}, NAMES)
+        table = pq.read_table(path)
+
+        assert table.num_rows == 3
+        assert table.schema.field("score_required_skills").type == pa.int16()
+        assert table.schema.field("total_score").type == pa.int32()
+        assert table.column("total_score").to_pylist() == [7, 7, 5]
+        metadata = table.schema.metadata
+        assert metadata[b"job_id"] == b"job-1"
+        assert json.loads(metadata[b"criteria"]) == {"required_skills": ["Python"]}
+
+    def test_arrow_export_is_written_in_chunks(self, tmp_path):
+        import pyarrow as pa
+
+        criteria = ["experience", "required_skills"]
+        path = str(tmp_path / "scores.arrow")
+        with ArrowExporter(path, criteria, {"job_id": "job-1"}, chunk_size=2) as exporter:
+            assert exporter.write(result_rows(RESULTS, criteria, "job-1", NAMES)) == 3
+
+        with pa.ipc.open_file(path) as reader:
+            assert reader.num_record_batches == 2
+            assert reader.read_all().column("candidate_name").to_pylist() == ["Rajat", "Rajat", "Priya"]
+
+    def test_xlsx_export_has_results_and_metadata_sheets(self):
+        from openpyxl import load_workbook
+
+        path = export_results(RESULTS, "xlsx", "job-1", names=NAMES)
+        workbook = load_workbook(path)
+
+        rows = list(workbook["Results"].values)
+        header = rows[0]
+        assert rows[1][header.index("total_score")] == 7
+        assert dict(workbook["Metadata"].values)["candidates"] == "3"
+
+    def test_unknown_format_is_rejected(self):
+        with pytest.raises(ValueError):
+            check_export_format("json")
+        assert check_export_format("csv").media_type == "text/csv"
+
+    def test_export_paths_ignore_the_job_id_and_do_not_collide(self, tmp_path):
+        first = export_results(RESULTS, "arrow", "../../etc/job", names=NAMES)
+        second = export_results(RESULTS, "arrow", "../../etc/job", names=NAMES)
+
+        assert first != second
+        for path in (first, second):
+            assert os.path.dirname(os.path.abspath(path)) == str(tmp_path / "output_files")
+            assert "etc" not in os.path.basename(path)
+
+    def test_csv_paths_do_not_collide(self):
+        assert CSVUtils.create_csv(RESULTS) != CSVUtils.create_csv(RESULTS)
@@ -0,0 +1,194 @@
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.utils.deployment_router import Deployment, DeploymentRouter
+from core.utils.hedging import HedgeBudget, LatencyTracker
+from core.utils.llm_handler import LLMHandler
+from core.utils.shared_state import InMemoryStateBackend
+
+
+@pytest.fixture
+def handler():
+    return LLMHandler(state_backend=InMemoryStateBackend())
+
+
+def mock_response(content="{}"):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_open_is_idempotent_and_close_releases_the_pool(self, handler):
+        assert handler.pool_stats()["open"] is False
+
+        handler.open()
+        client = handler.http_client
+        handler.open()
+        assert handler.http_client is client
+        assert handler.pool_stats()["open"] is True
+        assert handler.pool_stats()["connections"] == 0
+
+        await handler.aclose()
+        assert handler.http_client is None
+
+    @pytest.mark.asyncio
+    async def test_pool_stats_tolerate_a_changed_pool(self, handler):
+        handler.open()
+        # A future httpcore without the private attributes pool_stats reads
+        with patch.object(handler.http_client._transport, "_pool", object()):
+            stats = handler.pool_stats()
+
+        assert stats["open"] is True
+        assert stats["connections"] == 0 and stats["waiting_requests"] == 0
+        await handler.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warm_connections_counts_responses_and_tolerates_errors(self, handler):
+        handler.open()
+        handler.http_client.get = AsyncMock(side_effect=[
+            httpx.Response(401),
+            httpx.ConnectError("unreachable"),
+            httpx.Response(200),
+        ])
+
+        assert await handler.warm_connections(count=3) == 2
+        await handler.aclose()
+
+    @patch('core.utils.llm_handler.OPENAI_API_KEY', "sk-test")
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_openai_calls_use_the_pooled_client(self, mock_acompletion, handler):
+        mock_acompletion.side_effect = AsyncMock(return_value=mock_response())
+        handler.open()
+
+        await handler.call_llm("system", "user", model="gpt-4o-mini", temperature=0.5)
+
+        client = mock_acompletion.call_args.kwargs["client"]
+        assert client._client is handler.http_client
+        await handler.aclose()
+
+    @patch('core.utils.llm_handler.OPENAI_API_KEY', "sk-test")
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_unopened_handler_leaves_client_to_litellm(self, mock_acompletion, handler):
+        mock_acompletion.side_effect = AsyncMock(return_value=mock_response())
+
+        await handler.call_llm("system", "user", model="gpt-4o-mini", temperature=0.5)
+
+        assert "client" not in mock_acompletion.call_args.kwargs
+
+
+class TestHedging:
+    def test_latency_percentile_needs_min_samples(self):
+        tracker = LatencyTracker(window=100, min_samples=10)
+        for i in range(9):
+            tracker.record("gpt-4o-mini", float(i))
+        assert tracker.percentile("gpt-4o-mini", 95) is None
+
+        tracker.record("gpt-4o-mini", 100.0)
+        assert tracker.percentile("gpt-4o-mini", 90) == 8.0
+        assert tracker.percentile("gpt-4o-mini", 100) == 100.0
+
+    def test_budget_caps_hedges_to_a_fraction_of_calls(self):
+        budget = HedgeBudget(ratio=0.1)
+        for _ in range(19):
+            budget.record_call()
+        assert budget.try_spend() is True
+        assert budget.try_spend() is False
+        budget.record_call()
+        assert budget.try_spend() is True
+
+    @patch('core.utils.llm_handler.LLM_HEDGING_ENABLED', True)
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_straggling_call_is_hedged_and_loser_cancelled(self, mock_acompletion, handler):
+        cancelled = []
+
+        async def completion(**kwargs):
+            call = mock_acompletion.call_count
+            try:
+                await asyncio.sleep(5 if call == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(call)
+                raise
+            return mock_response(f"response {call}")
+        mock_acompletion.side_effect = completion
+
+        for _ in range(20):
+            handler.latencies.record("gpt-4o-mini", 0.01)
+            handler.hedge_budget.record_call()
+
+        content = await asyncio.wait_for(handler.call_llm("system", "user", temperature=0.5), 2)
+
+        assert content == "response 2"
+        assert mock_acompletion.call_count == 2
+        assert cancelled == [1]
+        # Only the hedge completed; the cancelled primary's truncated time is not a sample
+        assert len(handler.latencies._samples["gpt-4o-mini"]) == 21
+
+    @patch('core.utils.llm_handler.LLM_HEDGING_ENABLED', True)
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_enough_latency_samples(self, mock_acompletion, handler):
+        async def completion(**kwargs):
+            await asyncio.sleep(0.05)
+            return mock_response("slow but only")
+        mock_acompletion.side_effect = completion
+
+        assert await handler.call_llm("system", "user", temperature=0.5) == "slow but only"
+        assert mock_acompletion.call_count == 1
+
+
+class TestDeploymentFailover:
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_failed_deployment_fails_over_to_the_next(self, mock_acompletion):
+        error = Exception("rate limited")
+        error.status_code = 429
+        mock_acompletion.side_effect = [error, mock_response("ok")]
+        router = DeploymentRouter([
+            Deployment("key-a", "gpt-4o-mini", "gpt-4o-mini", api_key="sk-a"),
+            Deployment("key-b", "gpt-4o-mini", "gpt-4o-mini", api_key="sk-b"),
+        ])
+        handler = LLMHandler(state_backend=InMemoryStateBackend(), router=router)
+
+        assert await handler.call_llm("system", "user", temperature=0.5) == "ok"
+
+        used_keys = [call.kwargs["api_key"] for call in mock_acompletion.call_args_list]
+        assert sorted(used_keys) == ["sk-a", "sk-b"]
+        assert [stats["healthy"] for stats in router.stats()].count(False) == 1
+
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_request_errors_are_not_retried(self, mock_acompletion):
+        error = Exception("bad request")
+        error.status_code = 400
+        mock_acompletion.side_effect = error
+        router = DeploymentRouter([
+            Deployment("key-a", "gpt-4o-mini", "gpt-4o-mini", api_key="sk-a"),
+            Deployment("key-b", "gpt-4o-mini", "gpt-4o-mini", api_key="sk-b"),
+        ])
+        handler = LLMHandler(state_backend=InMemoryStateBackend(), router=router)
+
+        with pytest.raises(Exception, match="bad request"):
+            await handler.call_llm("system", "user", temperature=0.5)
+        assert mock_acompletion.call_count == 1
+
+
+class TestPromptCache:
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_cached_prompt_tokens_are_recorded_per_model(self, mock_acompletion, handler):
+        response = mock_response()
+        response.usage.prompt_tokens = 1800
+        response.usage.prompt_tokens_details.cached_tokens = 1280
+        mock_acompletion.side_effect = AsyncMock(return_value=response)
+
+        await handler.call_llm("system", "user", model="gpt-4o-mini", temperature=0.5)
+
+        assert handler.prompt_cache.stats()["gpt-4o-mini"]["cached_tokens"] == 1280
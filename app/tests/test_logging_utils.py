@@ -0,0 +1,63 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from core.utils.logging_utils import JSONFormatter, JSONQueueHandler, PayloadSamplingFilter, RequestContextFilter
+from core.utils.tracing import set_request_id, reset_request_id
+
+
+def make_record(**extra):
+    record = logging.LogRecord("core.resume_ranker", logging.INFO, __file__, 1, "Ranking resume", None, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestLoggingUtils:
+    def test_json_formatter_includes_extra_and_request_id(self):
+        record = make_record(resume_chars=1200)
+        token = set_request_id("req-42")
+        try:
+            RequestContextFilter().filter(record)
+        finally:
+            reset_request_id(token)
+
+        entry = json.loads(JSONFormatter().format(record))
+        assert entry["message"] == "Ranking resume"
+        assert entry["level"] == "INFO"
+        assert entry["request_id"] == "req-42"
+        assert entry["resume_chars"] == 1200
+
+    def test_payload_sampling(self):
+        assert PayloadSamplingFilter(sample_rate=0.0).filter(make_record(payload={"a": 1})) is False
+        assert PayloadSamplingFilter(sample_rate=1.0).filter(make_record(payload={"a": 1})) is True
+        # Records without a verbose payload are never sampled out
+        assert PayloadSamplingFilter(sample_rate=0.0).filter(make_record()) is True
+
+    def test_exception_survives_the_queue(self):
+        log_queue = queue.SimpleQueue()
+        output = io.StringIO()
+        stream_handler = logging.StreamHandler(output)
+        stream_handler.setFormatter(JSONFormatter())
+        listener = QueueListener(log_queue, stream_handler)
+
+        logger = logging.getLogger("tests.queue")
+        logger.propagate = False
+        queue_handler = JSONQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        listener.start()
+        try:
+            try:
+                raise RuntimeError("LLM call failed")
+            except RuntimeError:
+                logger.exception("Ranking failed for %s", "resume.pdf")
+        finally:
+            listener.stop()
+            logger.removeHandler(queue_handler)
+
+        entry = json.loads(output.getvalue())
+        assert entry["message"] == "Ranking failed for resume.pdf"
+        assert entry["exception"].startswith("Traceback")
+        assert "RuntimeError: LLM call failed" in entry["exception"]
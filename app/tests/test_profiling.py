@@ -0,0 +1,37 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.utils import profiling
+from core.utils.profiling import ProfilingMiddleware
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+class TestProfilingMiddleware:
+    def test_header_is_ignored_by_default(self):
+        response = make_client().get("/ping", headers={"X-Profile": "1"})
+        assert "X-Profile-Path" not in response.headers
+
+    def test_profile_name_does_not_come_from_the_request(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiling, "PROFILING_ALLOW_HEADER", True)
+        monkeypatch.setattr(profiling, "PROFILING_OUTPUT_DIR", str(tmp_path))
+
+        response = make_client().get("/ping", headers={"X-Profile": "1", "X-Request-ID": "../../evil"})
+
+        profile_path = response.headers["X-Profile-Path"]
+        assert os.path.dirname(profile_path) == str(tmp_path)
+        assert "evil" not in profile_path
+        assert sorted(os.listdir(tmp_path)) == sorted(
+            os.path.basename(path) for path in (profile_path, os.path.splitext(profile_path)[0] + ".txt")
+        )
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from core.utils.prompt_builder import PromptBuilder, PromptCacheStats, cached_prompt_tokens, canonical_json
+
+
+def usage(prompt_tokens, cached_tokens=None, **extra):
+    details = SimpleNamespace(cached_tokens=cached_tokens) if cached_tokens is not None else None
+    return SimpleNamespace(prompt_tokens=prompt_tokens, prompt_tokens_details=details, **extra)
+
+
+class TestPromptBuilder:
+    def test_canonical_json_ignores_key_order(self):
+        first = {"required_skills": ["Python", "SQL"], "experience": ["3+ years"]}
+        second = {"experience": ["3+ years"], "required_skills": ["Python", "SQL"]}
+        assert canonical_json(first) == canonical_json(second) == '{"experience":["3+ years"],"required_skills":["Python","SQL"]}'
+
+    def test_shared_context_is_in_the_system_prompt_and_input_is_last(self):
+        builder = PromptBuilder("\nRank the resume.\n", "Resume: {resume}", "Criteria: {criteria}")
+
+        system_a, user_a = builder.build(context={"criteria": {"b": [1], "a": [2]}}, resume="Resume A")
+        system_b, user_b = builder.build(context={"criteria": {"a": [2], "b": [1]}}, resume="Resume B")
+
+        assert system_a == system_b == 'Rank the resume.\n\nCriteria: {"a":[2],"b":[1]}'
+        assert (user_a, user_b) == ("Resume: Resume A", "Resume: Resume B")
+
+    def test_builder_without_context(self):
+        builder = PromptBuilder("Extract criteria.", "Job Description: {job_description}")
+        assert builder.build(job_description="Backend engineer") == ("Extract criteria.", "Job Description: Backend engineer")
+
+
+class TestPromptCacheStats:
+    def test_cached_tokens_are_read_from_either_usage_shape(self):
+        assert cached_prompt_tokens(usage(1500, cached_tokens=1024)) == 1024
+        assert cached_prompt_tokens(usage(1500, cache_read_input_tokens=896)) == 896
+        assert cached_prompt_tokens(usage(1500)) == 0
+
+    def test_stats_accumulate_per_model(self):
+        stats = PromptCacheStats()
+        assert stats.record("gpt-4o-mini", usage(2000, cached_tokens=0)) == 0
+        assert stats.record("gpt-4o-mini", usage(2000, cached_tokens=1536)) == 1536
+        assert stats.record("gpt-4o-mini", None) is None
+
+        assert stats.stats() == {
+            "gpt-4o-mini": {"calls": 2, "prompt_tokens": 4000, "cached_tokens": 1536, "cached_ratio": 0.384}
+        }
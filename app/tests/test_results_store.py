@@ -0,0 +1,95 @@
+import pytest
+from unittest.mock import patch
+
+from core.utils.results_store import ResultsStore
+
+
+def result(name, required_skills, experience, **extra):
+    return {
+        "candidate_name": name,
+        "scores": [
+            {"criteria": "required_skills", "score": required_skills},
+            {"criteria": "experience", "score": experience},
+        ],
+        **extra
+    }
+
+
+RESULTS = [
+    result("Asha", 3, 4),
+    result("Bala", 5, 1),
+    result("Chen", 4, 4),
+    result("Chen", 4, 4, duplicate_of="chen.pdf"),
+    result("Dara", 2, 2),
+]
+NAMES = ["asha.pdf", "bala.pdf", "chen.pdf", "chen.docx", "dara.pdf"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    store.save_batch("job-1", RESULTS, {"required_skills": ["Python"]}, NAMES)
+    yield store
+    store.close()
+
+
+def names(page):
+    return [item["resume"] for item in page["items"]]
+
+
+class TestResultsStore:
+    def test_top_k_by_total_score(self, store):
+        page = store.query("job-1", limit=2)
+
+        assert names(page) == ["chen.pdf", "chen.docx"]
+        assert page["items"][0]["scores"] == {"required_skills": 4, "experience": 4}
+        assert page["items"][0]["total_score"] == 8
+        assert page["next_cursor"] is not None
+
+    def test_cursor_pagination_visits_every_candidate_once(self, store):
+        seen, cursor = [], None
+        while True:
+            page = store.query("job-1", limit=2, cursor=cursor)
+            seen += names(page)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ["chen.pdf", "chen.docx", "asha.pdf", "bala.pdf", "dara.pdf"]
+
+    def test_weighted_ranking(self, store):
+        page = store.query("job-1", limit=3, weights={"required_skills": 2, "experience": 0.5}, exclude_duplicates=True)
+
+        assert names(page) == ["bala.pdf", "chen.pdf", "asha.pdf"]
+        assert page["items"][0]["weighted_score"] == pytest.approx(10.5)
+
+    def test_weighted_pagination_continues_after_cursor(self, store):
+        first = store.query("job-1", limit=2, weights={"experience": 1})
+        second = store.query("job-1", limit=2, weights={"experience": 1}, cursor=first["next_cursor"])
+        assert names(first) + names(second) == ["asha.pdf", "chen.pdf", "chen.docx", "dara.pdf"]
+
+    def test_minimum_scores_filter(self, store):
+        page = store.query("job-1", min_scores={"required_skills": 4, "experience": 2}, exclude_duplicates=True)
+        assert names(page) == ["chen.pdf"]
+
+    def test_saving_again_replaces_the_batch(self, store):
+        store.save_batch("job-1", RESULTS[:1], names=NAMES[:1])
+        assert names(store.query("job-1")) == ["asha.pdf"]
+
+    def test_unknown_job_and_invalid_cursor(self, store):
+        assert store.query("job-2") is None
+        with pytest.raises(ValueError):
+            store.query("job-1", cursor="not-a-cursor")
+
+    def test_old_and_surplus_batches_are_deleted_on_save(self, tmp_path):
+        store = ResultsStore(str(tmp_path / "retention.sqlite3"), retention_seconds=3600, max_batches=2)
+        with patch("core.utils.results_store.time.time", return_value=1000.0):
+            store.save_batch("old", RESULTS, names=NAMES)
+        for index, results_id in enumerate(["first", "second", "third"]):
+            with patch("core.utils.results_store.time.time", return_value=10000.0 + index):
+                store.save_batch(results_id, RESULTS, names=NAMES)
+
+        assert store.query("old") is None
+        assert store.query("first") is None
+        assert names(store.query("third", limit=1)) == ["chen.pdf"]
+        assert store.query("second") is not None
+        store.close()
@@ -1,7 +1,14 @@
+import json
+import threading
+
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from core.resume_ranker import ResumeRanker
+from core.section_segmenter import ResumeSegmenter
+from core.utils import token_budget
+from core.utils.llm_handler import LLMHandler
+from core.utils.shared_state import InMemoryStateBackend
 
 class TestResumeRanker:
     @pytest.fixture
@@ -57,3 +64,82 @@ class TestResumeRanker:
         assert "experience" in criteria_keys
         assert "qualifications" in criteria_keys
         assert "soft_skills" in criteria_keys
+
+    @pytest.mark.asyncio
+    async def test_rank_resume_sends_only_relevant_sections(self):
+        llm_handler = MagicMock()
+        llm_handler.call_llm = AsyncMock(return_value=str({"candidate_name": "Rajat", "scores": []}))
+        ranker = ResumeRanker(llm_handler=llm_handler)
+        resume_text = (
+            "Rajat\nrajat@example.com\n\nEducation\nB.Tech in Computer Science\n\n"
+            "Experience\nBackend engineer at Acme\n\nHobbies\nChess and trekking\n"
+        )
+
+        result = await ranker.rank_resume(resume_text, {"qualifications": ["Bachelor's in Computer Science"]})
+
+        user_prompt = llm_handler.call_llm.call_args.kwargs["user_prompt"]
+        assert "B.Tech in Computer Science" in user_prompt
+        assert "Acme" not in user_prompt and "Chess" not in user_prompt
+        assert result["metadata"]["sections"] == ["header", "education"]
+
+    @pytest.mark.asyncio
+    async def test_segmentation_and_budgeting_run_off_the_event_loop(self):
+        llm_handler = MagicMock()
+        llm_handler.call_llm = AsyncMock(return_value=str({"candidate_name": "Rajat", "scores": []}))
+        segmenter = ResumeSegmenter()
+        threads = {}
+
+        def build_payload(text, criteria):
+            threads["segmentation"] = threading.current_thread()
+            return ResumeSegmenter.build_payload(segmenter, text, criteria)
+
+        def fit_to_budget(*args):
+            threads["budget"] = threading.current_thread()
+            return token_budget.fit_to_budget(*args)
+
+        segmenter.build_payload = build_payload
+        ranker = ResumeRanker(llm_handler=llm_handler, segmenter=segmenter)
+        with patch("core.resume_ranker.fit_to_budget", fit_to_budget):
+            await ranker.rank_resume("Rajat\n\nEducation\nB.Tech\n\nSkills\nPython\n", {"required_skills": ["Python"]})
+
+        assert threads["segmentation"] is threads["budget"]
+        assert threads["segmentation"] is not threading.main_thread()
+
+    @pytest.mark.asyncio
+    async def test_batch_calls_share_the_system_prompt_prefix(self):
+        llm_handler = MagicMock()
+        llm_handler.call_llm = AsyncMock(return_value=str({"candidate_name": "Rajat", "scores": []}))
+        ranker = ResumeRanker(llm_handler=llm_handler)
+
+        await ranker.rank_resume("Rajat knows Python", {"required_skills": ["Python"], "soft_skills": ["Teamwork"]})
+        await ranker.rank_resume("Priya knows Go", {"soft_skills": ["Teamwork"], "required_skills": ["Python"]})
+
+        first, second = [call.kwargs for call in llm_handler.call_llm.call_args_list]
+        assert first["system_prompt"] == second["system_prompt"]
+        assert '"required_skills":["Python"]' in first["system_prompt"]
+        assert first["user_prompt"] == "Resume: Rajat knows Python"
+
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_prompt_prefix_is_byte_identical_across_resumes(self, mock_acompletion):
+        response = MagicMock()
+        response.choices[0].message.content = str({"candidate_name": "Candidate", "scores": []})
+        mock_acompletion.return_value = response
+        ranker = ResumeRanker(llm_handler=LLMHandler(state_backend=InMemoryStateBackend()))
+
+        await ranker.rank_resume("Rajat knows Python", {
+            "required_skills": ["Python", "SQL"], "experience": ["3+ years"], "soft_skills": ["Teamwork"]
+        })
+        await ranker.rank_resume("Priya knows Go and has led teams", {
+            "soft_skills": ["Teamwork"], "experience": ["3+ years"], "required_skills": ["Python", "SQL"]
+        })
+
+        # Everything sent ahead of the resume: the response schema, then the system message
+        first, second = [
+            json.dumps([call.kwargs["response_format"].model_json_schema(), call.kwargs["messages"][0]]).encode("utf-8")
+            for call in mock_acompletion.call_args_list
+        ]
+        assert first == second
+        assert [call.kwargs["messages"][1]["content"] for call in mock_acompletion.call_args_list] == [
+            "Resume: Rajat knows Python", "Resume: Priya knows Go and has led teams"
+        ]
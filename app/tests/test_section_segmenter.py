@@ -0,0 +1,77 @@
+from core.section_segmenter import HEADER, ResumeSegmenter
+
+RESUME = """Rajat Kumar
+rajat@example.com | +91 98765 43210
+
+PROFESSIONAL SUMMARY
+Backend engineer with six years of Python and FastAPI.
+
+Work Experience
+Senior Engineer, Acme (2020 - present)
+- Built resume scoring pipelines on AWS
+- Leadership
+Engineer, Initech (2018 - 2020)
+
+E D U C A T I O N
+B.Tech in Computer Science, IIT Delhi, 2018
+
+Skills: Python, FastAPI, Docker, AWS
+
+Certifications & Licenses
+AWS Certified Developer - Associate
+
+Hobbies
+Chess, trekking and photography on weekends.
+
+References
+Available on request.
+"""
+
+CRITERIA = {
+    "required_skills": ["Python", "FastAPI"],
+    "preferred_skills": ["Docker"],
+    "certifications": ["AWS Certified Developer"],
+    "experience": ["3+ years in backend development"],
+    "qualifications": ["Bachelor's in Computer Science"],
+    "soft_skills": ["Communication"],
+}
+
+
+class TestResumeSegmenter:
+    def test_headings_in_different_styles_are_recognised(self):
+        segmentation = ResumeSegmenter().segment(RESUME)
+
+        kinds = [section.kind for section in segmentation.sections]
+        assert kinds == [HEADER, "summary", "experience", "education", "skills", "certifications", "interests", "references"]
+        assert "- Leadership" in segmentation.sections[2].text
+        assert segmentation.confidence > 0.8
+
+    def test_payload_keeps_only_the_sections_criteria_need(self):
+        payload = ResumeSegmenter().build_payload(RESUME, CRITERIA)
+
+        assert payload.sections == [HEADER, "summary", "experience", "education", "skills", "certifications"]
+        assert "Rajat Kumar" in payload.text
+        assert "AWS Certified Developer - Associate" in payload.text
+        assert "Chess" not in payload.text and "Available on request" not in payload.text
+
+    def test_payload_is_narrowed_to_the_requested_categories(self):
+        payload = ResumeSegmenter().build_payload(RESUME, {"qualifications": ["B.Tech"], "soft_skills": []})
+
+        assert payload.sections == [HEADER, "education", "certifications"]
+        assert "Acme" not in payload.text
+
+    def test_unstructured_text_falls_back_to_full_text(self):
+        text = "Rajat is a good candidate with Python experience and AWS certifications"
+        payload = ResumeSegmenter().build_payload(text, CRITERIA)
+
+        assert payload.text == text
+        assert payload.sections is None
+        assert payload.confidence == 0
+
+    def test_long_preamble_lowers_confidence(self):
+        text = "Rajat Kumar\n" + "Worked on many backend systems. " * 40 + "\nEducation\nB.Tech\nSkills\nPython\n"
+        assert ResumeSegmenter().build_payload(text, CRITERIA).sections is None
+
+    def test_unknown_criteria_fall_back_to_full_text(self):
+        payload = ResumeSegmenter().build_payload(RESUME, {"languages": ["Hindi"]})
+        assert payload.text == RESUME and payload.sections is None
@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from core.utils.llm_handler import LLMHandler
+from core.utils.shared_state import InMemoryStateBackend, SQLiteStateBackend, SharedStateBackend
+
+
+class TestSharedState:
+    @pytest.fixture(params=["memory", "sqlite"])
+    def backend(self, request, tmp_path):
+        if request.param == "memory":
+            backend = InMemoryStateBackend()
+        else:
+            backend = SQLiteStateBackend(str(tmp_path / "state.sqlite3"))
+        yield backend
+        backend.close()
+
+    def test_set_get_delete(self, backend):
+        backend.set("key", {"status": "running", "total": 3})
+        assert backend.get("key") == {"status": "running", "total": 3}
+        backend.delete("key")
+        assert backend.get("key") is None
+
+    def test_expired_keys_are_missing(self, backend):
+        backend.set("key", "value", ttl=-1)
+        assert backend.get("key") is None
+
+    def test_purge_removes_only_expired_keys(self, backend):
+        backend.set("rate:gpt-4o-mini:1", 3, ttl=-1)
+        backend.set("job:abc", {"status": "done"}, ttl=60)
+        backend.set("pinned", "value")
+        assert backend.purge_expired() == 1
+        assert backend.get("job:abc") == {"status": "done"} and backend.get("pinned") == "value"
+
+    def test_memory_backend_sweeps_expired_keys_on_write(self):
+        backend = InMemoryStateBackend(sweep_interval=0)
+        backend.incr("rate:gpt-4o-mini:1", ttl=-1)
+        backend.set("rate:gpt-4o-mini:2", 1, ttl=60)
+        assert list(backend._data) == ["rate:gpt-4o-mini:2"]
+
+    def test_incr_starts_from_zero(self, backend):
+        assert backend.incr("counter") == 1
+        assert backend.incr("counter", 2) == 3
+
+    def test_sqlite_state_is_shared_between_connections(self, tmp_path):
+        path = str(tmp_path / "state.sqlite3")
+        first, second = SQLiteStateBackend(path), SQLiteStateBackend(path)
+        first.incr("rate:gpt-4o-mini:1")
+        assert second.incr("rate:gpt-4o-mini:1") == 2
+        first.close()
+        second.close()
+
+    def test_backends_must_implement_every_operation(self):
+        class GetOnly(SharedStateBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
+
+
+class TestLLMHandlerCache:
+    @patch('litellm.acompletion')
+    @pytest.mark.asyncio
+    async def test_identical_deterministic_calls_hit_the_cache(self, mock_acompletion):
+        response = MagicMock()
+        response.choices[0].message.content = "{'candidate_name': 'Rajat'}"
+        mock_acompletion.side_effect = AsyncMock(return_value=response)
+
+        handler = LLMHandler(state_backend=InMemoryStateBackend())
+        first = await handler.call_llm("system", "user", temperature=0.0)
+        second = await handler.call_llm("system", "user", temperature=0.0)
+
+        assert first == second == "{'candidate_name': 'Rajat'}"
+        assert mock_acompletion.call_count == 1
@@ -30,7 +30,7 @@ class TestTextExtractor:
         result = await text_extractor.extract_text(mock_file)
         
         # Assertions
-        assert result == "Sample PDF text\nSample PDF text\n"
+        assert result == "Sample PDF text\fSample PDF text\f"
         mock_pymupdf_open.assert_called_once_with("pdf", b"mock pdf content")
         
     @patch('docx.Document')
@@ -0,0 +1,83 @@
+import pytest
+
+from core.text_normalizer import TextNormalizer
+
+PAGE_ONE = """Rajat Kumar - Curriculum Vitae
+rajat.kumar@example.com | +91 98765 43210 | linkedin.com/in/rajatkumar
+
+Experience
+Senior Engineer, Acme Corp (2018 - 2020)
+•
+Built the resume scoring pipeline on AWS, reducing the time recruiters spent on
+screening by half across all business units
+ Led a team of four engineers building the candi-
+date search service
+Page 1 of 2
+"""
+
+PAGE_TWO = """Rajat Kumar - Curriculum Vitae
+Education
+B.Tech in Computer Science, IIT Delhi    2014 - 2018
+
+
+Skills
+Python,   FastAPI,	Docker
+Page 2 of 2
+"""
+
+RESUME = PAGE_ONE + "\f" + PAGE_TWO + "\f"
+
+
+@pytest.fixture
+def normalizer():
+    return TextNormalizer()
+
+
+class TestTextNormalizer:
+    def test_page_furniture_keeps_first_header_and_drops_page_numbers(self, normalizer):
+        text = normalizer.normalize_text(RESUME)
+
+        assert text.count("Rajat Kumar - Curriculum Vitae") == 1
+        assert "Page 1 of 2" not in text and "Page 2 of 2" not in text
+
+    def test_bullets_and_wrapped_lines_are_rejoined(self, normalizer):
+        lines = normalizer.normalize_text(RESUME).split("\n")
+
+        assert "- Built the resume scoring pipeline on AWS, reducing the time recruiters spent on " \
+               "screening by half across all business units" in lines
+        assert "- Led a team of four engineers building the candidate search service" in lines
+
+    def test_hyphenated_compounds_keep_their_hyphen(self, normalizer):
+        text = normalizer.normalize_text(
+            "Recognised by three managers as a reliable, self-\nmotivated engineer who owns the pipeline and its candi-\ndate search"
+        )
+
+        assert "self-motivated" in text
+        assert "candidate search" in text
+
+    def test_contact_details_are_dropped_and_dates_kept(self, normalizer):
+        text = normalizer.normalize_text(RESUME)
+
+        assert "@" not in text and "98765" not in text and "linkedin" not in text
+        assert "Senior Engineer, Acme Corp (2018 - 2020)" in text
+        assert "IIT Delhi 2014 - 2018" in text
+
+    def test_whitespace_is_collapsed(self, normalizer):
+        text = normalizer.normalize_text(RESUME)
+
+        assert "Python, FastAPI, Docker" in text
+        assert "\n\n\n" not in text and "\f" not in text
+
+    def test_only_configured_steps_run(self):
+        text = TextNormalizer(steps=["whitespace"]).normalize_text(RESUME)
+
+        assert text.count("Rajat Kumar - Curriculum Vitae") == 2
+        assert "rajat.kumar@example.com" in text
+        with pytest.raises(ValueError):
+            TextNormalizer(steps=["spellcheck"])
+
+    def test_normalize_reports_saved_tokens(self, normalizer):
+        result = normalizer.normalize(RESUME)
+
+        assert result.saved_tokens == result.original_tokens - result.normalized_tokens
+        assert result.saved_tokens > 0
@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import patch
+
+from core.utils.token_budget import TRUNCATION_MARKER, count_tokens, fit_to_budget
+
+
+class FakeEncoding:
+    """One token per whitespace-separated word."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def decode(self, tokens, errors="replace"):
+        return " ".join(tokens)
+
+
+class ByteEncoding:
+    """One token per UTF-8 byte, like a byte-level BPE on rare characters."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens, errors="replace"):
+        return bytes(tokens).decode("utf-8", errors=errors)
+
+
+class TestTokenBudget:
+    @pytest.fixture(autouse=True)
+    def fake_encoding(self):
+        with patch('core.utils.token_budget._get_encoding', return_value=FakeEncoding()):
+            yield
+
+    def test_text_within_budget_is_unchanged(self):
+        result = fit_to_budget("one two three", max_tokens=5, model="gpt-4o-mini")
+        assert result.text == "one two three"
+        assert result.removed_tokens == 0
+
+    def test_head_tail_keeps_start_and_end(self):
+        text = " ".join(f"w{i}" for i in range(20))
+        result = fit_to_budget(text, max_tokens=10, model="gpt-4o-mini", strategy="head_tail", head_ratio=0.7)
+
+        assert result.text == "w0 w1 w2 w3 w4 w5 w6" + TRUNCATION_MARKER + "w17 w18 w19"
+        assert result.original_tokens == 20
+        assert result.kept_tokens == 10
+        assert result.removed_tokens == 10
+
+    def test_truncate_keeps_start(self):
+        result = fit_to_budget("a b c d e", max_tokens=2, model="gpt-4o-mini", strategy="truncate")
+        assert result.text == "a b" + TRUNCATION_MARKER
+        assert result.removed_tokens == 3
+
+    def test_zero_budget_disables_budgeting(self):
+        assert fit_to_budget("a b c", max_tokens=0, model="gpt-4o-mini").removed_tokens == 0
+
+    def test_estimate_without_tokenizer(self):
+        with patch('core.utils.token_budget._get_encoding', return_value=None):
+            assert count_tokens("x" * 10, "gpt-4o-mini") == 3
+            result = fit_to_budget("x" * 100, max_tokens=10, model="gpt-4o-mini", strategy="truncate")
+            assert result.text == "x" * 40 + TRUNCATION_MARKER
+            assert result.removed_tokens == 15
+
+    def test_cut_inside_a_multibyte_character_is_dropped(self):
+        with patch('core.utils.token_budget._get_encoding', return_value=ByteEncoding()):
+            result = fit_to_budget("hé résumé", max_tokens=2, model="gpt-4o-mini", strategy="truncate")
+        assert result.text == "h" + TRUNCATION_MARKER
@@ -0,0 +1,54 @@
+import pytest
+
+from core.utils.tracing import Tracer, set_request_id, reset_request_id
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class TestTracer:
+    @pytest.fixture
+    def exporter(self):
+        return ListExporter()
+
+    @pytest.fixture
+    def tracer(self, exporter):
+        return Tracer(exporter=exporter)
+
+    def test_nested_spans_are_linked_to_parent_and_request(self, tracer, exporter):
+        token = set_request_id("req-1")
+        try:
+            with tracer.span("outer") as outer:
+                with tracer.span("inner", model="gpt-4o-mini"):
+                    pass
+        finally:
+            reset_request_id(token)
+
+        inner, finished_outer = exporter.spans
+        assert inner.name == "inner"
+        assert inner.parent_id == outer.span_id
+        assert inner.trace_id == "req-1"
+        assert inner.attributes == {"model": "gpt-4o-mini"}
+        assert finished_outer.duration_ms is not None
+
+    @pytest.mark.asyncio
+    async def test_traced_async_function_records_error(self, tracer, exporter):
+        @tracer.traced("failing")
+        async def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await failing()
+
+        assert exporter.spans[0].name == "failing"
+        assert exporter.spans[0].error == "ValueError: boom"
+
+    def test_disabled_tracer_yields_none(self):
+        tracer = Tracer(exporter=None)
+        with tracer.span("noop") as span:
+            assert span is None
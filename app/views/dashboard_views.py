@@ -1,25 +1,69 @@
 import asyncio
-from typing import List, Tuple, Dict, Any
+import logging
+import uuid
+from typing import AsyncIterator, List, Tuple, Dict, Any, Optional
 from fastapi import UploadFile, status, HTTPException
 
+from configuration.config import (
+    DEDUP_ENABLED,
+    DEDUP_CROSS_BATCH,
+    CRITERIA_BATCH_CONCURRENCY,
+    CRITERIA_EXTRACTOR_MODEL,
+    EXPORT_DEFAULT_FORMAT,
+    RESULTS_STORE_ENABLED,
+    RESUME_RANKER_MODEL
+)
+from core.archive_extractor import ArchiveError, ArchiveExtractor
+from core.duplicate_detector import NearDuplicateDetector
 from core.text_extractor import TextExtractor
+from core.text_normalizer import TextNormalizer
 from core.criteria_extractor import CriteriaExtractor
 from core.resume_ranker import ResumeRanker
 from core.utils.csv_utils import CSVUtils
+from core.utils.exporters import export_results
+from core.utils.job_state import JobStateStore
+from core.utils.llm_handler import LLMHandler
+from core.utils.results_store import ResultsStore
+from core.utils.shared_state import get_state_backend
+from core.utils.token_budget import load_encodings
+from core.utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
 
 class DashboardViews:
     """
     Views for the endpoints /extract-criteria and /score-resumes.
     Handles the logic for criteria extraction from job descriptions and resume scoring.
     """
-    def __init__(self):
+    def __init__(self, llm_handler: Optional[LLMHandler] = None, results_store: Optional[ResultsStore] = None):
         """
         Initialize the DashboardViews with required service components.
+
+        Args:
+            llm_handler (Optional[LLMHandler]): Handler shared by the criteria extractor
+                and the resume ranker, so both use one connection pool
+            results_store (Optional[ResultsStore]): Store keeping each batch's scores for
+                later queries. Defaults to the configured store, if enabled.
         """
+        self.llm_handler = llm_handler or LLMHandler()
         self.text_extractor = TextExtractor()
-        self.criteria_extractor = CriteriaExtractor()
-        self.resume_ranker = ResumeRanker()
+        self.text_normalizer = TextNormalizer()
+        self.criteria_extractor = CriteriaExtractor(self.llm_handler)
+        self.resume_ranker = ResumeRanker(self.llm_handler)
         self.csv_utils = CSVUtils()
+        self.job_state = JobStateStore(get_state_backend())
+        self.results_store = results_store or (ResultsStore() if RESULTS_STORE_ENABLED else None)
+
+    def warm_up(self) -> None:
+        """
+        Import the heavy dependencies used by the services and load the tokenizers.
+
+        Blocking; meant to run in a worker thread during application startup.
+        """
+        TextExtractor.warm_up()
+        LLMHandler.warm_up()
+        # tiktoken may download its encodings on first use
+        load_encodings(RESUME_RANKER_MODEL, CRITERIA_EXTRACTOR_MODEL)
 
 
     async def extract_criteria(self, file: UploadFile) -> Tuple[int, Dict[str, Any]]:
@@ -35,13 +79,14 @@ class DashboardViews:
                 - Response dictionary with extracted criteria or error details
         """
         try:
-            print("Extracting criteria")
+            logger.info("Extracting criteria")
             # Extract text content from the uploaded file
             text = await self.text_extractor.extract_text(file)
+            text, _ = await self._normalize(getattr(file, "filename", None), text, CRITERIA_EXTRACTOR_MODEL)
             
             # Process the extracted text to identify job criteria
             criteria = await self.criteria_extractor.extract_criteria(job_description=text)
-            print("Criteria", criteria)
+            logger.debug("Criteria", extra={"payload": criteria})
             
             # Return success response with extracted criteria
             return status.HTTP_200_OK, {
@@ -53,37 +98,432 @@ class DashboardViews:
             # Return error response if any exception occurs
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
-    async def score_resumes(self, criteria: dict, files: List[UploadFile]) -> Tuple[int, str]:
+    async def iter_extract_criteria_batch(self, documents: List[Tuple[Optional[str], bytes]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract job criteria from many job description documents, yielding results as they complete.
+
+        Each document's text is extracted off the event loop and its criteria are
+        extracted by the LLM; at most CRITERIA_BATCH_CONCURRENCY documents are in
+        flight at once. A failing document yields an error entry instead of failing
+        the batch.
+
+        The documents are passed as bytes rather than UploadFiles, because a
+        streamed response outlives the request handler and its uploads are
+        closed by then.
+
+        Args:
+            documents (List[Tuple[Optional[str], bytes]]): (filename, content) of each
+                job description document (PDF or DOCX format)
+
+        Yields:
+            Dict[str, Any]: {"index", "filename", "data", "error"} for each document, in completion order
+        """
+        semaphore = asyncio.Semaphore(CRITERIA_BATCH_CONCURRENCY)
+
+        async def process(index: int, filename: Optional[str], content: bytes) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    # Detect the type from the content; parsing runs in a worker thread
+                    text = await self.text_extractor.extract_text_from_bytes(content)
+                    text, _ = await self._normalize(filename, text, CRITERIA_EXTRACTOR_MODEL)
+                    criteria = await self.criteria_extractor.extract_criteria(job_description=text)
+                    return {"index": index, "filename": filename, "data": criteria, "error": None}
+                except Exception as e:
+                    logger.warning("Criteria extraction failed", extra={"upload_filename": filename, "error": str(e)})
+                    return {"index": index, "filename": filename, "data": {}, "error": str(e)}
+
+        tasks = [
+            asyncio.create_task(process(index, filename, content))
+            for index, (filename, content) in enumerate(documents)
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            # Stop outstanding work if the client goes away mid-stream
+            for task in tasks:
+                task.cancel()
+
+    async def extract_criteria_batch(self, documents: List[Tuple[Optional[str], bytes]]) -> List[Dict[str, Any]]:
+        """
+        Extract job criteria from many job description documents.
+
+        Args:
+            documents (List[Tuple[Optional[str], bytes]]): (filename, content) of each
+                job description document (PDF or DOCX format)
+
+        Returns:
+            List[Dict[str, Any]]: {"filename", "data", "error"} for each document, in upload order
+        """
+        results = [None] * len(documents)
+        async for result in self.iter_extract_criteria_batch(documents):
+            index = result.pop("index")
+            results[index] = result
+        return results
+
+    async def score_resumes(
+        self,
+        criteria: dict,
+        files: List[UploadFile],
+        export_format: str = EXPORT_DEFAULT_FORMAT,
+        results_id: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> Tuple[int, str]:
         """
         Score and rank multiple resumes against specified job criteria.
         
         Args:
             criteria (dict): Dictionary containing job criteria (required skills, preferred skills, etc.)
             files (List[UploadFile]): List of resume documents to evaluate
+            export_format (str): Format of the result file: "csv", "parquet", "arrow" or "xlsx"
+            results_id (Optional[str]): Server-generated id to store the scores under; generated
+                here if not given
+            job_id (Optional[str]): Server-generated id the job's progress is kept under; generated
+                here if not given
             
         Returns:
             Tuple[int, str]: A tuple containing:
                 - HTTP status code
-                - Path to the generated CSV file containing resume rankings
+                - Path to the generated result file containing resume rankings
             
         Raises:
             Exception: If any error occurs during processing, returns error response tuple
         """
+        job_id = job_id or uuid.uuid4().hex
+        batch = _RankingBatch(self, job_id, criteria)
         try:
+            await self.job_state.start(job_id, total=len(files))
+
             # Extract text from all resume files in parallel for efficiency
             extraction_tasks = [self.text_extractor.extract_text(file) for file in files]
             resume_texts = await asyncio.gather(*extraction_tasks)
             
-            # Process each resume against the criteria in parallel
-            ranking_tasks = [self.resume_ranker.rank_resume(resume_text, criteria) for resume_text in resume_texts]
-            ranking_results = await asyncio.gather(*ranking_tasks)
-            
-            print("Ranking results", ranking_results)
+            # Process each distinct resume against the criteria in parallel;
+            # near-duplicates reuse the scores of their group's representative
+            for index, (file, resume_text) in enumerate(zip(files, resume_texts)):
+                name = getattr(file, "filename", None) or f"resume_{index + 1}"
+                await batch.add(name, resume_text)
+            ranking_results = await batch.results()
             
-            # Generate CSV file with ranking results
-            csv_path = self.csv_utils.create_csv(ranking_results)
+            logger.info("Resumes ranked", extra={"job_id": job_id, "resumes": len(ranking_results)})
+            logger.debug("Ranking results", extra={"payload": ranking_results})
             
-            return csv_path
+            # Generate the result file with ranking results and keep the scores for later queries
+            result_path = await self._export(ranking_results, job_id, criteria, export_format, batch.names)
+            results_id = await self._store_results(ranking_results, results_id, criteria, batch.names)
+
+            await self.job_state.finish(job_id, _job_result(export_format, results_id))
+            return result_path
         except Exception as e:
+            batch.cancel()
+            await self.job_state.fail(job_id, str(e))
             # Return error response if any exception occurs
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def score_archive(
+        self,
+        criteria: dict,
+        archive: UploadFile,
+        export_format: str = EXPORT_DEFAULT_FORMAT,
+        results_id: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Score and rank the resumes contained in a ZIP or TAR archive.
+
+        Members are decompressed and parsed one at a time, and each resume is
+        handed to the ranker as soon as its text is extracted, so memory is
+        bounded by the member currently being processed rather than the archive.
+
+        Args:
+            criteria (dict): Dictionary containing job criteria (required skills, preferred skills, etc.)
+            archive (UploadFile): The uploaded archive of resume documents
+            export_format (str): Format of the result file: "csv", "parquet", "arrow" or "xlsx"
+            results_id (Optional[str]): Server-generated id to store the scores under; generated
+                here if not given
+            job_id (Optional[str]): Server-generated id the job's progress is kept under; generated
+                here if not given
+
+        Returns:
+            Tuple[str, List[str]]: A tuple containing:
+                - Path to the generated result file containing resume rankings
+                - Names of the archive members that were skipped
+
+        Raises:
+            HTTPException: 400 for invalid archives or exceeded limits, 500 for any other error
+        """
+        job_id = job_id or uuid.uuid4().hex
+        archive_extractor = ArchiveExtractor()
+        batch = _RankingBatch(self, job_id, criteria)
+        try:
+            await self.job_state.start(job_id, total=0)
+
+            async for member in archive_extractor.aiter_members(archive.file):
+                try:
+                    resume_text = await self.text_extractor.extract_text_from_bytes(member.content, member.content_type)
+                except Exception as e:
+                    # A corrupt member should not fail the whole archive
+                    logger.warning("Could not extract archive member", extra={"member": member.name, "error": str(e)})
+                    archive_extractor.skipped.append(member.name)
+                    continue
+                await batch.add(member.name, resume_text)
+                # The number of resumes is only known once the archive has been read
+                await self.job_state.set_total(job_id, len(batch.names))
+
+            if batch.empty:
+                raise ArchiveError("The archive does not contain any PDF or DOCX resumes.")
+
+            ranking_results = await batch.results()
+            logger.info("Archive resumes ranked", extra={
+                "job_id": job_id,
+                "resumes": len(ranking_results),
+                "skipped": len(archive_extractor.skipped)
+            })
+
+            # Generate the result file with ranking results and keep the scores for later queries
+            result_path = await self._export(ranking_results, job_id, criteria, export_format, batch.names)
+            results_id = await self._store_results(ranking_results, results_id, criteria, batch.names)
+
+            await self.job_state.finish(job_id, {
+                **_job_result(export_format, results_id),
+                "total": len(ranking_results),
+                "skipped": archive_extractor.skipped
+            })
+            return result_path, archive_extractor.skipped
+        except Exception as e:
+            batch.cancel()
+            await self.job_state.fail(job_id, str(e))
+            if isinstance(e, ArchiveError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def _export(
+        self,
+        ranking_results: List[Dict[str, Any]],
+        job_id: str,
+        criteria: dict,
+        export_format: str,
+        names: List[str]
+    ) -> str:
+        """Write the ranking results in the requested format and return the file path."""
+        if export_format == "csv":
+            return self.csv_utils.create_csv(ranking_results)
+        # Typed exports of large batches take a while to encode; keep them off the event loop
+        return await asyncio.to_thread(export_results, ranking_results, export_format, job_id, criteria, names)
+
+    async def _store_results(
+        self,
+        ranking_results: List[Dict[str, Any]],
+        results_id: Optional[str],
+        criteria: dict,
+        names: List[str]
+    ) -> Optional[str]:
+        """
+        Save a batch's scores in the results store; the batch still succeeds if this fails.
+
+        Results are keyed by a server-generated id rather than the client's X-Request-ID,
+        so one client cannot overwrite or read another's batch by reusing an id.
+
+        Returns:
+            Optional[str]: The id the scores were stored under, or None if they were not stored
+        """
+        if self.results_store is None:
+            return None
+        results_id = results_id or uuid.uuid4().hex
+        try:
+            await asyncio.to_thread(self.results_store.save_batch, results_id, ranking_results, criteria, names)
+        except Exception as e:
+            logger.warning("Could not store ranking results", extra={"results_id": results_id, "error": str(e)})
+            return None
+        return results_id
+
+    async def query_results(
+        self,
+        results_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        weights: Optional[Dict[str, float]] = None,
+        min_scores: Optional[Dict[str, int]] = None,
+        exclude_duplicates: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return one page of a finished batch's candidates, best first.
+
+        Args:
+            results_id (str): The id the batch's scores were stored under
+            limit (int): Page size; the first page is the top-K
+            cursor (Optional[str]): The previous page's next_cursor
+            weights (Optional[Dict[str, float]]): Rank by the weighted sum of these criteria's scores
+            min_scores (Optional[Dict[str, int]]): Minimum score per criterion
+            exclude_duplicates (bool): Leave out near-duplicates of other candidates
+
+        Returns:
+            Optional[Dict[str, Any]]: The page and the next page's cursor, or None if nothing
+                is stored under the id
+
+        Raises:
+            RuntimeError: If the results store is disabled
+            ValueError: If the cursor is invalid
+        """
+        if self.results_store is None:
+            raise RuntimeError("The results store is disabled.")
+        return await asyncio.to_thread(
+            self.results_store.query, results_id, limit, cursor, weights, min_scores, exclude_duplicates
+        )
+
+    async def _normalize(self, document: Optional[str], text: str, model: str = RESUME_RANKER_MODEL) -> Tuple[str, Optional[int]]:
+        """
+        Compact extracted text before it is sent to the LLM.
+
+        Normalization runs in a worker thread; the tokens it saves are logged per document.
+
+        Args:
+            document (Optional[str]): File or archive member name, for the log
+            text (str): The extracted text
+            model (str): The model the text is sent to, whose tokenizer applies
+
+        Returns:
+            Tuple[str, Optional[int]]: The normalized text and the tokens saved, or the
+                text unchanged and None if normalization is disabled
+        """
+        if not self.text_normalizer.steps:
+            return text, None
+        with tracer.span("text_normalizer.normalize") as span:
+            result = await asyncio.to_thread(self.text_normalizer.normalize, text, model)
+            if span is not None:
+                span.set_attribute("saved_tokens", result.saved_tokens)
+        logger.info("Text normalized", extra={
+            "document": document,
+            "original_tokens": result.original_tokens,
+            "saved_tokens": result.saved_tokens
+        })
+        return result.text, result.saved_tokens
+
+    async def _rank_and_track(
+        self,
+        job_id: str,
+        resume_text: str,
+        criteria: dict,
+        saved_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Rank one resume and count it towards the job's progress."""
+        result = await self.resume_ranker.rank_resume(resume_text, criteria)
+        if saved_tokens is not None:
+            result.setdefault("metadata", {})["normalization_saved_tokens"] = saved_tokens
+        await self.job_state.mark_progress(job_id)
+        return result
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the state of a scoring job.
+
+        Args:
+            job_id (str): The job id, i.e. the X-Job-ID of the scoring response
+
+        Returns:
+            Optional[Dict[str, Any]]: The job's status, totals and result, or None if unknown
+        """
+        return await self.job_state.get(job_id)
+
+
+def _job_result(export_format: str, results_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Job-state entry describing a finished batch's result.
+
+    Anyone holding the job id can read it, so it never carries server file paths.
+    """
+    result = {"format": export_format}
+    if results_id is not None:
+        result["results_id"] = results_id
+    return result
+
+
+class _RankingBatch:
+    """
+    Ranks the resumes of one scoring job, skipping near-duplicates.
+
+    Resumes are added one at a time as their text becomes available and are
+    handed to the ranker right away, unless they duplicate a resume already in
+    the batch; duplicates reuse their representative's scores and are marked
+    with `duplicate_of`. Representatives matching a resume from an earlier
+    batch are marked with `previously_seen_in`.
+    """
+    def __init__(self, views: DashboardViews, job_id: str, criteria: dict):
+        self.views = views
+        self.job_id = job_id
+        self.criteria = criteria
+        self.detector = None
+        if DEDUP_ENABLED:
+            self.detector = NearDuplicateDetector(state_backend=get_state_backend() if DEDUP_CROSS_BATCH else None)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._entries: List[Tuple[str, Optional[str], Optional[str]]] = []
+        self._names = set()
+
+    @property
+    def empty(self) -> bool:
+        return not self._entries
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the added resumes, in the order of results()."""
+        return [name for name, _, _ in self._entries]
+
+    def _check_duplicates(self, name: str, resume_text: str) -> Tuple[Optional[str], Optional[str]]:
+        """Blocking duplicate lookup; returns (duplicate_of, previously_seen_in)."""
+        # The signature is the costly part; both lookups share it
+        signature = self.detector.signature(resume_text)
+        duplicate_of = self.detector.add_signature(name, signature)
+        if duplicate_of is not None:
+            return duplicate_of, None
+        return None, self.detector.match_signature(f"{self.job_id}/{name}", signature)
+
+    async def add(self, name: str, resume_text: str) -> None:
+        """
+        Add a resume to the batch and start ranking it if it is not a duplicate.
+
+        Args:
+            name (str): File or archive member name of the resume
+            resume_text (str): The extracted resume text
+        """
+        # File names are not guaranteed to be unique within an upload, and a renamed
+        # copy can itself clash with a later name such as "resume.pdf#2"
+        if name in self._names:
+            suffix = len(self._entries) + 1
+            while f"{name}#{suffix}" in self._names:
+                suffix += 1
+            name = f"{name}#{suffix}"
+        self._names.add(name)
+
+        resume_text, saved_tokens = await self.views._normalize(name, resume_text)
+        duplicate_of, previously_seen_in = None, None
+        if self.detector is not None:
+            duplicate_of, previously_seen_in = await asyncio.to_thread(self._check_duplicates, name, resume_text)
+
+        if duplicate_of is None:
+            self._tasks[name] = asyncio.create_task(
+                self.views._rank_and_track(self.job_id, resume_text, self.criteria, saved_tokens)
+            )
+        else:
+            logger.info("Skipping near-duplicate resume", extra={"resume": name, "duplicate_of": duplicate_of})
+            await self.views.job_state.mark_progress(self.job_id)
+        self._entries.append((name, duplicate_of, previously_seen_in))
+
+    async def results(self) -> List[Dict[str, Any]]:
+        """Wait for the rankings and return one result per added resume, in order."""
+        names = list(self._tasks)
+        ranked = dict(zip(names, await asyncio.gather(*self._tasks.values())))
+
+        results = []
+        for name, duplicate_of, previously_seen_in in self._entries:
+            if duplicate_of is not None:
+                results.append({**ranked[duplicate_of], "duplicate_of": duplicate_of})
+            elif previously_seen_in is not None:
+                results.append({**ranked[name], "previously_seen_in": previously_seen_in})
+            else:
+                results.append(ranked[name])
+        return results
+
+    def cancel(self) -> None:
+        """Cancel any ranking still in flight."""
+        for task in self._tasks.values():
+            task.cancel()